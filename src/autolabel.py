@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+autolabel.py  –  headless batch pre-labelling (LabelUI.auto_detect, offline)
+---------------------------------------------------------------------------
+Usage
+    python src/autolabel.py                                   # ss/images
+    python src/autolabel.py --images captured_dataset/images --workers 6
+    python src/autolabel.py --model color --force              # relabel all
+---------------------------------------------------------------------------
+Each worker process loads the model once and runs it on batches of images.
+Labels go to the sibling labels/ folder, written to a temp file and then
+os.replace()d so a killed run never leaves half a label behind.
+
+Skipped:
+  • images whose label file is newer than the image (hand-corrected in the UI)
+  • images already listed in the manifest (<images>/../autolabel.jsonl),
+    so an interrupted overnight run resumes where it stopped
+"""
+import argparse, json, os, time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+_model = None; _args = None
+
+def parse():
+    ap=argparse.ArgumentParser(formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+    ap.add_argument("--images",default=str(ROOT/"ss"/"images"))
+    ap.add_argument("--labels",default=None,help="default: <images>/../labels")
+    ap.add_argument("--model",default=str(ROOT/"models"/"YOLOV12N_5090.pt"),
+                    help="weights path or 'color'")
+    ap.add_argument("--conf",type=float,default=0.5)
+    ap.add_argument("--imgsz",type=int,default=640)
+    ap.add_argument("--batch",type=int,default=8)
+    ap.add_argument("--workers",type=int,default=max(1,(os.cpu_count() or 2)//2))
+    ap.add_argument("--threads",type=int,default=2,help="torch/OpenCV threads per worker")
+    ap.add_argument("--force",action="store_true",help="ignore manifest and mtimes")
+    return ap.parse_args()
+
+# ── worker side ──────────────────────────────────────────────────────────────
+def init_worker(args):
+    global _model,_args
+    for k in ("OMP_NUM_THREADS","MKL_NUM_THREADS","OPENBLAS_NUM_THREADS"):
+        os.environ[k]=str(args.threads)
+    import cv2; cv2.setNumThreads(args.threads)
+    from detectors import load_detector
+    _model=load_detector(args.model); _args=args
+
+def write_atomic(path,text):
+    tmp=path.with_suffix(path.suffix+".tmp")
+    with open(tmp,"w") as f: f.write(text)
+    os.replace(tmp,path)
+
+def label_batch(paths,lbl_dir):
+    """→ [(img_name, n_boxes)] for one batch."""
+    import cv2
+    from detectors import to_numpy
+    from sample_writer import yolo_lines
+    imgs=[cv2.imread(p) for p in paths]
+    ok=[(p,im) for p,im in zip(paths,imgs) if im is not None]
+    if not ok: return []
+    if hasattr(_model,"predict"):             # Ultralytics: one batched forward
+        results=_model([im for _,im in ok],imgsz=_args.imgsz,conf=_args.conf,verbose=False)
+    else:
+        results=[_model(im,imgsz=_args.imgsz,conf=_args.conf)[0] for _,im in ok]
+    out=[]
+    for (p,im),res in zip(ok,results):
+        h,w=im.shape[:2]; xyxy,cls,_=to_numpy(res); dets=[]
+        for (x1,y1,x2,y2),c in zip(xyxy.astype(int),cls.astype(int)):
+            x1=max(0,min(x1,w-1)); x2=max(0,min(x2,w-1))
+            y1=max(0,min(y1,h-1)); y2=max(0,min(y2,h-1))
+            if x2>x1 and y2>y1: dets.append((int(c),(x1,y1,x2,y2)))
+        write_atomic(Path(lbl_dir)/f"{Path(p).stem}.txt",yolo_lines(dets,w,h))
+        out.append((Path(p).name,len(dets)))
+    return out
+
+# ── driver ───────────────────────────────────────────────────────────────────
+def todo(img_dir,lbl_dir,done,force):
+    imgs=sorted(img_dir.glob("*.jpg"))+sorted(img_dir.glob("*.png"))
+    out=[]
+    for p in imgs:
+        if not force:
+            if p.name in done: continue
+            lbl=lbl_dir/f"{p.stem}.txt"
+            if lbl.exists() and lbl.stat().st_mtime>=p.stat().st_mtime: continue
+        out.append(str(p))
+    return out,len(imgs)
+
+def main():
+    args=parse()
+    img_dir=Path(args.images); lbl_dir=Path(args.labels) if args.labels else img_dir.parent/"labels"
+    lbl_dir.mkdir(parents=True,exist_ok=True)
+    manifest=img_dir.parent/"autolabel.jsonl"
+    done=set()
+    if manifest.exists() and not args.force:
+        for ln in open(manifest):
+            try: done.add(json.loads(ln)["img"])
+            except (ValueError,KeyError): pass      # torn last line after a kill
+    paths,total=todo(img_dir,lbl_dir,done,args.force)
+    print(f"📂  {total} images, {len(paths)} to label → {lbl_dir}  ({args.workers} workers)")
+    if not paths: return
+
+    batches=[paths[i:i+args.batch] for i in range(0,len(paths),args.batch)]
+    t0=time.time(); n=0; boxes=0
+    with open(manifest,"a") as mf, ProcessPoolExecutor(args.workers,initializer=init_worker,
+                                                       initargs=(args,)) as ex:
+        futs=[ex.submit(label_batch,b,str(lbl_dir)) for b in batches]
+        for fut in as_completed(futs):
+            for name,k in fut.result():
+                mf.write(json.dumps({"img":name,"n":k,"model":Path(args.model).name,
+                                     "t":round(time.time(),3)})+"\n")
+                n+=1; boxes+=k
+            mf.flush()
+            dt=time.time()-t0
+            print(f"\r  {n}/{len(paths)}  {n/dt:6.1f} img/s  boxes={boxes}",end="",flush=True)
+    print(f"\n✅  Done in {time.time()-t0:.1f}s – correct them in labeling_ui.py")
+
+if __name__=="__main__":
+    main()
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+bench_cascade.py  –  single pass vs two-stage cascade on the labelled set
+────────────────────────────────────────────────────────────────────────────
+Usage
+    python src/bench_cascade.py --model models/best_v12n2.pt
+    python src/bench_cascade.py --model models/best_v12n2.pt --coarse 224 --crop 256 --small 48
+    python src/bench_cascade.py --model models/v12n_256.onnx --fine models/v12n_320.onnx
+---------------------------------------------------------------------------
+Runs the same detector three ways over ss/ (images + YOLO labels):
+
+  single@imgsz    today's full-frame pass (IMG_SZ)
+  single@coarse   the cascade's first stage alone (speed floor)
+  cascade         coarse + batched native-res crops (cascade.py)
+
+and prints latency (mean / p95 ms), P / R at --conf, recall on SMALL ground
+truth (max side < --small px) and on cards (class 4), and crops per frame.
+"""
+import argparse, time
+from pathlib import Path
+import numpy as np
+from detectors import load_detector, to_numpy
+from bench_detectors import dataset, read_frames, load_labels, match, iou_matrix
+from cascade import Cascade
+
+ROOT = Path(__file__).resolve().parent.parent
+
+def run(model,frames,gts,imgsz,args):
+    lat=[]; tp=npred=0; n_gt=small_gt=small_hit=card_gt=card_hit=0; crops=0
+    for k,(f,(g_cls,g_box)) in enumerate(zip(frames,gts)):
+        t=time.perf_counter()
+        res=model(f,imgsz=imgsz,conf=args.conf,iou=args.iou,verbose=False)[0]
+        if k>=3: lat.append((time.perf_counter()-t)*1000)
+        crops+=getattr(model,"last",(0,0))[1]
+        box,cls,cf=to_numpy(res); cls=cls.astype(int)
+        ok=match(cls,box,cf,g_cls,g_box,args.match)
+        tp+=int(ok.sum()); npred+=len(ok); n_gt+=len(g_cls)
+        # gt side: hit = some true-positive prediction of its class overlaps it
+        hit=((iou_matrix(g_box,box[ok])>=args.match)&(g_cls[:,None]==cls[ok][None,:])).any(1) \
+            if len(g_cls) else np.zeros(0,bool)
+        sm=np.maximum(g_box[:,2]-g_box[:,0],g_box[:,3]-g_box[:,1])<args.small
+        small_gt+=int(sm.sum()); small_hit+=int(hit[sm].sum())
+        card_gt+=int((g_cls==4).sum()); card_hit+=int(hit[g_cls==4].sum())
+    lat=np.array(lat or [0.0])
+    return dict(mean=lat.mean(),p95=np.percentile(lat,95),P=tp/max(npred,1),R=tp/max(n_gt,1),
+                R_small=small_hit/max(small_gt,1),R_card=card_hit/max(card_gt,1),
+                n_small=small_gt,crops=crops/len(frames))
+
+def main():
+    ap=argparse.ArgumentParser(formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+    ap.add_argument("--model",default="models/best_v12n2.pt",help="any load_detector() spec")
+    ap.add_argument("--fine",default=None,help="second-stage model (fixed-shape ONNX)")
+    ap.add_argument("--images",default=str(ROOT/"ss"/"images"))
+    ap.add_argument("--labels",default=str(ROOT/"ss"/"labels"))
+    ap.add_argument("--imgsz",type=int,default=416)
+    ap.add_argument("--coarse",type=int,default=256)
+    ap.add_argument("--crop",type=int,default=320)
+    ap.add_argument("--small",type=int,default=40,help="px: small object / refine threshold")
+    ap.add_argument("--conf",type=float,default=0.70)
+    ap.add_argument("--iou",type=float,default=0.50)
+    ap.add_argument("--match",type=float,default=0.50)
+    ap.add_argument("--limit",type=int,default=0)
+    args=ap.parse_args()
+
+    pairs=dataset(args.images,args.labels)[:args.limit or None]
+    pairs,frames=read_frames(pairs)
+    gts=[load_labels(l,f.shape[1],f.shape[0]) for (_,l),f in zip(pairs,frames)]
+    model=load_detector(args.model)
+    casc=Cascade(model,coarse=args.coarse,crop=args.crop,small=args.small,
+                 fine=args.fine and load_detector(args.fine))
+    print(f"📂  {len(frames)} images, {frames[0].shape[1]}×{frames[0].shape[0]}   model {args.model}")
+    print(f"\n{'variant':22} {'mean':>7} {'p95':>7} {'P':>6} {'R':>6} {'R_small':>8} {'R_card':>7} {'crops':>6}")
+    for name,m,sz in ((f"single@{args.imgsz}",model,args.imgsz),(f"single@{args.coarse}",model,args.coarse),
+                      (f"cascade {args.coarse}+{args.crop}",casc,args.imgsz)):
+        r=run(m,frames,gts,sz,args)
+        print(f"{name:22} {r['mean']:7.2f} {r['p95']:7.2f} {r['P']:6.3f} {r['R']:6.3f}"
+              f" {r['R_small']:8.3f} {r['R_card']:7.3f} {r['crops']:6.2f}")
+    print(f"(R_small over {r['n_small']} boxes with max side < {args.small} px)")
+
+if __name__=="__main__":
+    main()
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+bench_detectors.py  –  speed + precision/recall of detection backends
+────────────────────────────────────────────────────────────────────────────
+Usage
+    python src/bench_detectors.py                               # color only
+    python src/bench_detectors.py --models color models/best_v12n2.pt
+    python src/bench_detectors.py --images ss/images --labels ss/labels --conf 0.5
+---------------------------------------------------------------------------
+Every backend from detectors.load_detector() is run over the labelled set
+(YOLO txt labels); predictions are matched greedily by confidence at
+IoU ≥ --match.  Prints per-class P/R and mean / p95 latency per image.
+"""
+import argparse, time
+from pathlib import Path
+import cv2, numpy as np, yaml
+from detectors import load_detector, to_numpy
+
+ROOT = Path(__file__).resolve().parent.parent
+YAML_CFG = ROOT/"ragnarok-dataset"/"ragnarok_multi.yaml"
+
+# ── helpers (shared with the other bench_* scripts) ──────────────────────────
+def class_names():
+    names=yaml.safe_load(open(YAML_CFG,encoding="utf-8"))["names"]
+    return [names[i] for i in range(len(names))] if isinstance(names,dict) else list(names)
+
+def load_labels(lbl_path,w,h):
+    """YOLO txt → (cls (N,), xyxy (N,4)) in pixels; missing file = no objects."""
+    lbl_path=Path(lbl_path)
+    if not lbl_path.exists(): return np.zeros(0,int),np.zeros((0,4),np.float32)
+    a=np.loadtxt(lbl_path,ndmin=2,dtype=np.float32)
+    if a.size==0: return np.zeros(0,int),np.zeros((0,4),np.float32)
+    cx,cy,bw,bh=a[:,1]*w,a[:,2]*h,a[:,3]*w,a[:,4]*h
+    return a[:,0].astype(int),np.stack([cx-bw/2,cy-bh/2,cx+bw/2,cy+bh/2],1)
+
+def iou_matrix(a,b):
+    """Pairwise IoU of (N,4) × (M,4) xyxy boxes."""
+    if not len(a) or not len(b): return np.zeros((len(a),len(b)),np.float32)
+    tl=np.maximum(a[:,None,:2],b[None,:,:2]); br=np.minimum(a[:,None,2:],b[None,:,2:])
+    inter=np.prod(np.clip(br-tl,0,None),2)
+    area=lambda x: (x[:,2]-x[:,0])*(x[:,3]-x[:,1])
+    return inter/(area(a)[:,None]+area(b)[None,:]-inter+1e-9)
+
+def match(p_cls,p_box,p_conf,g_cls,g_box,iou_thr=0.5):
+    """Greedy same-class matching by descending conf → tp flag per prediction."""
+    tp=np.zeros(len(p_cls),bool); used=np.zeros(len(g_cls),bool)
+    iou=iou_matrix(p_box,g_box)
+    for i in np.argsort(-p_conf):
+        cand=np.where((g_cls==p_cls[i])&~used)[0]
+        if not len(cand): continue
+        j=cand[np.argmax(iou[i,cand])]
+        if iou[i,j]>=iou_thr: tp[i]=used[j]=True
+    return tp
+
+def average_precision(conf,tp,n_gt):
+    """All-point interpolated AP from every prediction's (conf, tp) of one class."""
+    if n_gt==0 or not len(conf): return 0.0
+    o=np.argsort(-conf); tpc=np.cumsum(tp[o]); fpc=np.cumsum(~tp[o])
+    rec=np.concatenate([[0],tpc/n_gt,[1]]); prec=np.concatenate([[1],tpc/(tpc+fpc),[0]])
+    prec=np.maximum.accumulate(prec[::-1])[::-1]
+    i=np.flatnonzero(rec[1:]!=rec[:-1])
+    return float(((rec[i+1]-rec[i])*prec[i+1]).sum())
+
+def dataset(images,labels):
+    imgs=sorted(Path(images).glob("*.jpg"))+sorted(Path(images).glob("*.png"))
+    if not imgs: raise SystemExit(f"❌  No images in {images}")
+    return [(p,Path(labels)/f"{p.stem}.txt") for p in imgs]
+
+def read_frames(pairs):
+    """Decode every image of dataset() pairs → (pairs, frames), unreadable ones dropped."""
+    out=[(pl,cv2.imread(str(pl[0]))) for pl in pairs]
+    bad=[str(pl[0]) for pl,f in out if f is None]
+    if bad: print(f"⚠️  {len(bad)} unreadable image(s) skipped, e.g. {bad[0]}")
+    out=[(pl,f) for pl,f in out if f is not None]
+    if not out: raise SystemExit("❌  No readable images")
+    return [pl for pl,_ in out],[f for _,f in out]
+
+def run(model,pairs,imgsz,conf,iou,match_iou,n_cls,warmup=3):
+    tp=np.zeros(n_cls); fp=np.zeros(n_cls); fn=np.zeros(n_cls); lat=[]
+    for k,(ip,lp) in enumerate(pairs):
+        frame=cv2.imread(str(ip)); h,w=frame.shape[:2]
+        t0=time.perf_counter()
+        res=model(frame,imgsz=imgsz,conf=conf,iou=iou,verbose=False)[0]
+        dt=(time.perf_counter()-t0)*1000
+        if k>=warmup: lat.append(dt)
+        p_box,p_cls,p_conf=to_numpy(res); p_cls=p_cls.astype(int)
+        g_cls,g_box=load_labels(lp,w,h)
+        ok=match(p_cls,p_box,p_conf,g_cls,g_box,match_iou)
+        np.add.at(tp,p_cls[ok],1); np.add.at(fp,p_cls[~ok],1)
+        np.add.at(fn,g_cls,1); np.add.at(fn,p_cls[ok],-1)
+    return tp,fp,fn,np.array(lat or [0.0])
+
+def report(name,tp,fp,fn,lat,names):
+    print(f"\n▶ {name}   mean={lat.mean():6.2f} ms   p95={np.percentile(lat,95):6.2f} ms"
+          f"   ({1000/max(lat.mean(),1e-6):5.1f} img/s)")
+    print(f"  {'class':8} {'gt':>5} {'tp':>5} {'fp':>5} {'P':>6} {'R':>6}")
+    for c,n in enumerate(names):
+        if tp[c]+fp[c]+fn[c]==0: continue
+        P=tp[c]/max(tp[c]+fp[c],1); R=tp[c]/max(tp[c]+fn[c],1)
+        print(f"  {n:8} {int(tp[c]+fn[c]):5} {int(tp[c]):5} {int(fp[c]):5} {P:6.3f} {R:6.3f}")
+    T,F,N=tp.sum(),fp.sum(),fn.sum()
+    print(f"  {'all':8} {int(T+N):5} {int(T):5} {int(F):5} {T/max(T+F,1):6.3f} {T/max(T+N,1):6.3f}")
+
+def parse():
+    ap=argparse.ArgumentParser(formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+    ap.add_argument("--models",nargs="+",default=["color"],
+                    help="'color' and/or .pt weight paths")
+    ap.add_argument("--images",default=str(ROOT/"ss"/"images"))
+    ap.add_argument("--labels",default=str(ROOT/"ss"/"labels"))
+    ap.add_argument("--imgsz",type=int,default=416)
+    ap.add_argument("--conf",type=float,default=0.70)
+    ap.add_argument("--iou",type=float,default=0.50,help="NMS IoU (YOLO only)")
+    ap.add_argument("--match",type=float,default=0.50,help="IoU for a true positive")
+    ap.add_argument("--limit",type=int,default=0,help="use only the first N images")
+    return ap.parse_args()
+
+def main():
+    args=parse(); names=class_names()
+    pairs=dataset(args.images,args.labels)
+    if args.limit: pairs=pairs[:args.limit]
+    print(f"📂  {len(pairs)} images from {args.images}")
+    for spec in args.models:
+        model=load_detector(spec)
+        report(spec,*run(model,pairs,args.imgsz,args.conf,args.iou,args.match,len(names)),names)
+
+if __name__=="__main__":
+    main()
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+bench_hpsp.py  –  per-read latency / accuracy of the HP/SP readers
+────────────────────────────────────────────────────────────────────────────
+Usage
+    python src/bench_hpsp.py                        # corpus = ragnarok-dataset/hpsp_crops
+    python src/bench_hpsp.py --corpus my_crops --repeat 20
+---------------------------------------------------------------------------
+  tesseract   old test_rag path: upscale ×3 + Otsu + image_to_string
+  template    HpSpReader with the hash cache defeated (every read decodes)
+  stream      HpSpReader on the crops in recorded order (cache hits count)
+Glyphs are seeded from --templates (default: the same corpus), so the
+template accuracy is on SEEN crops – it shows the glyphs were learned, not
+that unseen values read.  Digits with no template (the corpus has no '0')
+are printed as a known gap; they fall back to Tesseract until real crops
+holding them are recorded (HpSpReader(record_dir=…)) and added to truth.txt.
+"""
+import argparse, time
+from pathlib import Path
+import cv2, numpy as np
+import hpsp_reader as H
+
+def load(corpus):
+    rows=[]
+    for ln in open(Path(corpus)/"truth.txt",encoding="utf-8"):
+        name,_,txt=ln.rstrip("\n").partition("\t")
+        img=cv2.imread(str(Path(corpus)/name))
+        if img is not None: rows.append((img,H.parse(txt)))
+    if not rows: raise SystemExit(f"❌  No crops in {corpus}")
+    return rows
+
+def bench(name,fn,rows,repeat):
+    lat=[]; ok=0
+    for _ in range(repeat):
+        for img,truth in rows:
+            t0=time.perf_counter(); v=fn(img); lat.append((time.perf_counter()-t0)*1000)
+            ok+= v==truth
+    lat=np.array(lat)
+    print(f"  {name:10} mean={lat.mean():8.3f} ms  p50={np.percentile(lat,50):8.3f}"
+          f"  p99={np.percentile(lat,99):8.3f}  acc={ok/len(lat):6.1%}")
+
+def main():
+    ap=argparse.ArgumentParser(formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+    ap.add_argument("--corpus",default=str(H.CORPUS))
+    ap.add_argument("--templates",default=str(H.CORPUS),help="corpus used to seed the glyphs")
+    ap.add_argument("--repeat",type=int,default=5)
+    args=ap.parse_args()
+    rows=load(args.corpus)
+    print(f"📂  {len(rows)} crops from {args.corpus}")
+
+    if H.pytesseract is not None:
+        reader=H.HpSpReader(corpus=None)
+        bench("tesseract",lambda im: H.parse(reader.tesseract(im)),rows,1)
+    else:
+        print("  tesseract  (pytesseract not installed – skipped)")
+
+    cold=H.HpSpReader(corpus=args.templates,tesseract=False)
+    gap=set("0123456789")-set(cold.exact.values())
+    if gap: print(f"  known gap: no template for {''.join(sorted(gap))} (Tesseract fallback only)")
+    def no_cache(im): cold.last_hash=None; cold.value=None; return cold.read_crop(im)
+    bench("template",no_cache,rows,args.repeat)
+
+    warm=H.HpSpReader(corpus=args.templates,tesseract=False)
+    bench("stream",warm.read_crop,rows,args.repeat)
+    print(f"  stream counters: {warm.fmt()}")
+
+if __name__=="__main__":
+    main()
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+bench_loop.py  –  run the real test_rag decision loop on a recorded session
+---------------------------------------------------------------------------
+Usage
+    python src/bench_loop.py ss/images --fast                   # as fast as possible
+    python src/bench_loop.py sessions/farm1.raw                 # real-time replay
+    python src/bench_loop.py session.mp4 --detector color
+    python src/bench_loop.py ss/images --fast --trace runs/v12.jsonl
+    python src/bench_loop.py sessions/farm1.raw --chrome farm1.trace.json
+---------------------------------------------------------------------------
+Imports test_rag as a module (no game window / interception needed: inputs
+go to the null backend, or to a JSONL trace with --trace), swaps in a
+frame_source replay, and runs main() until the source ends.  Prints
+per-stage latency (mean / p50 / p95 / p99, from the tracing.py spans, incl.
+e2e = frame grab → last input sent) and FPS.  Traces of two bot versions on
+the same --fast replay can be compared with
+    python src/input_backend.py diff old.jsonl new.jsonl
+Samples are written to a temp dir so the real captured_dataset stays clean.
+"""
+import argparse, tempfile, time
+
+def main():
+    ap=argparse.ArgumentParser(formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+    ap.add_argument("source",help="video file, image dir or .raw recording")
+    ap.add_argument("--fast",action="store_true",help="ignore timestamps, replay ASAP")
+    ap.add_argument("--detector",default=None,help="override test_rag.DETECTOR")
+    ap.add_argument("--no-gate",action="store_true",help="disable the motion gate")
+    ap.add_argument("--adaptive",action="store_true",help="let controller.py move FRAME_SKIP / OCR_SKIP / IMG_SZ")
+    ap.add_argument("--procs",action="store_true",help="PROCESS_MODE: capture / OCR / inference processes")
+    ap.add_argument("--trace",default=None,help="record every input action to this JSONL")
+    ap.add_argument("--chrome",default=None,help="write a Chrome / Perfetto trace here")
+    args=ap.parse_args()
+
+    import test_rag as bot
+    if args.detector: bot.DETECTOR=args.detector
+    if args.no_gate: bot.MOTION_GATE=False
+    if args.procs: bot.PROCESS_MODE=True
+    bot.ADAPTIVE=args.adaptive                              # fixed knobs → comparable runs
+    bot.PROFILE_EVERY=1e9                                   # quiet; summary below
+    bot.TRACE_OUT=args.chrome
+    tmp=tempfile.mkdtemp(prefix="bench_loop_")
+    bot.init(args.source,realtime=not args.fast,capture_dir=tmp,
+             input_backend=f"record:{args.trace}" if args.trace else "null")
+
+    t0=time.perf_counter(); bot.main(); wall=time.perf_counter()-t0
+    n=len(bot.tracer.durations("dec"))
+    print(f"\n▶ {args.source}  {'fast' if args.fast else 'real-time'}  "
+          f"{n} decisions in {wall:.2f}s  →  {n/wall:5.1f} fps"
+          f"  (cap dropped {bot.frames.dropped})")
+    print(bot.tracer.summary())
+    print(f"  {bot.gate.fmt()} | {bot.writer.fmt()} {bot.policy.fmt()} | {bot.hpsp.fmt()}")
+    if args.trace: print(f"  {bot.inp.n} input events → {args.trace}")
+
+if __name__=="__main__":
+    main()
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+bench_models.py  –  accuracy × latency for every checkpoint, every setting
+────────────────────────────────────────────────────────────────────────────
+Usage
+    python src/bench_models.py                                  # models/*.pt|*.onnx (+ models.txt paths)
+    python src/bench_models.py --models models/best_v12n2.pt models/YOLOV12N_5090.pt color \\
+                               --imgsz 320 416 --conf 0.5 0.7 --iou 0.5
+    python src/bench_models.py --json runs/bench_0612.json --compare runs/bench_0601.json
+---------------------------------------------------------------------------
+Each model runs in a fresh interpreter (cold start and RSS are real):
+  load      import + model load (s)          first    first inference (ms)
+  rss       peak RSS of the child (MB)       p50/p99  CPU latency per frame at that setting
+  P / R     per class + all, at that conf    AP50     per class; mAP50 / mAP50-95 overall
+Per (imgsz, iou) one conf=0.001 pass gives AP and P/R at every --conf (greedy
+matching by descending conf makes a threshold an exact prefix); latency is
+timed in a separate pass per conf.
+
+The JSON holds every row, the Pareto frontier (p50 ↓ vs --metric ↑) and the
+run settings; --compare prints per-row deltas against an older file and
+flags regressions (metric −0.01 or p50 +10 %).
+"""
+import argparse, json, os, subprocess, sys, time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+IOUS = [0.50+0.05*k for k in range(10)]           # mAP50-95
+
+def discover():
+    """models/*.pt|*.onnx plus local paths listed in models/models.txt."""
+    d=ROOT/"models"; found=sorted(d.glob("*.pt"))+sorted(d.glob("*.onnx"))
+    txt=d/"models.txt"
+    if txt.exists():
+        for ln in txt.read_text().split():
+            p=(d/ln) if not Path(ln).is_absolute() else Path(ln)
+            if "://" not in ln and p.exists() and p not in found: found.append(p)
+    return [str(p) for p in found]
+
+# ── child: one model, every setting ──────────────────────────────────────────
+def child(args):
+    for k in ("OMP_NUM_THREADS","MKL_NUM_THREADS","OPENBLAS_NUM_THREADS"): os.environ[k]=str(args.threads)
+    t0=time.perf_counter()
+    import cv2, numpy as np
+    cv2.setNumThreads(args.threads)
+    from detectors import load_detector, to_numpy
+    from bench_detectors import class_names, dataset, read_frames, load_labels, match, average_precision
+    from bench_onnx import peak_rss_mb
+    spec=args.models[0]; model=load_detector(spec); load_s=time.perf_counter()-t0
+    pairs=dataset(args.images,args.labels)[:args.limit or None]
+    pairs,frames=read_frames(pairs)
+    gts=[load_labels(l,f.shape[1],f.shape[0]) for (_,l),f in zip(pairs,frames)]
+    t0=time.perf_counter()
+    model(frames[0],imgsz=args.imgsz[0],conf=args.conf[0],iou=args.iou[0],verbose=False)
+    first_ms=(time.perf_counter()-t0)*1000
+    names=class_names(); n_cls=len(names)
+    n_gt=np.bincount(np.concatenate([g for g,_ in gts]).astype(int),minlength=n_cls)
+    rows=[]
+    for sz in args.imgsz:
+        for iou in args.iou:
+            for f in frames[:3]: model(f,imgsz=sz,conf=0.001,iou=iou,verbose=False)     # warm-up
+            cls_l,cf_l,ok_l=[],[],[]                                  # eval pass, conf 0.001
+            for f,(g_cls,g_box) in zip(frames,gts):
+                box,cls,cf=to_numpy(model(f,imgsz=sz,conf=0.001,iou=iou,verbose=False)[0])
+                cls=cls.astype(int)
+                cls_l.append(cls); cf_l.append(cf)
+                ok_l.append(np.stack([match(cls,box,cf,g_cls,g_box,t) for t in IOUS],1))
+            cls=np.concatenate(cls_l); cf=np.concatenate(cf_l); ok=np.concatenate(ok_l).reshape(-1,len(IOUS))
+            ap=np.array([[average_precision(cf[cls==c],ok[cls==c,j],n_gt[c]) for j in range(len(IOUS))]
+                         for c in range(n_cls)])
+            has=n_gt>0
+            for conf in args.conf:
+                lat=[]
+                for f in frames:
+                    t=time.perf_counter(); model(f,imgsz=sz,conf=conf,iou=iou,verbose=False)
+                    lat.append((time.perf_counter()-t)*1000)
+                k=cf>=conf; per={}
+                for c in range(n_cls):
+                    m=k&(cls==c); tp=int(ok[m,0].sum())
+                    per[names[c]]={"n_gt":int(n_gt[c]),"n_pred":int(m.sum()),"P":tp/max(int(m.sum()),1),
+                                   "R":tp/max(int(n_gt[c]),1),"AP50":float(ap[c,0]),"AP50_95":float(ap[c].mean())}
+                tp=int(ok[k,0].sum())
+                rows.append({"model":spec,"imgsz":sz,"conf":conf,"iou":iou,"load_s":load_s,
+                    "first_ms":first_ms,"mean":float(np.mean(lat)),
+                    "p50":float(np.percentile(lat,50)),"p99":float(np.percentile(lat,99)),
+                    "P":tp/max(int(k.sum()),1),"R":tp/max(int(n_gt.sum()),1),
+                    "mAP50":float(ap[has,0].mean()) if has.any() else 0.0,
+                    "mAP50_95":float(ap[has].mean()) if has.any() else 0.0,"per_class":per})
+    rss=peak_rss_mb()                                              # whole-child peak, after the last pass
+    for r in rows: print(json.dumps({**r,"rss_mb":rss}),flush=True)
+
+# ── parent: fan out, table, Pareto, compare ──────────────────────────────────
+def key(r): return (r["model"],r["imgsz"],r["conf"],r["iou"])
+
+def pareto(rows,metric):
+    """Rows not dominated by any other (lower-or-equal p50 AND higher-or-equal metric)."""
+    return [r for r in rows if not any(o is not r and o["p50"]<=r["p50"] and o[metric]>=r[metric]
+                                       and (o["p50"]<r["p50"] or o[metric]>r[metric]) for o in rows)]
+
+def compare(rows,old_path,metric):
+    old={key(r):r for r in json.loads(Path(old_path).read_text())["rows"]}
+    print(f"\nΔ vs {old_path}")
+    for r in rows:
+        o=old.get(key(r))
+        if o is None: continue
+        dm=r[metric]-o[metric]; dl=(r["p50"]-o["p50"])/max(o["p50"],1e-9)
+        flag="  ⚠️ regression" if dm<-0.01 or dl>0.10 else ""
+        print(f"  {Path(r['model']).name[-28:]:28} {r['imgsz']:4} {r['conf']:.2f} {r['iou']:.2f}"
+              f"  {metric} {dm:+.3f}  p50 {dl*100:+5.1f}%{flag}")
+
+def parse():
+    ap=argparse.ArgumentParser(formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+    ap.add_argument("--models",nargs="+",default=None,help="load_detector() specs (default: models/ + models.txt)")
+    ap.add_argument("--images",default=str(ROOT/"ss"/"images"))
+    ap.add_argument("--labels",default=str(ROOT/"ss"/"labels"))
+    ap.add_argument("--imgsz",type=int,nargs="+",default=[416])
+    ap.add_argument("--conf",type=float,nargs="+",default=[0.50,0.70])
+    ap.add_argument("--iou",type=float,nargs="+",default=[0.50])
+    ap.add_argument("--threads",type=int,default=4,help="CPU threads per model (torch / ORT / OpenCV)")
+    ap.add_argument("--limit",type=int,default=0)
+    ap.add_argument("--metric",default="mAP50",choices=("mAP50","mAP50_95","P","R"))
+    ap.add_argument("--json",default=None,help="default: bench_models_<date>.json")
+    ap.add_argument("--compare",default=None,help="older --json file to diff against")
+    ap.add_argument("--child",action="store_true",help=argparse.SUPPRESS)
+    return ap.parse_args()
+
+def main():
+    args=parse()
+    if args.child: return child(args)
+    specs=args.models or discover()
+    if not specs: raise SystemExit("❌ no models in models/ – pass --models (e.g. color)")
+    rows=[]
+    for spec in specs:
+        cmd=[sys.executable,__file__,"--models",spec,"--child","--images",args.images,"--labels",args.labels,
+             "--threads",str(args.threads),"--limit",str(args.limit)]
+        for k in ("imgsz","conf","iou"): cmd+=[f"--{k}",*map(str,getattr(args,k))]
+        print(f"⏱️  {spec} …",flush=True)
+        out=subprocess.run(cmd,capture_output=True,text=True)
+        if out.returncode: print(f"❌ {spec}\n{out.stderr.strip()[-800:]}"); continue
+        for l in out.stdout.splitlines():
+            if l.startswith("{"): rows.append(json.loads(l))
+            elif l.strip(): print(f"  {l}")                          # child warnings
+
+    front=pareto(rows,args.metric); fk={key(r) for r in front}
+    print(f"\n{'model':28} {'sz':>4} {'conf':>5} {'iou':>5} {'load':>6} {'first':>7} {'rss':>5}"
+          f" {'p50':>7} {'p99':>7} {'P':>6} {'R':>6} {'mAP50':>6} {'50-95':>6}")
+    for r in sorted(rows,key=lambda r:r["p50"]):
+        print(f"{Path(r['model']).name[-28:]:28} {r['imgsz']:4} {r['conf']:5.2f} {r['iou']:5.2f}"
+              f" {r['load_s']:6.2f} {r['first_ms']:7.1f} {r['rss_mb']:5.0f} {r['p50']:7.2f} {r['p99']:7.2f}"
+              f" {r['P']:6.3f} {r['R']:6.3f} {r['mAP50']:6.3f} {r['mAP50_95']:6.3f}{'  ★' if key(r) in fk else ''}")
+    print(f"★ = Pareto frontier (p50 vs {args.metric})")
+    for r in sorted(front,key=lambda r:-r[args.metric])[:1]:          # most accurate frontier point
+        print(f"\nper class – {Path(r['model']).name} @ {r['imgsz']}/{r['conf']}/{r['iou']}")
+        print(f"  {'class':8} {'gt':>5} {'pred':>5} {'P':>6} {'R':>6} {'AP50':>6} {'50-95':>6}")
+        for n,c in r["per_class"].items():
+            if c["n_gt"] or c["n_pred"]:
+                print(f"  {n:8} {c['n_gt']:5} {c['n_pred']:5} {c['P']:6.3f} {c['R']:6.3f} {c['AP50']:6.3f} {c['AP50_95']:6.3f}")
+    path=Path(args.json or f"bench_models_{time.strftime('%Y%m%d_%H%M%S')}.json")
+    path.parent.mkdir(parents=True,exist_ok=True)
+    path.write_text(json.dumps({"settings":{k:v for k,v in vars(args).items() if k not in ("child","json","compare")},
+                                "models":specs,"rows":rows,"pareto":[list(key(r)) for r in front]},indent=1))
+    print(f"\n💾 {len(rows)} rows → {path}")
+    if args.compare: compare(rows,args.compare,args.metric)
+
+if __name__=="__main__":
+    main()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+bench_onnx.py  –  Ultralytics vs ONNX Runtime (FP32 / INT8) on the same frames
+────────────────────────────────────────────────────────────────────────────
+Usage
+    python src/bench_onnx.py models/best_v12n2.pt models/best_v12n2.onnx \\
+                             models/best_v12n2.int8.onnx models/best_v12n2.onnx@openvino
+    python src/bench_onnx.py color models/best_v12n2.onnx --limit 100 --json onnx.json
+---------------------------------------------------------------------------
+Each model runs in its own fresh interpreter, so the numbers include what a
+headless node actually pays:
+  load     import + model load (s)          first   first inference (ms)
+  p50/p95  steady-state latency per frame   rss     peak RSS after load + 1st run (MB)
+  P / R    at --conf, IoU ≥ --match         mAP50   from a second pass at conf 0.001
+"""
+import argparse, json, subprocess, sys, time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+def peak_rss_mb():
+    try:
+        import psutil; m=psutil.Process().memory_info()
+        if hasattr(m,"peak_wset"): return m.peak_wset/2**20     # Windows: true peak
+    except ImportError: pass
+    import resource                                             # POSIX: ru_maxrss in KiB (bytes on macOS)
+    r=resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return r/2**20 if sys.platform=="darwin" else r/1024
+
+def child(args):
+    """Benchmark one model in this process and print one JSON line."""
+    t0=time.perf_counter()
+    import cv2, numpy as np
+    from detectors import load_detector, to_numpy
+    from bench_detectors import class_names, dataset, load_labels, match, average_precision
+    model=load_detector(args.models[0]); load_s=time.perf_counter()-t0
+    pairs=dataset(args.images,args.labels)[:args.limit or None]
+    f=cv2.imread(str(pairs[0][0])); t0=time.perf_counter()
+    model(f,imgsz=args.imgsz,conf=args.conf,iou=args.iou,verbose=False)
+    first_ms=(time.perf_counter()-t0)*1000; rss=peak_rss_mb()    # model + runtime only
+
+    n_cls=len(class_names()); gts=[]
+    def sweep(conf,timed):
+        lat=[]; recs=[]
+        for k,(ip,lp) in enumerate(pairs):
+            f=cv2.imread(str(ip))
+            if len(gts)<=k: gts.append(load_labels(lp,f.shape[1],f.shape[0]))
+            g_cls,g_box=gts[k]; t=time.perf_counter()
+            res=model(f,imgsz=args.imgsz,conf=conf,iou=args.iou,verbose=False)[0]
+            if timed: lat.append((time.perf_counter()-t)*1000)
+            box,cls,cf=to_numpy(res); cls=cls.astype(int)
+            recs.append((cls,cf,match(cls,box,cf,g_cls,g_box,args.match)))
+        return lat,recs
+    lat,recs=sweep(args.conf,True)
+    tp=sum(int(ok.sum()) for _,_,ok in recs); npred=sum(len(ok) for _,_,ok in recs)
+    n_gt=np.bincount(np.concatenate([g for g,_ in gts]).astype(int),minlength=n_cls)
+    _,recs=sweep(0.001,False)
+    cls=np.concatenate([r[0] for r in recs]); cf=np.concatenate([r[1] for r in recs])
+    ok=np.concatenate([r[2] for r in recs])
+    aps=[average_precision(cf[cls==c],ok[cls==c],n_gt[c]) for c in range(n_cls) if n_gt[c]]
+    print(json.dumps({"model":args.models[0],"load_s":load_s,"first_ms":first_ms,
+        "p50":float(np.percentile(lat,50)),"p95":float(np.percentile(lat,95)),
+        "mean":float(np.mean(lat)),"rss_mb":rss,"P":tp/max(npred,1),
+        "R":tp/max(int(n_gt.sum()),1),"mAP50":float(np.mean(aps)) if aps else 0.0}))
+
+def parse():
+    ap=argparse.ArgumentParser(formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+    ap.add_argument("models",nargs="+",help=".pt / .onnx[@openvino] / color")
+    ap.add_argument("--images",default=str(ROOT/"ss"/"images"))
+    ap.add_argument("--labels",default=str(ROOT/"ss"/"labels"))
+    ap.add_argument("--imgsz",type=int,default=416)
+    ap.add_argument("--conf",type=float,default=0.70)
+    ap.add_argument("--iou",type=float,default=0.50)
+    ap.add_argument("--match",type=float,default=0.50)
+    ap.add_argument("--limit",type=int,default=0)
+    ap.add_argument("--json",default=None,help="also write the rows here")
+    ap.add_argument("--child",action="store_true",help=argparse.SUPPRESS)
+    return ap.parse_args()
+
+def main():
+    args=parse()
+    if args.child: return child(args)
+    rows=[]
+    for spec in args.models:
+        cmd=[sys.executable,__file__,spec,"--child"]+[a for k,v in vars(args).items()
+             if k not in ("models","child","json") for a in (f"--{k}",str(v))]
+        out=subprocess.run(cmd,capture_output=True,text=True)
+        if out.returncode: print(f"❌ {spec}\n{out.stderr.strip()[-800:]}"); continue
+        rows.append(json.loads(out.stdout.strip().splitlines()[-1]))
+    print(f"\n{'model':40} {'load s':>7} {'first':>7} {'p50':>7} {'p95':>7} {'rss MB':>7}"
+          f" {'P':>6} {'R':>6} {'mAP50':>6}")
+    for r in rows:
+        print(f"{r['model'][-40:]:40} {r['load_s']:7.2f} {r['first_ms']:7.1f} {r['p50']:7.2f}"
+              f" {r['p95']:7.2f} {r['rss_mb']:7.0f} {r['P']:6.3f} {r['R']:6.3f} {r['mAP50']:6.3f}")
+    if args.json: Path(args.json).write_text(json.dumps(rows,indent=1))
+
+if __name__=="__main__":
+    main()
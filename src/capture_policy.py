@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+capture_policy.py  –  uncertainty-driven dataset capture (active learning)
+────────────────────────────────────────────────────────────────────────────
+Instead of "one frame every CAPTURE_EVERY s while anything is on screen",
+every decision frame is scored and only the most informative ones are kept:
+
+  conf      a box close above CONF_THRES (1 at the threshold, 0 at +band)
+  churn     tracks / boxes that appeared or vanished since the last frame
+  disagree  1 − F1 against a cheap secondary detector (colour HSV), IoU ≥ 0.3
+
+observe() (bot thread, ~20 µs) computes conf + churn and keeps a small pool
+of the best candidates (frame copied only when it enters the pool).  At the
+end of each window the pool is re-ranked with the secondary detector on a
+side thread, the top-k above min_score are handed to the SampleWriter while
+a byte budget (token bucket, bytes/s, sized from the writer's real JPEGs)
+lasts, and each kept sample carries its reasons into the manifest's `why`.
+
+    pol=CapturePolicy(writer,conf_thres=0.70,window=10,top_k=2,budget=40_000)
+    pol.observe(frame,d,ds,now)            # d = spatial.records(res), ds = rows to label
+    pol.close()                            # shutdown: flush the partial window, before writer.close()
+"""
+
+import heapq, threading, time
+import numpy as np
+from spatial import boxes
+from tracker import iou_matrix
+
+class CapturePolicy:
+    def __init__(self,writer,conf_thres=0.70,band=0.15,window=10.0,top_k=2,budget=40_000,
+                 min_score=0.25,secondary=None,weights=(1.0,1.0,1.0),copy=True):
+        self.writer=writer; self.thr=conf_thres; self.band=band
+        self.window=window; self.k=top_k; self.budget=budget; self.min_score=min_score
+        self.secondary=secondary; self.w=weights; self.copy=copy
+        self.pool=[]; self.t0=None; self.tokens=budget*window; self.n=0
+        self.prev_ids=None; self.prev_hist=np.zeros(256,np.int32)
+        self.seen=self.kept=self.low=self.over_budget=0
+        self.lock=threading.Lock()             # tokens + counters: bot thread vs flush threads
+        self.sec_lock=threading.Lock()         # secondary detectors reuse internal buffers
+        self.flushers=[]
+
+    # ── cheap per-frame signals ──────────────────────────────────────────
+    def conf_score(self,d):
+        if not len(d): return 0.0
+        return float(np.clip(1-(d["conf"].min()-self.thr)/self.band,0,1))
+
+    def churn_score(self,d):
+        """Appeared + vanished objects: track ids when the tracker runs, else
+        the per-class count difference.  3+ changes → 1."""
+        hist=np.bincount(d["cls"],minlength=256)
+        if len(d) and (d["id"]>=0).all() and self.prev_ids is not None:
+            ch=len(self.prev_ids.symmetric_difference(d["id"].tolist()))
+        else: ch=int(np.abs(hist-self.prev_hist).sum())
+        self.prev_ids=set(d["id"].tolist()) if len(d) and (d["id"]>=0).all() else None
+        self.prev_hist=hist
+        return min(ch/3,1.0)
+
+    def observe(self,frame,d,ds,now=None):
+        """Score one decision frame; keeps it in the window pool if it is
+        among the best 2·k so far (the secondary gets the final say)."""
+        now=now or time.time()
+        with self.lock: self.seen+=1
+        if self.t0 is None: self.t0=now
+        c,ch=self.conf_score(d),self.churn_score(d)
+        s=self.w[0]*c+self.w[1]*ch
+        if len(self.pool)<2*self.k or s>self.pool[0][0]:
+            self.n+=1
+            item=(s,self.n,now,frame.copy() if self.copy else frame,d.copy(),ds,
+                  {"conf":round(c,3),"churn":round(ch,3)})
+            (heapq.heapreplace if len(self.pool)>=2*self.k else heapq.heappush)(self.pool,item)
+        if now-self.t0>=self.window:
+            pool=self.rotate(now)
+            if pool:
+                th=threading.Thread(target=self.flush,args=(pool,),daemon=True); th.start()
+                self.flushers=[t for t in self.flushers if t.is_alive()]+[th]
+
+    def rotate(self,now):
+        """Close the window: take the pool, refill the token bucket."""
+        pool,self.pool=self.pool,[]
+        with self.lock:
+            self.tokens=min(self.tokens+self.budget*(now-self.t0),self.budget*self.window*2)
+        self.t0=now
+        return pool
+
+    def close(self,timeout=5.0):
+        """Wait for pending flushes, then flush the last partial window here."""
+        for th in self.flushers: th.join(timeout)
+        self.flushers=[]
+        if self.t0 is not None and self.pool: self.flush(self.rotate(time.time()))
+
+    # ── window end: secondary re-rank, top-k, byte budget ────────────────
+    def disagree(self,frame,d):
+        with self.sec_lock: res=self.secondary(frame,conf=0.25,verbose=False)[0]
+        b=np.asarray(res.boxes.xyxy,np.float32).reshape(-1,4); c=np.asarray(res.boxes.cls).astype(int)
+        if not len(d) and not len(b): return 0.0
+        a=np.stack([d["x1"],d["y1"],d["x2"],d["y2"]],1)
+        m=iou_matrix(a,b)>=0.3; m&=d["cls"][:,None].astype(int)==c[None,:]
+        hit=min(int(m.any(1).sum()),int(m.any(0).sum()))
+        return 1-2*hit/(len(d)+len(b))
+
+    def flush(self,pool):
+        ranked=[]
+        for s,_,t,frame,d,ds,why in pool:
+            if self.secondary is not None:
+                dis=self.disagree(frame,d); why["disagree"]=round(dis,3); s+=self.w[2]*dis
+            why["score"]=round(s,3); ranked.append((s,t,frame,boxes(ds),why))
+        ranked.sort(key=lambda r:-r[0])
+        est=self.writer.bytes/self.writer.written if self.writer.written else 200_000
+        for rank,(s,t,frame,labels,why) in enumerate(ranked[:self.k]):
+            with self.lock:
+                if s<self.min_score: self.low+=1; continue
+                if self.tokens<est: self.over_budget+=1; continue
+                self.tokens-=est                    # reserve; refunded if the writer refuses
+            why["rank"]=rank                        # own ts → no name clash, no rate limit
+            ok=self.writer.submit(frame,labels,why=why,fid=-1,ts=t)
+            with self.lock:
+                if ok: self.kept+=1
+                else: self.tokens+=est
+
+    def fmt(self):
+        with self.lock: return f"al {self.kept}/{self.seen} low={self.low} budget={self.over_budget}"
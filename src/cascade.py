@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+cascade.py  –  two-stage resolution cascade around any detector
+────────────────────────────────────────────────────────────────────────────
+  1. coarse   whole frame at a very small input (256) with a low conf floor
+  2. pick     candidates that are uncertain (pre_conf ≤ conf < CONF_THRES) or
+              small (max side < `small` px, e.g. pink cards at 1080p)
+  3. refine   native-resolution crop×crop windows around them (a window
+              already holding a candidate is reused), all crops in ONE
+              batched call at imgsz=crop → 1:1 pixels for small objects
+  4. merge    coarse boxes fully inside a window are replaced by the fine
+              ones; fine boxes cut by an inner window edge are dropped (the
+              coarse box covers that object); per-class NMS; conf ≥ CONF_THRES
+
+Called exactly like the wrapped detector, so test_rag's detect() and the
+motion-gate ROI path need no changes:
+
+    model=Cascade(load_detector("models/best_v12n2.pt"),coarse=256,crop=320)
+    res=model(frame,imgsz=IMG_SZ,conf=CONF_THRES,iou=IOU_THRES)[0]   # imgsz unused
+    model.last          # (candidates, crops) of the last call, for [DBG] / bench
+
+A fixed-shape backend (exported ONNX) needs one model per size:
+Cascade(coarse_model,fine=fine_model).
+"""
+
+import numpy as np
+from detectors import make_result, to_numpy
+from onnx_detector import nms
+
+EMPTY=(np.zeros((0,4),np.float32),np.zeros(0,np.float32),np.zeros(0,np.float32))
+
+class Cascade:
+    def __init__(self,model,coarse=256,crop=320,fine=None,pre_conf=0.15,small=40,max_crops=4):
+        self.model=model; self.fine=fine or model
+        self.coarse=coarse; self.crop=crop; self.pre_conf=pre_conf
+        self.small=small; self.max_crops=max_crops; self.last=(0,0)
+
+    def __getattr__(self,k): return getattr(self.model,k)
+
+    def windows(self,xyxy,order,h,w):
+        """Crop windows (x1,y1,x2,y2) covering the candidates, most urgent first."""
+        c=self.crop; win=[]
+        for i in order:
+            x1,y1,x2,y2=xyxy[i]
+            if any(a<=x1 and b<=y1 and x2<=cx and y2<=cy for a,b,cx,cy in win): continue
+            if len(win)>=self.max_crops: break
+            ax=int(np.clip((x1+x2)/2-c/2,0,max(w-c,0))); ay=int(np.clip((y1+y2)/2-c/2,0,max(h-c,0)))
+            win.append((ax,ay,min(ax+c,w),min(ay+c,h)))
+        return win
+
+    def refine(self,frame,win,iou):
+        crops=[frame[y1:y2,x1:x2] for x1,y1,x2,y2 in win]
+        if hasattr(self.fine,"predict") and len(crops)>1:         # Ultralytics: one batched pass
+            res=self.fine(crops,imgsz=self.crop,conf=self.pre_conf,iou=iou,verbose=False)
+        else:
+            res=[self.fine(c,imgsz=self.crop,conf=self.pre_conf,iou=iou,verbose=False)[0] for c in crops]
+        h,w=frame.shape[:2]; out=[]
+        for (x1,y1,x2,y2),r in zip(win,res):
+            b,c,f=to_numpy(r)
+            cut=((b[:,0]<=1)&(x1>0))|((b[:,1]<=1)&(y1>0))|((b[:,2]>=x2-x1-1)&(x2<w))|((b[:,3]>=y2-y1-1)&(y2<h))
+            b=b[~cut]+np.float32([x1,y1,x1,y1]); out.append((b,c[~cut],f[~cut]))
+        return [np.concatenate(a) for a in zip(*out)]
+
+    def __call__(self,frame,imgsz=None,conf=0.25,iou=0.45,verbose=False,**_):
+        h,w=frame.shape[:2]
+        b,c,f=to_numpy(self.model(frame,imgsz=self.coarse,conf=self.pre_conf,iou=iou,verbose=False)[0])
+        side=np.maximum(b[:,2]-b[:,0],b[:,3]-b[:,1])
+        need=np.flatnonzero((f<conf)|(side<self.small))
+        if not len(need):
+            self.last=(0,0); k=f>=conf
+            return [make_result(b[k],c[k],f[k],frame.shape)]
+        order=need[np.argsort(f[need])]                            # least sure first
+        win=self.windows(b,order,h,w)
+        inside=np.zeros(len(b),bool)
+        for x1,y1,x2,y2 in win:
+            inside|=(b[:,0]>=x1)&(b[:,1]>=y1)&(b[:,2]<=x2)&(b[:,3]<=y2)
+        fb,fc,ff=self.refine(frame,win,iou)
+        b=np.concatenate([b[~inside],fb]); c=np.concatenate([c[~inside],fc]); f=np.concatenate([f[~inside],ff])
+        k=f>=conf; b,c,f=b[k],c[k],f[k]
+        keep=nms(b+c[:,None]*4096.0,f,iou)                          # class offset → per-class NMS
+        self.last=(len(need),len(win))
+        return [make_result(b[keep],c[keep],f[keep],frame.shape)]
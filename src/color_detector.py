@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+color_detector.py  –  CPU-only detector for the recoloured GRF sprites
+────────────────────────────────────────────────────────────────────────────
+The edited sprites (grfs editadas/*, ragnarok-dataset/sprites/<colour>) paint
+every monster / card in one flat, fully saturated colour, so a plain HSV
+threshold + connected components finds them without a neural net:
+
+  1. downscale the frame (area interpolation)     – 1080p → 480p by default
+  2. one BGR→HSV conversion
+  3. hue LUT → class id per pixel, masked by S/V minimums   (vectorised)
+  4. per class: small dilation + connectedComponentsWithStats
+  5. area / fill filters → boxes in full-res coordinates
+
+conf = share of the box covered by the class colour, remapped so a normal
+sprite silhouette lands around 0.8-0.95 (comparable with CONF_THRES=0.70).
+
+Hue centres (OpenCV 0-179) measured on ragnarok-dataset/sprites/*.png; S/V
+floors tuned on ss/ so game backgrounds give no false positives
+(python src/bench_detectors.py).
+"""
+
+import cv2, numpy as np
+from detectors import make_result
+
+# class → (hue centre, min S, min V)    ─ see ragnarok_multi.yaml for names
+HUES = {
+    0: (116, 230, 200),   # blue
+    1: ( 89, 200, 200),   # cyan
+    2: ( 60, 230, 180),   # green
+    3: ( 16, 230, 200),   # orange
+    4: (163, 150, 150),   # pink   (card – JPEG bleeds its small glyphs)
+    5: (137, 200,  90),   # purple (dark: V≈146)
+    6: (  0, 230, 200),   # red
+    7: ( 26, 230, 200),   # yellow
+}
+
+class ColorDetector:
+    def __init__(self, hue_tol=3, min_area=120, min_fill=0.25, scale=0.5,
+                 dilate=3, hues=HUES):
+        self.scale=scale; self.min_area=min_area; self.min_fill=min_fill
+        self.kernel=np.ones((dilate,dilate),np.uint8) if dilate>1 else None
+        self.classes=sorted(hues)
+        # hue → class LUT (255 = background), plus per-class S/V floors
+        self.lut=np.full(180,255,np.uint8)
+        self.s_min=np.zeros(256,np.uint8); self.v_min=np.zeros(256,np.uint8)
+        self.s_min[255]=self.v_min[255]=255
+        for c,(h,s,v) in hues.items():
+            self.lut[(np.arange(h-hue_tol,h+hue_tol+1))%180]=c
+            self.s_min[c]=s; self.v_min[c]=v
+        self._buf=None
+
+    def label_map(self, frame):
+        """Per-pixel class id on the downscaled frame (255 = nothing)."""
+        small=frame if self.scale==1 else cv2.resize(frame,None,fx=self.scale,fy=self.scale,
+                                                    interpolation=cv2.INTER_AREA)
+        hsv=cv2.cvtColor(small,cv2.COLOR_BGR2HSV)
+        cls=self.lut[hsv[...,0]]
+        ok=(hsv[...,1]>=self.s_min[cls])&(hsv[...,2]>=self.v_min[cls])
+        if self._buf is None or self._buf.shape!=cls.shape: self._buf=np.empty_like(cls)
+        np.copyto(self._buf,255); np.copyto(self._buf,cls,where=ok)
+        return self._buf
+
+    def detect(self, frame, conf=0.25, classes=None):
+        """→ (xyxy (N,4), cls (N,), conf (N,)) in full-frame pixels."""
+        lab=self.label_map(frame); inv=1/self.scale
+        boxes,cls_l,conf_l=[],[],[]
+        for c in (classes if classes is not None else self.classes):
+            m=(lab==c).view(np.uint8)
+            if not m.any(): continue
+            if self.kernel is not None: m=cv2.dilate(m,self.kernel)
+            n,_,st,_=cv2.connectedComponentsWithStats(m,connectivity=8)
+            if n<=1: continue
+            st=st[1:]; x,y,w,h,a=st.T
+            keep=a>=self.min_area*self.scale*self.scale
+            if not keep.any(): continue
+            x,y,w,h,a=x[keep],y[keep],w[keep],h[keep],a[keep]
+            fill=a/(w*h)
+            cf=np.clip(0.45+fill,0,1)
+            keep=(fill>=self.min_fill)&(cf>=conf)
+            if not keep.any(): continue
+            x,y,w,h,cf=x[keep],y[keep],w[keep],h[keep],cf[keep]
+            boxes.append(np.stack([x,y,x+w,y+h],1)*inv)
+            cls_l.append(np.full(len(x),c)); conf_l.append(cf)
+        if not boxes: return np.zeros((0,4),np.float32),np.zeros(0,np.float32),np.zeros(0,np.float32)
+        return (np.concatenate(boxes).astype(np.float32),
+                np.concatenate(cls_l).astype(np.float32),
+                np.concatenate(conf_l).astype(np.float32))
+
+    # Ultralytics-style call: imgsz / iou / verbose are accepted and ignored
+    def __call__(self, frame, imgsz=None, conf=0.25, iou=None, verbose=False, classes=None, **_):
+        xyxy,cls,cf=self.detect(frame,conf=conf,classes=classes)
+        return [make_result(xyxy,cls,cf,frame.shape)]
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+controller.py  –  adaptive latency budget for FRAME_SKIP / OCR_SKIP / IMG_SZ
+────────────────────────────────────────────────────────────────────────────
+Every `every` s the bot hands over recent stage latencies and its state; the
+controller picks a mode and returns the three knobs:
+
+  mode     when                 detection            OCR
+  crit     hp_crit              every frame (floor)  every frame (floor)
+  swarm    red_ct ≥ swarm_reds  every frame (floor)  base
+  rest     sitting              one per rest_ms      rest_ocr (stand up on time)
+  normal   otherwise            one per target_ms    base (sp_crit → rest_ocr)
+
+"one per X ms" = the largest FRAME_SKIP whose capture period fits X, kept
+while it stays within ±15 % so the skip does not flap.
+
+Resolution follows measured inference time: a step down the size ladder
+when inf > 0.9 · budget, a step up when the predicted cost at the next size
+(∝ side²) is < 0.6 · budget; at most one step per `cooldown` s so the
+rolling latencies can catch up.  Rest mode sits on the smallest size.
+All knobs stay within the configured floors / ceilings; every change is
+printed with the numbers that caused it.
+
+    ctl=LatencyController(target_ms=50,sizes=(256,320,416),knobs=(1,6,416))
+    new=ctl.update(cap_ms,inf_ms,ocr_ms,sitting,hp_crit,sp_crit,red_ct)
+    if new: FRAME_SKIP,OCR_SKIP,IMG_SZ=new
+"""
+
+import time
+
+class LatencyController:
+    def __init__(self,target_ms=50.0,rest_ms=250.0,skip=(1,8),ocr=(1,12),sizes=(256,320,416),
+                 knobs=(1,6,416),ocr_base=None,rest_ocr=2,swarm_reds=2,cooldown=2.0,log=print):
+        self.target=target_ms; self.rest=rest_ms; self.skip_rng=skip; self.ocr_rng=ocr
+        self.sizes=sorted(sizes); self.knobs=tuple(knobs); self.ocr_base=ocr_base or knobs[1]
+        self.rest_ocr=rest_ocr; self.swarm_reds=swarm_reds; self.cooldown=cooldown
+        self.log=log; self.mode="normal"; self.t_size=0.0; self.changes=0
+
+    def pick_mode(self,sitting,hp_crit,red_ct):
+        if hp_crit: return "crit"
+        if red_ct>=self.swarm_reds: return "swarm"
+        return "rest" if sitting else "normal"
+
+    def size_step(self,sz,inf_ms,budget,now):
+        """One rung down / up the size ladder, or stay."""
+        i=min(range(len(self.sizes)),key=lambda k: abs(self.sizes[k]-sz))
+        if now-self.t_size<self.cooldown or not inf_ms: return self.sizes[i]
+        if inf_ms>0.9*budget and i>0: i-=1; self.t_size=now
+        elif i+1<len(self.sizes) and inf_ms*(self.sizes[i+1]/self.sizes[i])**2<0.6*budget:
+            i+=1; self.t_size=now
+        return self.sizes[i]
+
+    def skip_for(self,budget,cap_ms):
+        """Largest skip whose detection period fits the budget; the current one
+        is kept while within ±15 % (no flapping on a 1.5× boundary)."""
+        cur=self.knobs[0]; cap_ms=max(cap_ms,1.0)
+        if cap_ms*cur<=1.15*budget and cap_ms*(cur+1)>0.85*budget: return cur
+        return max(1,int(budget//cap_ms))
+
+    def update(self,cap_ms,inf_ms,ocr_ms,sitting,hp_crit,sp_crit,red_ct,now=None):
+        """→ new (frame_skip, ocr_skip, imgsz), or None when nothing changed."""
+        if not cap_ms: return None                                      # no measurements yet
+        now=now or time.time(); clamp=lambda v,r: max(r[0],min(r[1],int(v)))
+        mode=self.pick_mode(sitting,hp_crit,red_ct)
+        budget=self.rest if mode=="rest" else self.target
+        skip=self.skip_rng[0] if mode in ("crit","swarm") else self.skip_for(budget,cap_ms)
+        ocr=self.ocr_rng[0] if mode=="crit" else \
+            self.rest_ocr if mode=="rest" or sp_crit else self.ocr_base
+        if mode!="crit" and ocr_ms>0.3*budget: ocr*=2                 # OCR eating the budget
+        sz=self.sizes[0] if mode=="rest" else self.size_step(self.knobs[2],inf_ms,budget,now)
+        new=(clamp(skip,self.skip_rng),clamp(ocr,self.ocr_rng),sz)
+        if new==self.knobs and mode==self.mode: return None
+        old,self.knobs,prev,self.mode=self.knobs,new,self.mode,mode
+        if new==old: return None
+        self.changes+=1
+        self.log(f"🎛️ {prev+'→'+mode if prev!=mode else mode}: skip {old[0]}→{new[0]} ocr {old[1]}→{new[1]} sz {old[2]}→{new[2]}"
+                 f"  (cap {cap_ms:.1f} inf {inf_ms:.1f} ocr {ocr_ms:.1f} ms, budget {budget:.0f} ms)")
+        return new
+
+    def fmt(self): return f"ctl {self.mode} {self.knobs[0]}/{self.knobs[1]}/{self.knobs[2]}"
@@ -6,25 +6,33 @@ Usage
     python make_split.py
     python make_split.py --train 0.85        # 85 % train, 15 % val
     python make_split.py --clean             # remove previous split first
+    python make_split.py --by session        # whole bot sessions per split (no leakage)
+    python make_split.py --folders "" cards  # also the card-only samples
+    python make_split.py --keep-dups         # ignore the near-duplicate marks
 ---------------------------------------------------------------------------
 Folder layout *before* running:
 
 project/
 ├─ captured_dataset/
+│   ├─ manifest.sqlite   (sample_writer.py / python src/manifest.py scan)
 │   ├─ images/     img001.jpg ...
 │   └─ labels/     img001.txt ...
 └─ ragnarok-dataset/
     └─ (train/val folders will be created here)
 
+Samples come from the dataset manifest (manifest.py), not a directory
+glob: near-duplicates (dup_of set by `manifest.py dedup` or skipped at
+capture) stay out, and --by session keeps a whole bot run on one side.
+
 The script copies files (not symlinks) so it works on Windows without
 admin privileges.
 """
 import argparse, random, shutil
 from pathlib import Path
+from manifest import DB_NAME, Manifest
 
 ROOT   = Path(__file__).resolve().parent
-SRC_I  = ROOT / "../captured_dataset" / "images"
-SRC_L  = ROOT / "../captured_dataset" / "labels"
+SRC    = ROOT / "../captured_dataset"
 DST    = ROOT / "../ragnarok-dataset-new"
 
 def parse():
@@ -35,6 +43,12 @@ def parse():
                     help="random seed (reproducible shuffle)")
     ap.add_argument("--clean", action="store_true",
                     help="remove existing train/val folders before copying")
+    ap.add_argument("--by", choices=("sample","session"), default="sample",
+                    help="shuffle unit: single samples or whole capture sessions")
+    ap.add_argument("--folders", nargs="+", default=[""],
+                    help='manifest folders to use ("" = main, cards)')
+    ap.add_argument("--keep-dups", action="store_true",
+                    help="also use samples marked as near-duplicates")
     return ap.parse_args()
 
 def rm_tree(p: Path):
@@ -57,24 +71,41 @@ def main():
 
     ensure_dirs()
 
-    imgs = sorted(SRC_I.glob("*.jpg"))
-    if not imgs:
-        raise SystemExit("❌  No images found in captured_dataset/images")
+    if not (SRC / DB_NAME).exists():
+        raise SystemExit("❌  No manifest – run: python src/manifest.py scan captured_dataset")
+    m = Manifest(SRC)
+    rows = [r for r in m.rows("folder IN (%s)" % ",".join("?"*len(args.folders)), args.folders)
+            if args.keep_dups or r[8] is None]
+    m.close()
+    if not rows:
+        raise SystemExit("❌  No samples in the manifest for folders %s" % args.folders)
 
+    # shuffle units: single samples, or sessions (sorted → reproducible)
+    groups = {}
+    for r in sorted(rows):
+        groups.setdefault(r[0] if args.by == "sample" else r[2], []).append(SRC / r[0])
+    keys = sorted(groups)
     random.seed(args.seed)
-    random.shuffle(imgs)
-    split_at = int(len(imgs) * train_frac)
-    train_set, val_set = imgs[:split_at], imgs[split_at:]
+    random.shuffle(keys)
+    train_set, val_set, n = [], [], 0
+    for k in keys:
+        (train_set if n < len(rows) * train_frac else val_set).extend(groups[k])
+        n += len(groups[k])
+    if args.by == "session":
+        print(f"🗂️   {len(keys)} sessions, {len(rows)} samples")
+    if not val_set:
+        print("⚠️   Empty val split – too few samples / sessions for --train")
 
     def copy_set(files, split):
         for img in files:
             base = img.stem
-            lbl  = SRC_L / f"{base}.txt"
-            if not lbl.exists():
-                print(f"⚠️   Skipping {base}: missing label")
+            lbl  = img.parent.parent / "labels" / f"{base}.txt"
+            if not img.exists() or not lbl.exists():
+                print(f"⚠️   Skipping {base}: missing image/label")
                 continue
-            shutil.copy2(img,  DST / "images" / split / img.name)
-            shutil.copy2(lbl,  DST / "labels" / split / lbl.name)
+            pre  = "" if img.parent.parent.samefile(SRC) else img.parent.parent.name + "_"
+            shutil.copy2(img,  DST / "images" / split / (pre + img.name))
+            shutil.copy2(lbl,  DST / "labels" / split / (pre + lbl.name))
 
     print(f"📂  Copying {len(train_set)} → train, {len(val_set)} → val …")
     copy_set(train_set, "train")
@@ -83,6 +114,7 @@ def main():
     for sub in ["images/train","images/val","labels/train","labels/val"]:
         n = len(list((DST/sub).glob("*.jpg"))) if "images" in sub else len(list((DST/sub).glob("*.txt")))
         print(f"  {sub:18} : {n} files")
+    print(f"💡  Pre-decoded shards for CPU training: python src/shards.py build {DST.resolve()}")
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+detectors.py  –  pluggable detection backends for the bot / tools
+────────────────────────────────────────────────────────────────────────────
+Every backend is called like an Ultralytics model:
+
+    res = model(frame_bgr, imgsz=IMG_SZ, conf=CONF_THRES, iou=IOU_THRES,
+                verbose=False)[0]
+    for box, cls, conf in zip(res.boxes.xyxy, res.boxes.cls, res.boxes.conf): ...
+
+so `test_rag.py` and `labeling_ui.py` do not care which one is loaded.
+Non-YOLO backends return NumPy arrays in a tiny `Result` / `Boxes` shim.
+
+    load_detector("models/best_v12n2.pt")   → ultralytics.YOLO behind LetterboxedYOLO
+    load_detector("models/best_v12n2.onnx") → onnx_detector.OnnxDetector (ORT, CPU)
+    load_detector("models/x.onnx@openvino") → same, OpenVINO execution provider
+    load_detector("color")                  → color_detector.ColorDetector
+    load_detector("server[:port]")          → inference_server.RemoteDetector
+"""
+
+from collections import namedtuple
+import numpy as np
+
+Boxes  = namedtuple("Boxes",  "xyxy cls conf id",  # (N,4) f32, (N,) f32, (N,) f32,
+                    defaults=(None,))              # (N,) int64 track ids or None
+Result = namedtuple("Result", "boxes orig_shape")
+
+def make_result(xyxy, cls, conf, shape, ids=None):
+    """Pack plain arrays into the Ultralytics-like result structure."""
+    xyxy=np.asarray(xyxy,np.float32).reshape(-1,4)
+    return Result(Boxes(xyxy,np.asarray(cls,np.float32),np.asarray(conf,np.float32),ids),
+                  tuple(shape[:2]))
+
+def to_numpy(res):
+    """Any backend's result → (xyxy (N,4), cls (N,), conf (N,)) NumPy arrays."""
+    b=res.boxes
+    f=lambda t: np.asarray(t.cpu() if hasattr(t,"cpu") else t,np.float32)
+    return f(b.xyxy).reshape(-1,4),f(b.cls).reshape(-1),f(b.conf).reshape(-1)
+
+class LetterboxedYOLO:
+    """Ultralytics model fed from preprocess.Letterbox: resize / pad / RGB /
+    CHW / ÷255 go straight into one reused tensor (shared with torch, no
+    copy) and boxes are mapped back with the letterbox's precomputed
+    factors.  Lists (autolabel batches) go to the model untouched."""
+    def __init__(self,model):
+        self.model=model; self.lb={}; self.tt=(None,None)
+
+    def __getattr__(self,k): return getattr(self.model,k)
+
+    def __call__(self,frame,imgsz=640,conf=0.25,iou=0.45,verbose=False,**kw):
+        if isinstance(frame,list): return self.model(frame,imgsz=imgsz,conf=conf,iou=iou,verbose=verbose,**kw)
+        import torch
+        from preprocess import Letterbox
+        lb=self.lb.get(imgsz) or self.lb.setdefault(imgsz,Letterbox(imgsz,stride=32))
+        t=lb(frame)
+        if self.tt[0]!=(imgsz,t.shape): self.tt=((imgsz,t.shape),torch.from_numpy(t))
+        r=self.model(self.tt[1],conf=conf,iou=iou,verbose=verbose,**kw)[0]
+        xyxy,cls,cf=to_numpy(r)
+        return [make_result(lb.unmap(xyxy),cls,cf,frame.shape)]
+
+def load_detector(spec):
+    """'color' → HSV colour segmentation (CPU, no torch); '*.onnx[@provider]'
+    → ONNX Runtime; 'server[:port]' → shared inference_server.py; anything
+    else is treated as a weights path and handed to Ultralytics."""
+    if spec=="color":
+        from color_detector import ColorDetector
+        return ColorDetector()
+    if spec=="server" or spec.startswith("server:"):
+        from inference_server import RemoteDetector, PORT
+        return RemoteDetector(int(spec[7:] or PORT))
+    path,_,provider=spec.partition("@")
+    if path.endswith(".onnx"):
+        from onnx_detector import OnnxDetector
+        return OnnxDetector(path,provider or "cpu")
+    from ultralytics import YOLO
+    return LetterboxedYOLO(YOLO(spec))
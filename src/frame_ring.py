@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+frame_ring.py  –  shared-memory frame ring between processes
+────────────────────────────────────────────────────────────────────────────
+One writer (the capture process) and any number of readers (inference,
+OCR) map the same multiprocessing.shared_memory block:
+
+    header   head seq | per slot: seq, (t0, t1) grab times, (h, w)
+    slots    N × H×W×3 uint8, page-aligned
+
+Readers get a NumPy VIEW of the newest slot – no copy, no pickling.  The
+writer never waits for readers, so a slot can be overwritten while a slow
+reader still uses it: readers call valid(seq) after processing and drop
+the result if the frame was recycled (seqlock style; keep N ≥ 4).
+
+    ring=FrameRing(slots=8)                      # owner: creates + unlinks
+    ring.write(frame,t0,t1)                      # capture process
+    r=FrameRing.attach(ring.name)                # process spawned by the owner
+    seq,view,t0=r.get(after=last_seq,timeout=0.5)
+    ...; if r.valid(seq): use result
+"""
+
+import os, time
+from multiprocessing import shared_memory
+import numpy as np
+
+PAGE = 4096
+
+def attach_shm(name,untrack=True):
+    """Map an existing SharedMemory block without adopting its lifetime
+    (the POSIX resource tracker would otherwise unlink it on our exit).
+    Children spawned by the owner share its tracker → untrack=False."""
+    shm=shared_memory.SharedMemory(name=name)
+    if untrack and os.name=="posix":
+        from multiprocessing import resource_tracker
+        resource_tracker.unregister(shm._name,"shared_memory")
+    return shm
+
+class FrameRing:
+    def __init__(self,slots=8,shape=(1080,1920,3),name=None,_shm=None):
+        self.n=slots; self.shape=tuple(shape)
+        hdr=-(-(8+slots*(8+16+8))//PAGE)*PAGE; slot=int(np.prod(shape))
+        self.owner=_shm is None
+        self.shm=_shm or shared_memory.SharedMemory(name=name,create=True,size=hdr+slots*slot)
+        b=self.shm.buf
+        self.head =np.ndarray((1,),np.int64,b,0)
+        self.seqs =np.ndarray((slots,),np.int64,b,8)
+        self.ts   =np.ndarray((slots,2),np.float64,b,8+8*slots)
+        self.hw   =np.ndarray((slots,2),np.int64,b,8+24*slots)
+        self.slots=np.ndarray((slots,*shape),np.uint8,b,hdr)
+        if self.owner: self.head[0]=0; self.seqs[:]=-1
+
+    @classmethod
+    def attach(cls,name,slots=8,shape=(1080,1920,3),untrack=False):
+        """Map an existing ring (readers / writer spawned by the owner)."""
+        return cls(slots,shape,_shm=attach_shm(name,untrack))
+
+    @property
+    def name(self): return self.shm.name
+
+    # ── writer ───────────────────────────────────────────────────────────
+    def write(self,frame,t0=0.0,t1=0.0):
+        seq=int(self.head[0])+1; i=seq%self.n; h,w=frame.shape[:2]
+        self.seqs[i]=-1                                     # being rewritten
+        np.copyto(self.slots[i,:h,:w],frame)
+        self.ts[i]=t0,t1; self.hw[i]=h,w
+        self.seqs[i]=seq; self.head[0]=seq
+        return seq
+
+    # ── readers ──────────────────────────────────────────────────────────
+    def view(self,seq):
+        i=seq%self.n; h,w=self.hw[i]
+        return self.slots[i,:h,:w]
+
+    def valid(self,seq): return self.seqs[seq%self.n]==seq
+
+    def get(self,after=0,timeout=None,poll=0.001):
+        """Newest frame with seq > after → (seq, view, grab t0) or (after, None, 0)."""
+        end=None if timeout is None else time.perf_counter()+timeout
+        while True:
+            seq=int(self.head[0])
+            if seq>after:
+                i=seq%self.n; v=self.view(seq); t0=float(self.ts[i,0])
+                if self.valid(seq): return seq,v,t0
+            if end is not None and time.perf_counter()>end: return after,None,0.0
+            time.sleep(poll)
+
+    def grab_times(self,seq): return tuple(self.ts[seq%self.n])
+
+    def close(self):
+        for a in ("head","seqs","ts","hw","slots"): setattr(self,a,None)  # drop views first
+        try: self.shm.close()
+        except BufferError: pass              # a caller still holds a view; freed at exit
+        if self.owner: self.shm.unlink()
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+frame_source.py  –  pluggable frame sources for the bot and the benches
+────────────────────────────────────────────────────────────────────────────
+All sources look like cv2.VideoCapture to the bot (read / get / release /
+isOpened) and add:
+  .ts       timestamp of the last frame (s, deterministic for replays)
+  .ended    True once a finite source is exhausted (bot loop then stops)
+
+  open_source(0)                       live webcam / OBS virtual cam
+  open_source("session.mp4")           video file
+  open_source("ss/images")             directory of images (sorted)
+  open_source("session.raw")           memory-mapped raw recording
+
+Replays run in real time by default (frames are released on their recorded
+timestamps); realtime=False replays as fast as the consumer can read.
+
+Record a raw session (Windows rig) for later replay on any box:
+    python src/frame_source.py record 0 sessions/farm1.raw --frames 1800
+"""
+
+import glob, json, os, sys, time
+from pathlib import Path
+import cv2, numpy as np
+
+IMG_EXT = (".jpg",".jpeg",".png",".bmp")
+
+class FrameSource:
+    """Replay base: subclasses give __len__ and frame(i); live ones override read()."""
+    ended=False; ts=0.0
+    def __init__(self,w,h,fps,realtime=True,loop=False):
+        self.w,self.h,self.fps=w,h,fps; self.realtime=realtime; self.loop=loop
+        self.i=0; self.t0=None
+
+    # cv2.VideoCapture compatibility
+    def get(self,prop):
+        return {cv2.CAP_PROP_FRAME_WIDTH:self.w,cv2.CAP_PROP_FRAME_HEIGHT:self.h,
+                cv2.CAP_PROP_FPS:self.fps}.get(prop,0)
+    def set(self,prop,val): return False
+    def isOpened(self): return True
+    def release(self): pass
+    def __len__(self): return 0
+
+    def stamp(self,i):
+        """Recorded timestamp of frame i (default: i / fps)."""
+        return i/self.fps
+
+    def read(self):
+        n=len(self)
+        if self.i>=n:
+            if not self.loop or not n: self.ended=True; return False,None
+            self.i=0; self.t0=None
+        ts=self.stamp(self.i)
+        if self.realtime:                                  # pace to recorded time
+            now=time.perf_counter()
+            if self.t0 is None: self.t0=now-ts
+            dt=self.t0+ts-now
+            if dt>0: time.sleep(dt)
+        fr=self.frame(self.i); self.ts=ts; self.i+=1
+        return fr is not None,fr
+
+
+class LiveSource(FrameSource):
+    """Webcam / OBS virtual cam (the bot's original cv2.VideoCapture(0))."""
+    def __init__(self,index=0,w=1920,h=1080):
+        api=cv2.CAP_DSHOW if sys.platform=="win32" else cv2.CAP_ANY
+        self.cap=cv2.VideoCapture(index,api)
+        self.cap.set(cv2.CAP_PROP_FRAME_WIDTH,w); self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT,h)
+        self.cap.set(cv2.CAP_PROP_BUFFERSIZE,1); time.sleep(0.2)
+        assert self.cap.isOpened(), f"camera {index} did not open"
+        super().__init__(int(self.cap.get(3)),int(self.cap.get(4)),self.cap.get(5) or 30,realtime=False)
+        self.t_start=time.perf_counter()
+    def get(self,prop): return self.cap.get(prop)
+    def isOpened(self): return self.cap.isOpened()
+    def release(self): self.cap.release()
+    def read(self):
+        ok,fr=self.cap.read(); self.ts=time.perf_counter()-self.t_start
+        return ok,fr
+
+
+class VideoSource(FrameSource):
+    def __init__(self,path,realtime=True,loop=False):
+        self.cap=cv2.VideoCapture(str(path))
+        if not self.cap.isOpened(): raise FileNotFoundError(path)
+        self.n=int(self.cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        super().__init__(int(self.cap.get(3)),int(self.cap.get(4)),self.cap.get(5) or 30,realtime,loop)
+    def __len__(self): return self.n
+    def release(self): self.cap.release()
+    def frame(self,i):
+        if i==0: self.cap.set(cv2.CAP_PROP_POS_FRAMES,0)
+        ok,fr=self.cap.read()
+        return fr if ok else None
+
+
+class ImageDirSource(FrameSource):
+    def __init__(self,folder,fps=30,realtime=True,loop=False):
+        self.paths=sorted(p for p in glob.glob(os.path.join(folder,"*")) if p.lower().endswith(IMG_EXT))
+        if not self.paths: raise FileNotFoundError(f"no images in {folder}")
+        h,w=cv2.imread(self.paths[0]).shape[:2]
+        super().__init__(w,h,fps,realtime,loop)
+    def __len__(self): return len(self.paths)
+    def frame(self,i): return cv2.imread(self.paths[i])
+
+
+class RawSource(FrameSource):
+    """<name>.raw (N×H×W×3 uint8, memory-mapped) + <name>.json + <name>.ts.npy"""
+    def __init__(self,path,realtime=True,loop=False,copy=True):
+        path=Path(path); meta=json.loads(path.with_suffix(".json").read_text())
+        self.mm=np.memmap(path,np.uint8,"r",shape=(meta["n"],meta["h"],meta["w"],3))
+        ts_p=path.with_suffix(".ts.npy")
+        self.tss=np.load(ts_p) if ts_p.exists() else None
+        self.copy=copy                     # bot may hold frames → hand out copies
+        super().__init__(meta["w"],meta["h"],meta.get("fps",30),realtime,loop)
+    def __len__(self): return len(self.mm)
+    def stamp(self,i): return float(self.tss[i]) if self.tss is not None else i/self.fps
+    def frame(self,i): return np.array(self.mm[i]) if self.copy else self.mm[i]
+
+
+def open_source(spec,realtime=True,loop=False):
+    if isinstance(spec,int) or (isinstance(spec,str) and spec.isdigit()): return LiveSource(int(spec))
+    p=Path(spec)
+    if p.is_dir(): return ImageDirSource(p,realtime=realtime,loop=loop)
+    if p.suffix==".raw": return RawSource(p,realtime=realtime,loop=loop)
+    return VideoSource(p,realtime=realtime,loop=loop)
+
+def record(src,out,frames):
+    """Grab frames from any source into a raw memmap recording."""
+    out=Path(out); out.parent.mkdir(parents=True,exist_ok=True)
+    tss=[]; n=0
+    with open(out,"wb") as f:
+        while n<frames:
+            ok,fr=src.read()
+            if not ok:
+                if src.ended: break
+                continue
+            f.write(np.ascontiguousarray(fr).tobytes()); tss.append(src.ts); n+=1
+    t=np.asarray(tss,np.float64); t-=t[0] if len(t) else 0
+    np.save(out.with_suffix(".ts.npy"),t)
+    fps=(n-1)/t[-1] if n>1 and t[-1]>0 else 30
+    out.with_suffix(".json").write_text(json.dumps({"n":n,"h":src.h,"w":src.w,"fps":fps}))
+    return n
+
+if __name__=="__main__":
+    if len(sys.argv)<4 or sys.argv[1]!="record":
+        sys.exit("usage: frame_source.py record <source> <out.raw> [--frames N]")
+    n=int(sys.argv[sys.argv.index("--frames")+1]) if "--frames" in sys.argv else 600
+    src=open_source(sys.argv[2],realtime=False)
+    print(f"✅ {record(src,sys.argv[3],n)} frames → {sys.argv[3]}")
@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+grf_sprites.py  –  SPR / ACT decoder for the edited GRF assets
+────────────────────────────────────────────────────────────────────────────
+Reads Ragnarok .spr (palette + RLE indexed frames, optional RGBA frames) and
+.act (actions → frames → layers with offsets / mirror / tint / scale) and
+renders every action frame as a trimmed RGBA NumPy array – no manual PNG
+export, no transform_png.py / trim.py pass.
+
+  • palette index 0 is transparent (SPR rule); the edited sprites also sit on
+    a near-white box, so palette entries with R,G,B ≥ white_thr are keyed out
+    too (same rule as transform_png.py, done once on the 256-entry palette)
+  • rendered frames are packed into one flat uint8 file + an index and
+    memory-mapped back, keyed by the SPR/ACT content hash:
+        .cache/grf/<name>-<hash>.bin / .idx.npy
+
+    frames = load_frames("grfs editadas/monsterattack/azul.act")
+    for f in frames: f.action, f.frame, f.rgba (H,W,4), f.cls
+
+CLI (dump PNGs to eyeball):
+    python src/grf_sprites.py "grfs editadas" --png out_dir
+"""
+
+import argparse, hashlib, struct, glob, os
+from collections import namedtuple
+from pathlib import Path
+import cv2, numpy as np
+
+ROOT      = Path(__file__).resolve().parent.parent
+GRF_DIR   = ROOT/"grfs editadas"
+CACHE_DIR = ROOT/".cache"/"grf"
+WHITE_THR = 240
+CLS_VERSION = 2          # bump when dominant_class() changes → cached class ids rebuilt
+
+Layer = namedtuple("Layer","x y spr mirror color sx sy rot kind")
+Frame = namedtuple("Frame","action frame rgba cls")
+
+# ═════════ SPR ═══════════════════════════════════════════════════════════
+def read_spr(path, white_thr=WHITE_THR):
+    """→ (indexed RGBA frames, rgba frames) as lists of (H,W,4) uint8."""
+    b=Path(path).read_bytes()
+    if b[:2]!=b"SP": raise ValueError(f"{path}: not an SPR file")
+    ver=(b[3],b[2]); n_idx,=struct.unpack_from("<H",b,4); o=6
+    n_rgba=0
+    if ver>=(2,0): n_rgba,=struct.unpack_from("<H",b,o); o+=2
+    pal=np.frombuffer(b[-1024:],np.uint8).reshape(256,4).copy()   # R,G,B,(unused)
+    pal[:,3]=255; pal[0,3]=0
+    if white_thr: pal[(pal[:,:3]>=white_thr).all(1),3]=0
+    idx=[]
+    for _ in range(n_idx):
+        w,h=struct.unpack_from("<HH",b,o); o+=4
+        if ver>=(2,1):
+            sz,=struct.unpack_from("<H",b,o); o+=2
+            raw=np.frombuffer(b,np.uint8,sz,o); o+=sz
+            px=rle_decode(raw,w*h)
+        else:
+            px=np.frombuffer(b,np.uint8,w*h,o); o+=w*h
+        idx.append(pal[px.reshape(h,w)])
+    rgba=[]
+    for _ in range(n_rgba):
+        w,h=struct.unpack_from("<HH",b,o); o+=4
+        a=np.frombuffer(b,np.uint8,w*h*4,o).reshape(h,w,4); o+=w*h*4
+        rgba.append(np.ascontiguousarray(a[::-1,:,::-1]))           # ABGR, bottom-up
+    return idx,rgba
+
+def rle_decode(raw,n):
+    """SPR 2.1 RLE: a 0 byte is followed by its run length; counts are never 0,
+    so every 0 in the stream is a run marker."""
+    z=np.flatnonzero(raw[:-1]==0)
+    if not len(z): return raw[:n]
+    reps=np.ones(len(raw),np.int64)
+    reps[z]=raw[z+1]; reps[z+1]=0
+    return np.repeat(raw,reps)[:n]
+
+# ═════════ ACT ═══════════════════════════════════════════════════════════
+def read_act(path):
+    """→ list of actions, each a list of frames, each a list of Layer."""
+    b=Path(path).read_bytes()
+    if b[:2]!=b"AC": raise ValueError(f"{path}: not an ACT file")
+    ver=(b[3],b[2]); n_act,=struct.unpack_from("<H",b,4); o=16
+    actions=[]
+    for _ in range(n_act):
+        n_fr,=struct.unpack_from("<I",b,o); o+=4; frames=[]
+        for _ in range(n_fr):
+            o+=32                                            # attack-range rects
+            n_lay,=struct.unpack_from("<I",b,o); o+=4; layers=[]
+            for _ in range(n_lay):
+                x,y,spr,flags=struct.unpack_from("<iiiI",b,o); o+=16
+                color=(255,255,255,255); sx=sy=1.0; rot=0; kind=0
+                if ver>=(2,0):
+                    color=tuple(b[o:o+4]); o+=4
+                    sx,=struct.unpack_from("<f",b,o); o+=4; sy=sx
+                    if ver>=(2,4): sy,=struct.unpack_from("<f",b,o); o+=4
+                    rot,kind=struct.unpack_from("<ii",b,o); o+=8
+                    if ver>=(2,5): o+=8                       # width / height
+                layers.append(Layer(x,y,spr,flags&1,color,sx,sy,rot,kind))
+            if ver>=(2,0): o+=4                               # sound event id
+            if ver>=(2,3):
+                n_anc,=struct.unpack_from("<I",b,o); o+=4+16*n_anc
+            frames.append(layers)
+        actions.append(frames)
+    return actions
+
+# ═════════ rendering ═════════════════════════════════════════════════════
+def render(layers, idx, rgba):
+    """Composite one ACT frame's layers (centre-origin) → trimmed RGBA or None."""
+    parts=[]
+    for L in layers:
+        src=(idx if L.kind==0 else rgba)
+        if not (0<=L.spr<len(src)): continue
+        im=src[L.spr]
+        if L.mirror: im=im[:,::-1]
+        if (L.sx,L.sy)!=(1.0,1.0):
+            im=cv2.resize(im,None,fx=abs(L.sx),fy=abs(L.sy),interpolation=cv2.INTER_NEAREST)
+        if L.rot:
+            h,w=im.shape[:2]; M=cv2.getRotationMatrix2D((w/2,h/2),-L.rot,1.0)
+            im=cv2.warpAffine(im,M,(w,h),flags=cv2.INTER_NEAREST,borderValue=(0,0,0,0))
+        if L.color!=(255,255,255,255):
+            im=(im.astype(np.float32)*(np.array(L.color,np.float32)/255)).astype(np.uint8)
+        h,w=im.shape[:2]; parts.append((L.x-w//2,L.y-h//2,im))
+    if not parts: return None
+    x0=min(p[0] for p in parts); y0=min(p[1] for p in parts)
+    x1=max(p[0]+p[2].shape[1] for p in parts); y1=max(p[1]+p[2].shape[0] for p in parts)
+    out=np.zeros((y1-y0,x1-x0,4),np.uint8)
+    for x,y,im in parts:
+        roi=out[y-y0:y-y0+im.shape[0],x-x0:x-x0+im.shape[1]]
+        a=im[...,3:4].astype(np.float32)/255
+        roi[...,:3]=(roi[...,:3]*(1-a)+im[...,:3]*a).astype(np.uint8)
+        roi[...,3]=np.maximum(roi[...,3],im[...,3])
+    ys,xs=np.nonzero(out[...,3])
+    if not len(ys): return None
+    return out[ys.min():ys.max()+1,xs.min():xs.max()+1]
+
+def dominant_class(rgba, hue_tol=3, min_frac=0.25):
+    """Class id of the sprite's flat recolour (hue LUT of color_detector), or -1
+    unless that colour – within hue_tol and the class S/V floors, i.e. what the
+    detector would fire on – covers ≥ min_frac of the opaque pixels (grey item
+    sprites with an orange-ish trim stay unlabelled)."""
+    from color_detector import HUES
+    hsv=cv2.cvtColor(np.ascontiguousarray(rgba[...,:3]),cv2.COLOR_RGB2HSV)
+    op=rgba[...,3]>0; m=op&(hsv[...,1]>=150)&(hsv[...,2]>=80)
+    if not m.any(): return -1
+    best=int(np.bincount(hsv[...,0][m],minlength=180).argmax())
+    dist=lambda h,hc: np.minimum(abs(h-hc),180-abs(h-hc))
+    c=min(HUES,key=lambda k: dist(best,HUES[k][0]))
+    hc,s,v=HUES[c]
+    if dist(best,hc)>hue_tol: return -1
+    hit=op&(dist(hsv[...,0].astype(np.int16),hc)<=hue_tol)&(hsv[...,1]>=s)&(hsv[...,2]>=v)
+    return c if hit.sum()>=min_frac*op.sum() else -1
+
+# ═════════ memory-mapped cache ═══════════════════════════════════════════
+def decode_frames(act_path, white_thr=WHITE_THR, dedup=True):
+    act_path=Path(act_path)
+    idx,rgba=read_spr(act_path.with_suffix(".spr"),white_thr)
+    out=[]; seen=set()
+    for a,frames in enumerate(read_act(act_path)):
+        for f,layers in enumerate(frames):
+            im=render(layers,idx,rgba)
+            if im is None: continue
+            if dedup:                              # many actions reuse a pose
+                k=hashlib.blake2b(im.tobytes()+bytes(str(im.shape),"ascii"),digest_size=8).digest()
+                if k in seen: continue
+                seen.add(k)
+            out.append((a,f,im))
+    return out
+
+def load_frames(act_path, white_thr=WHITE_THR, cache_dir=CACHE_DIR):
+    """Decoded frames for one .act/.spr pair, via the memory-mapped cache."""
+    act_path=Path(act_path)
+    h=hashlib.blake2b(act_path.read_bytes()+act_path.with_suffix(".spr").read_bytes()
+                      +bytes([white_thr,CLS_VERSION]),digest_size=8).hexdigest()
+    base=Path(cache_dir)/f"{act_path.stem}-{h}"
+    bin_p,idx_p=base.with_suffix(".bin"),base.with_suffix(".idx.npy")
+    if not idx_p.exists():
+        frames=decode_frames(act_path,white_thr)
+        Path(cache_dir).mkdir(parents=True,exist_ok=True)
+        index=np.zeros((len(frames),6),np.int64); off=0          # act,frame,off,h,w,cls
+        with open(bin_p,"wb") as f:
+            for i,(a,fr,im) in enumerate(frames):
+                index[i]=(a,fr,off,im.shape[0],im.shape[1],dominant_class(im))
+                f.write(np.ascontiguousarray(im).tobytes()); off+=im.size
+        np.save(idx_p,index)
+    index=np.load(idx_p)
+    if not len(index): return []
+    mm=np.memmap(bin_p,np.uint8,"r")
+    return [Frame(int(a),int(fr),mm[o:o+h*w*4].reshape(h,w,4),int(c)) for a,fr,o,h,w,c in index]
+
+def all_frames(root=GRF_DIR, **kw):
+    """Every frame of every .act under root (recursive)."""
+    out=[]
+    for p in sorted(glob.glob(os.path.join(root,"**","*.act"),recursive=True)):
+        if Path(p).with_suffix(".spr").exists(): out+=load_frames(p,**kw)
+    return out
+
+if __name__=="__main__":
+    ap=argparse.ArgumentParser()
+    ap.add_argument("root",nargs="?",default=str(GRF_DIR))
+    ap.add_argument("--png",help="dump every frame as <out>/<name>_a<act>_f<frame>.png")
+    args=ap.parse_args()
+    for p in sorted(glob.glob(os.path.join(args.root,"**","*.act"),recursive=True)):
+        fr=load_frames(p)
+        cls=np.bincount([f.cls for f in fr if f.cls>=0],minlength=8)
+        print(f"{Path(p).relative_to(args.root)!s:32} {len(fr):4} frames  class={int(cls.argmax()) if cls.any() else '-'}")
+        if args.png:
+            os.makedirs(args.png,exist_ok=True)
+            for f in fr:
+                cv2.imwrite(os.path.join(args.png,f"{Path(p).stem}_a{f.action:02}_f{f.frame:02}.png"),
+                            cv2.cvtColor(f.rgba,cv2.COLOR_RGBA2BGRA))
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+hpsp_reader.py  –  cached HP/SP reader (bitmap-font matcher + Tesseract fallback)
+────────────────────────────────────────────────────────────────────────────
+The status line "HP. 2569 / 4485 | SP. 498 / 498" is drawn with the game's
+fixed bitmap font, so after Otsu binarisation every character is the same
+few pixels each time.  Per read:
+
+  1. crop + binarise (no upscale)         ~0.05 ms
+  2. hash the bits → same as last read?   → cached value, done
+  3. split into glyphs on empty columns, look each one up in the template
+     table (exact bits, else nearest same-width template ≤ MAX_DIST px)
+  4. any glyph unknown → Tesseract (old path), and if its text lines up
+     with the glyphs, learn them so the next read is a template hit
+
+Templates are seeded from the labelled corpus in
+ragnarok-dataset/hpsp_crops (truth.txt: "<png>\\t<text>").  Set record_dir
+to dump crops that needed Tesseract, to grow that corpus.
+
+    reader = HpSpReader()
+    v = reader.read(frame)          # HpSp(hp_cur,hp_max,sp_cur,sp_max) | None
+    v.hp_pct, v.sp_pct, reader.changed, reader.fmt()
+"""
+
+import re, time, hashlib
+from collections import namedtuple
+from pathlib import Path
+import cv2, numpy as np
+try:
+    import pytesseract
+except ImportError:                 # template-only mode (e.g. Linux benches)
+    pytesseract = None
+
+ROOT      = Path(__file__).resolve().parent.parent
+CORPUS    = ROOT/"ragnarok-dataset"/"hpsp_crops"
+CROP      = (6,37,160,50)
+UPSCALE   = 3
+OCR_CFG   = r"--oem 3 --psm 7 -c tessedit_char_whitelist=0123456789HPSPhpsp/|:."
+MAX_DIST  = 3          # max differing pixels for a fuzzy glyph match
+
+re_hp=re.compile(r"HP[:\.]?\s*(\d+)\s*/\s*(\d+)",re.I)
+re_sp=re.compile(r"SP[:\.]?\s*(\d+)\s*/\s*(\d+)",re.I)
+
+class HpSp(namedtuple("HpSp","hp_cur hp_max sp_cur sp_max")):
+    __slots__=()
+    @property
+    def hp_pct(self): return self.hp_cur/self.hp_max*100 if self.hp_max else 0.0
+    @property
+    def sp_pct(self): return self.sp_cur/self.sp_max*100 if self.sp_max else 0.0
+
+def parse(txt):
+    m_hp,m_sp=re_hp.search(txt),re_sp.search(txt)
+    if not (m_hp and m_sp): return None
+    return HpSp(*map(int,m_hp.groups()),*map(int,m_sp.groups()))
+
+def binarize(crop_bgr):
+    """Text pixels → True (text is the minority class whatever its colour)."""
+    gray=cv2.cvtColor(crop_bgr,cv2.COLOR_BGR2GRAY)
+    _,bw=cv2.threshold(gray,0,1,cv2.THRESH_BINARY_INV+cv2.THRESH_OTSU)
+    fg=bw.astype(bool)
+    return ~fg if fg.mean()>0.5 else fg
+
+def glyphs(fg):
+    """Split on all-empty columns → list of full-height (H,w) glyph bitmaps."""
+    col=np.concatenate(([False],fg.any(0),[False])).astype(np.int8)
+    d=np.diff(col); starts=np.where(d==1)[0]; ends=np.where(d==-1)[0]
+    return [fg[:,a:b] for a,b in zip(starts,ends)]
+
+
+class HpSpReader:
+    def __init__(self,crop=CROP,corpus=CORPUS,tesseract=True,record_dir=None):
+        self.crop=crop; self.use_tess=tesseract and pytesseract is not None
+        self.record_dir=Path(record_dir) if record_dir else None
+        self.exact={}                   # glyph bytes → char
+        self.by_w={}                    # width → (stack (K,H,w), [chars])
+        self.last_hash=None; self.value=None; self.changed=False
+        self.n={"cache":0,"tmpl":0,"tess":0,"miss":0}; self.last_ms=0.0
+        if corpus and Path(corpus,"truth.txt").exists(): self.train(corpus)
+
+    # ── templates ────────────────────────────────────────────────────────
+    def learn(self,fg,txt):
+        """Align glyphs with the characters of txt; False if counts differ."""
+        gl=glyphs(fg); chars=re.sub(r"\s+","",txt)
+        if len(gl)!=len(chars): return False
+        for g,ch in zip(gl,chars):
+            k=(g.shape,g.tobytes())
+            if k in self.exact: continue
+            self.exact[k]=ch
+            st,cs=self.by_w.get(g.shape,(np.zeros((0,*g.shape),bool),[]))
+            self.by_w[g.shape]=(np.concatenate([st,g[None]]),cs+[ch])
+        return True
+
+    def train(self,corpus):
+        corpus=Path(corpus); n=0
+        for ln in open(corpus/"truth.txt",encoding="utf-8"):
+            name,_,txt=ln.rstrip("\n").partition("\t")
+            img=cv2.imread(str(corpus/name))
+            if img is not None: n+=self.learn(binarize(img),txt)
+        return n
+
+    def match(self,fg):
+        """Decode with templates only → text or None on any unknown glyph."""
+        out=[]
+        for g in glyphs(fg):
+            ch=self.exact.get((g.shape,g.tobytes()))
+            if ch is None:
+                st,cs=self.by_w.get(g.shape,(None,None))
+                if st is None: return None
+                dist=(st!=g).sum((1,2)); i=int(dist.argmin())
+                if dist[i]>MAX_DIST: return None
+                ch=cs[i]
+            out.append(ch)
+        return "".join(out)
+
+    # ── reading ──────────────────────────────────────────────────────────
+    def tesseract(self,crop_bgr):
+        up=cv2.resize(crop_bgr,None,fx=UPSCALE,fy=UPSCALE,interpolation=cv2.INTER_LINEAR)
+        gray=cv2.cvtColor(up,cv2.COLOR_BGR2GRAY)
+        _,bw=cv2.threshold(gray,0,255,cv2.THRESH_BINARY+cv2.THRESH_OTSU)
+        return pytesseract.image_to_string(bw,config=OCR_CFG)
+
+    def read_crop(self,crop_bgr):
+        t0=time.perf_counter()
+        fg=binarize(crop_bgr)
+        h=hashlib.blake2b(np.packbits(fg).tobytes(),digest_size=8).digest()
+        self.changed = h!=self.last_hash
+        if not self.changed:
+            self.n["cache"]+=1
+        else:
+            self.last_hash=h
+            txt=self.match(fg); v=parse(txt) if txt else None
+            if v: self.n["tmpl"]+=1
+            elif self.use_tess:
+                txt=self.tesseract(crop_bgr); v=parse(txt); self.n["tess"]+=1
+                if v:
+                    self.learn(fg,txt)
+                    if self.record_dir: self.record(crop_bgr,txt)
+            if v is None: self.n["miss"]+=1
+            else: self.value=v
+        self.last_ms=(time.perf_counter()-t0)*1000
+        return self.value
+
+    def read(self,frame):
+        x1,y1,x2,y2=self.crop
+        return self.read_crop(frame[y1:y2,x1:x2])
+
+    def record(self,crop_bgr,txt):
+        self.record_dir.mkdir(parents=True,exist_ok=True)
+        name=f"{int(time.time()*1000)}.png"
+        cv2.imwrite(str(self.record_dir/name),crop_bgr)
+        with open(self.record_dir/"truth.txt","a",encoding="utf-8") as f:
+            f.write(f"{name}\t{' '.join(txt.split())}\n")     # verify by hand
+
+    def fmt(self):
+        n=self.n
+        return f"ocr {self.last_ms:.2f}ms c{n['cache']}/t{n['tmpl']}/T{n['tess']}/x{n['miss']}"
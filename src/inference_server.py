@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+inference_server.py  –  one model, many bot clients, micro-batched forwards
+────────────────────────────────────────────────────────────────────────────
+    python src/inference_server.py --model models/best_v12n2.pt --max-batch 8
+    python src/test_rag.py 0 "Ragnarok"     # with DETECTOR = "server"
+    python src/test_rag.py 1 "Ragnarok 2"   #   (one bot per window / OBS cam)
+
+  transport   multiprocessing.connection (localhost, authkey) for the small
+              control messages; every client owns a SharedMemory block the
+              server maps once, so a 1080p frame never gets pickled
+  batching    requests queue up; the batcher takes the first, then waits at
+              most --max-wait-ms for up to --max-batch more and runs them
+              as ONE forward (Ultralytics list call; other backends loop)
+  replies     (seq, xyxy, cls, conf) NumPy arrays, per client, in order
+
+Client side: load_detector("server") / ("server:47100") → RemoteDetector,
+called exactly like any other detector.
+"""
+
+import argparse, os, queue, threading, time
+from multiprocessing import shared_memory
+from multiprocessing.connection import Client, Listener
+import numpy as np
+from frame_ring import attach_shm
+
+PORT    = 47100
+AUTHKEY = b"ragbot"
+MAX_FRAME = (1080,1920)      # largest frame a client can send (h, w)
+
+# ═════════ client ════════════════════════════════════════════════════════
+class RemoteDetector:
+    """Detector proxy: copies the frame into its shared block, asks the
+    server, blocks for the reply (the block is reused for the next call)."""
+    def __init__(self,port=PORT,host="127.0.0.1",max_frame=MAX_FRAME):
+        from detectors import make_result
+        self.make_result=make_result
+        self.shm=shared_memory.SharedMemory(create=True,size=max_frame[0]*max_frame[1]*3)
+        self.conn=Client((host,port),authkey=AUTHKEY)
+        self.conn.send(("hello",self.shm.name,os.getpid())); self.seq=0
+
+    def __call__(self,frame,imgsz=416,conf=0.25,iou=0.45,verbose=False,**_):
+        h,w=frame.shape[:2]
+        if h*w*3>self.shm.size: raise ValueError(f"frame {w}×{h} exceeds the shared block")
+        np.copyto(np.ndarray((h,w,3),np.uint8,self.shm.buf),frame)
+        self.seq+=1; self.conn.send(("infer",self.seq,h,w,imgsz,conf,iou))
+        seq,xyxy,cls,cf=self.conn.recv()
+        assert seq==self.seq, f"reply {seq} for request {self.seq}"
+        return [self.make_result(xyxy,cls,cf,frame.shape)]
+
+    def close(self):
+        try: self.conn.close()
+        finally: self.shm.close(); self.shm.unlink()
+
+# ═════════ server ════════════════════════════════════════════════════════
+class Server:
+    def __init__(self,model,max_batch=8,max_wait_ms=4.0,port=PORT):
+        self.model=model; self.max_batch=max_batch; self.max_wait=max_wait_ms/1000
+        self.listener=Listener(("127.0.0.1",port),authkey=AUTHKEY)
+        self.q=queue.Queue(); self.clients=0
+        self.batches=0; self.frames=0; self.busy=0.0
+
+    def serve_client(self,conn):
+        """Per-connection reader: requests → shared queue."""
+        shm=None
+        try:
+            _,name,pid=conn.recv(); shm=attach_shm(name); self.clients+=1
+            print(f"🔌 client pid={pid} ({self.clients} connected)")
+            while True:
+                _,seq,h,w,imgsz,conf,iou=conn.recv()
+                self.q.put((conn,seq,np.ndarray((h,w,3),np.uint8,shm.buf),(imgsz,conf,iou)))
+        except (EOFError,ConnectionResetError,OSError): pass
+        finally:
+            self.clients-=1; conn.close()
+            if shm: shm.close()
+            print(f"👋 client left ({self.clients} connected)")
+
+    def take_batch(self):
+        batch=[self.q.get()]; deadline=time.perf_counter()+self.max_wait
+        while len(batch)<self.max_batch:
+            left=deadline-time.perf_counter()
+            if left<=0: break
+            try: batch.append(self.q.get(timeout=left))
+            except queue.Empty: break
+        return batch
+
+    def forward(self,frames,imgsz,conf,iou):
+        from detectors import to_numpy
+        if hasattr(self.model,"predict") and len(frames)>1:   # Ultralytics: one batched pass
+            res=self.model(frames,imgsz=imgsz,conf=conf,iou=iou,verbose=False)
+        else:
+            res=[self.model(f,imgsz=imgsz,conf=conf,iou=iou,verbose=False)[0] for f in frames]
+        return [to_numpy(r) for r in res]
+
+    def batch_loop(self):
+        while True:
+            batch=self.take_batch(); t0=time.perf_counter()
+            groups={}                                   # same (imgsz, conf, iou) → one forward
+            for item in batch: groups.setdefault(item[3],[]).append(item)
+            for params,items in groups.items():
+                try: outs=self.forward([it[2] for it in items],*params)
+                except Exception as e:
+                    print(f"[server] {type(e).__name__}: {e}")
+                    outs=[(np.zeros((0,4),np.float32),np.zeros(0,np.float32),np.zeros(0,np.float32))]*len(items)
+                for (conn,seq,_,_),(xyxy,cls,cf) in zip(items,outs):
+                    try: conn.send((seq,xyxy,cls,cf))
+                    except OSError: pass                # client went away mid-batch
+            self.busy+=time.perf_counter()-t0; self.batches+=1; self.frames+=len(batch)
+
+    def report(self,every=5.0):
+        while True:
+            time.sleep(every)
+            if self.batches:
+                print(f"[server] clients={self.clients} {self.frames/every:5.1f} frames/s "
+                      f"batch={self.frames/self.batches:.2f} busy={self.busy/every*100:3.0f}%")
+            self.batches=self.frames=0; self.busy=0.0
+
+    def run(self):
+        for fn in (self.batch_loop,self.report): threading.Thread(target=fn,daemon=True).start()
+        print(f"🚀 inference server on 127.0.0.1:{self.listener.address[1]} "
+              f"(max batch {self.max_batch}, wait ≤ {self.max_wait*1000:.0f} ms)")
+        while True:
+            conn=self.listener.accept()
+            threading.Thread(target=self.serve_client,args=(conn,),daemon=True).start()
+
+def main():
+    ap=argparse.ArgumentParser(formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+    ap.add_argument("--model",default="models/best_v12n2.pt",help="any load_detector() spec")
+    ap.add_argument("--port",type=int,default=PORT)
+    ap.add_argument("--max-batch",type=int,default=8)
+    ap.add_argument("--max-wait-ms",type=float,default=4.0,help="bounded wait to fill a batch")
+    args=ap.parse_args()
+    from detectors import load_detector
+    Server(load_detector(args.model),args.max_batch,args.max_wait_ms,args.port).run()
+
+if __name__=="__main__":
+    main()
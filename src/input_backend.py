@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+input_backend.py  –  what the bot's clicks / key presses are sent to
+────────────────────────────────────────────────────────────────────────────
+Three primitives, nothing blocks (hold times are scheduled by the
+ActionExecutor in pipeline.py, not slept here):
+
+    move(x, y)            absolute cursor move
+    button(btn, down)     mouse button down / up
+    key(k, down)          key down / up
+
+  make_backend("interception")          the real driver (Windows rig)
+  make_backend("null")                  drop everything
+  make_backend("record:trace.jsonl")    log every action, send nowhere
+  make_backend("record:trace.jsonl+interception")   log AND send
+
+Trace lines: {"t": <s since backend start>, "op": "key", "a": ["f2", true]}
+
+Compare two traces (e.g. two bot versions on the same replay):
+    python src/input_backend.py diff old.jsonl new.jsonl
+"""
+
+import json, sys, threading, time
+from collections import Counter
+
+class NullBackend:
+    name="null"
+    def move(self,x,y): pass
+    def button(self,btn,down): pass
+    def key(self,k,down): pass
+    def close(self): pass
+
+
+class InterceptionBackend(NullBackend):
+    name="interception"
+    def __init__(self):
+        import interception
+        self.ic=interception; interception.auto_capture_devices()
+    def move(self,x,y): self.ic.move_to(int(x),int(y))
+    def button(self,btn,down): (self.ic.mouse_down if down else self.ic.mouse_up)(btn)
+    def key(self,k,down): (self.ic.key_down if down else self.ic.key_up)(k)
+
+
+class RecorderBackend(NullBackend):
+    """Appends every action to a JSONL trace, optionally forwarding it."""
+    name="record"
+    def __init__(self,path,inner=None):
+        self.f=open(path,"w"); self.inner=inner or NullBackend()
+        self.t0=time.perf_counter(); self.lock=threading.Lock(); self.n=0
+    def _log(self,op,*a):
+        ln=json.dumps({"t":round(time.perf_counter()-self.t0,6),"op":op,"a":list(a)})
+        with self.lock: self.f.write(ln+"\n"); self.n+=1
+    def move(self,x,y):       self._log("move",int(x),int(y)); self.inner.move(x,y)
+    def button(self,btn,down): self._log("button",btn,down);   self.inner.button(btn,down)
+    def key(self,k,down):     self._log("key",k,down);         self.inner.key(k,down)
+    def close(self):
+        with self.lock: self.f.close()
+        self.inner.close()
+
+
+def make_backend(spec):
+    if spec.startswith("record:"):
+        path,_,inner=spec[7:].partition("+")
+        return RecorderBackend(path,make_backend(inner) if inner else None)
+    if spec=="interception":
+        try: return InterceptionBackend()
+        except ImportError:
+            print("⚠️  interception not available – inputs go nowhere"); return NullBackend()
+    if spec=="null": return NullBackend()
+    raise ValueError(f"unknown input backend {spec!r}")
+
+# ── trace diff ───────────────────────────────────────────────────────────────
+def load_trace(path):
+    return [json.loads(ln) for ln in open(path) if ln.strip()]
+
+def presses(tr):
+    """Key / button *down* events → [(t, name)]."""
+    return [(e["t"],str(e["a"][0])) for e in tr if e["op"] in ("key","button") and e["a"][1]]
+
+def diff(a,b):
+    pa,pb=presses(load_trace(a)),presses(load_trace(b))
+    ca,cb=Counter(n for _,n in pa),Counter(n for _,n in pb)
+    print(f"{'input':10} {'A':>6} {'B':>6} {'Δ':>6}")
+    for k in sorted(set(ca)|set(cb)):
+        print(f"{k:10} {ca[k]:6} {cb[k]:6} {cb[k]-ca[k]:+6}")
+    for name,p in (("A",pa),("B",pb)):
+        if len(p)>1:
+            gaps=sorted(p[i+1][0]-p[i][0] for i in range(len(p)-1))
+            print(f"{name}: {len(p)} presses over {p[-1][0]-p[0][0]:.1f}s, "
+                  f"median gap {gaps[len(gaps)//2]*1000:.0f} ms")
+
+if __name__=="__main__":
+    if len(sys.argv)!=4 or sys.argv[1]!="diff":
+        sys.exit("usage: input_backend.py diff <a.jsonl> <b.jsonl>")
+    diff(sys.argv[2],sys.argv[3])
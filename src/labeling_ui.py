@@ -1,13 +1,16 @@
 #!/usr/bin/env python3
 # Ragnarok dataset labelling – coloured boxes + text + real images
 
-import os, glob, yaml, tkinter as tk, cv2, numpy as np
+import os, glob, yaml, threading, queue, tkinter as tk, cv2, numpy as np
+from collections import OrderedDict
 from tkinter import ttk, messagebox
 from PIL import Image, ImageTk, ImageDraw, ImageFont
-from ultralytics import YOLO
+from detectors import load_detector
 
-MODEL_PATH   = "models/YOLOV12N_5090.pt"   # ← set your trained model here
+MODEL_PATH   = "models/YOLOV12N_5090.pt"   # ← set your trained model here (.pt or .onnx)
 CONF_THRES   = 0.5        # confidence threshold for auto-detect
+PREFETCH_N   = 4          # decode this many images ahead / behind
+CACHE_SIZE   = 24         # decoded images kept in memory (LRU)
 
 # ── project paths ─────────────────────────────────────────────────────────────
 ROOT      = os.path.dirname(os.path.abspath(__file__))
@@ -62,6 +65,109 @@ def load_boxes(lbl_path,w,h):
             out.append([cls,x1,y1,x2,y2])
     return out
 
+def render_preview(img,boxes,prevp):
+    """Coloured boxes + class text on a copy of img → JPEG at prevp."""
+    w,h=img.size
+    p=img.copy(); d=ImageDraw.Draw(p)
+    font=ImageFont.load_default()
+    for cls,x1,y1,x2,y2,*_ in boxes:
+        col_hex = CLS_COL.get(cls, "#ffffff")
+        col_rgb = tuple(int(col_hex[i:i+2], 16) for i in (1, 3, 5))
+
+        # ── clamp inside image then re-sort so x1≤x2, y1≤y2 ──────────────
+        x1c = max(0, min(x1, w-1));  x2c = max(0, min(x2, w-1))
+        y1c = max(0, min(y1, h-1));  y2c = max(0, min(y2, h-1))
+        if x2c < x1c: x1c, x2c = x2c, x1c
+        if y2c < y1c: y1c, y2c = y2c, y1c
+
+        d.rectangle([x1c, y1c, x2c, y2c], outline=col_rgb, width=2)
+        txt=f"{cls}-{CLS_NAMES[cls]}"
+        # outline: draw white shadows around main text
+        for off in ((-1,0),(1,0),(0,-1),(0,1)):
+            d.text((x1+4+off[0], y1+2+off[1]), txt, fill=(255,255,255), font=font)
+        for off in ((-1,0),(1,0),(0,-1),(0,1)):
+            d.text((x1c+4+off[0], y1c+2+off[1]), txt,
+                   fill=(255,255,255), font=font)
+        d.text((x1c+4, y1c+2), txt, fill=(0,0,0), font=font)
+    p.save(prevp, quality=90)
+
+def lbl_path_for(img_path):
+    return os.path.join(LBL_DIR, os.path.splitext(os.path.basename(img_path))[0]+".txt")
+
+# ── decoded-image LRU + prefetch thread ──────────────────────────────────────
+class ImageCache:
+    """path → (decoded PIL image, saved boxes).  A daemon thread decodes the
+    neighbours of the current image so Left/Right is usually a cache hit.
+    (ImageTk.PhotoImage must still be built on the Tk thread.)"""
+    def __init__(self,size=CACHE_SIZE):
+        self.size=size; self.d=OrderedDict(); self.lock=threading.Lock()
+        self.want=queue.Queue(); self.hits=self.misses=0
+        threading.Thread(target=self._run,daemon=True).start()
+
+    @staticmethod
+    def decode(path):
+        img=Image.open(path); img.load()            # force the JPEG decode now
+        return img,load_boxes(lbl_path_for(path),*img.size)
+
+    def get(self,path):
+        with self.lock:
+            if path in self.d:
+                self.d.move_to_end(path); self.hits+=1; return self.d[path]
+        self.misses+=1
+        return self.put(path,*self.decode(path))
+
+    def put(self,path,img,boxes):
+        with self.lock: self._insert(path,img,boxes)
+        return img,boxes
+
+    def put_if_absent(self,path,img,boxes):
+        """Insert unless the path is cached already (check + insert in one hold,
+        so a prefetched decode never overwrites boxes the UI just saved)."""
+        with self.lock:
+            if path in self.d: return False
+            self._insert(path,img,boxes); return True
+
+    def _insert(self,path,img,boxes):
+        self.d[path]=(img,boxes); self.d.move_to_end(path)
+        while len(self.d)>self.size: self.d.popitem(last=False)
+
+    def drop(self,path):
+        with self.lock: self.d.pop(path,None)
+
+    def prefetch(self,paths):
+        """Replace the pending wish-list (nearest first)."""
+        while not self.want.empty():
+            try: self.want.get_nowait()
+            except queue.Empty: break
+        for p in paths: self.want.put(p)
+
+    def close(self):
+        self.prefetch([]); self.want.put(None)      # wakes and ends the prefetch thread
+
+    def _run(self):
+        while True:
+            p=self.want.get()
+            if p is None: break
+            with self.lock:
+                if p in self.d: continue
+            try: img,boxes=self.decode(p)
+            except OSError: continue                 # deleted / unreadable
+            self.put_if_absent(p,img,boxes)          # UI got there first (maybe saved) → keep its
+
+# ── background preview writer ────────────────────────────────────────────────
+class PreviewWriter:
+    def __init__(self):
+        self.q=queue.Queue()
+        self.t=threading.Thread(target=self._run,daemon=True); self.t.start()
+    def submit(self,img,boxes,prevp): self.q.put((img,[list(b[:5]) for b in boxes],prevp))
+    def _run(self):
+        while True:
+            job=self.q.get()
+            if job is None: break
+            try: render_preview(*job)
+            except OSError as e: print("preview:",e)
+    def close(self): self.q.put(None); self.t.join()
+
 # ── main UI class ────────────────────────────────────────────────────────────
 class LabelUI(tk.Tk):
     SIDEBAR_W = 330
@@ -135,10 +241,16 @@ class LabelUI(tk.Tk):
         self.img=None; self.tk_img=None
         self.boxes=[]; self.saved=[]
 
-        self.yolo = YOLO(MODEL_PATH) if os.path.exists(MODEL_PATH) else None
+        self.cache = ImageCache(); self.previews = PreviewWriter()
+        self.protocol("WM_DELETE_WINDOW", self.on_close)
+
+        self.yolo = load_detector(MODEL_PATH) if os.path.exists(MODEL_PATH) else None
         self.auto_classify = self.auto_detect
         self.load_img()
 
+    def on_close(self):
+        self.cache.close(); self.previews.close(); self.destroy()   # unsaved edits are discarded, as before
+
     # text widget helper
     def make_box(self,parent,label):
         ttk.Label(parent,text=label,font=("Segoe UI",12,"bold")
@@ -154,16 +266,18 @@ class LabelUI(tk.Tk):
     def load_img(self):
         self.canvas.delete("all"); self.boxes.clear()
         path = img_paths[self.idx]
-        self.img = Image.open(path)
+        self.img, saved = self.cache.get(path)
         self.tk_img = ImageTk.PhotoImage(self.img)
         self.canvas.config(scrollregion=(0,0,*self.img.size))
         self.canvas.create_image(0,0,anchor="nw",image=self.tk_img)
 
-        base=os.path.splitext(os.path.basename(path))[0]
-        self.saved = load_boxes(os.path.join(LBL_DIR,f"{base}.txt"),*self.img.size)
+        self.saved = [list(b) for b in saved]
         for cls,x1,y1,x2,y2 in self.saved:
             self.add_box(cls,x1,y1,x2,y2)
         self.refresh_info()
+        n=len(img_paths)
+        self.cache.prefetch([img_paths[(self.idx+k*sgn)%n]
+                             for k in range(1,PREFETCH_N+1) for sgn in (1,-1)])
 
     def save_labels(self):
         base=os.path.splitext(os.path.basename(img_paths[self.idx]))[0]
@@ -182,30 +296,9 @@ class LabelUI(tk.Tk):
         elif os.path.exists(lblp):
             os.remove(lblp)
 
-        # redraw preview with coloured boxes + text
-        prevp = os.path.join(PREV_DIR, base + ".jpg")
-        p=self.img.copy(); d=ImageDraw.Draw(p)
-        font=ImageFont.load_default()
-        for cls,x1,y1,x2,y2,*_ in self.boxes:
-            col_hex = CLS_COL.get(cls, "#ffffff")
-            col_rgb = tuple(int(col_hex[i:i+2], 16) for i in (1, 3, 5))
-
-            # ── clamp inside image then re-sort so x1≤x2, y1≤y2 ──────────
-            x1c = max(0, min(x1, w-1));  x2c = max(0, min(x2, w-1))
-            y1c = max(0, min(y1, h-1));  y2c = max(0, min(y2, h-1))
-            if x2c < x1c: x1c, x2c = x2c, x1c
-            if y2c < y1c: y1c, y2c = y2c, y1c
-
-            d.rectangle([x1c, y1c, x2c, y2c], outline=col_rgb, width=2)
-            txt=f"{cls}-{CLS_NAMES[cls]}"
-            # outline: draw white shadows around main text
-            for off in ((-1,0),(1,0),(0,-1),(0,1)):
-                d.text((x1+4+off[0], y1+2+off[1]), txt, fill=(255,255,255), font=font)
-            for off in ((-1,0),(1,0),(0,-1),(0,1)):
-                d.text((x1c+4+off[0], y1c+2+off[1]), txt,
-                       fill=(255,255,255), font=font)
-            d.text((x1c+4, y1c+2), txt, fill=(0,0,0), font=font)
-        p.save(prevp, quality=90)
+        # keep the cache in sync, preview is rendered off the UI thread
+        self.cache.put(img_paths[self.idx],self.img,[list(b[:5]) for b in self.boxes])
+        self.previews.submit(self.img,self.boxes,os.path.join(PREV_DIR, base + ".jpg"))
 
     # ── navigation ----------------------------------------------------------
     def next_img(self):
@@ -268,7 +361,7 @@ class LabelUI(tk.Tk):
                   os.path.join(PREV_DIR,base+".jpg"),
                   os.path.join(LBL_DIR,base+".txt")]:
             if os.path.exists(p): os.remove(p)
-        img_paths.pop(self.idx)
+        self.cache.drop(img_paths.pop(self.idx))
         if not img_paths: self.quit(); return
         self.idx%=len(img_paths); self.load_img()
 
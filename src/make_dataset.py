@@ -1,46 +1,141 @@
-# make_dataset_multi.py
-import random, glob, os
+#!/usr/bin/env python3
+"""
+make_dataset.py  –  synthetic multi-class dataset (sprites pasted on backgrounds)
+---------------------------------------------------------------------------
+Usage
+    python src/make_dataset.py                          # 300 imgs, like before
+    python src/make_dataset.py -n 200000 --workers 8 --per-image 1 6
+    python src/make_dataset.py --val 0.1 --prefix synth --seed 7
+---------------------------------------------------------------------------
+  • backgrounds + sprites are decoded ONCE per worker into NumPy arrays
+  • several sprites per image (random count, scale, h-flip), placements that
+    overlap an earlier box by more than --max-overlap (IoU) are re-drawn
+  • alpha blending is a vectorised NumPy op on the sprite's ROI only
+  • class ids come from class2idx (sprite folder name → ragnarok_multi.yaml);
+    --grf adds every decoded SPR/ACT pose (grf_sprites.py), classed by colour
+  • work is cut into fixed chunks, chunk k always uses seed (seed, k), so the
+    output is identical whatever the worker count / scheduling
+  • every image is written as soon as it is composed (no buffering)
+"""
+import argparse, glob, os, time
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from PIL import Image
+import cv2, numpy as np, yaml
 
+ROOT     = Path(__file__).resolve().parent.parent
+DS       = ROOT/"ragnarok-dataset"
+YAML_CFG = DS/"ragnarok_multi.yaml"
 OUT_W, OUT_H = 1280, 720
-N_IMAGES = 300     # total
-TRAIN_SPLIT = 1
-
-random.seed(42)
-bg_list = glob.glob("../ragnarok-dataset/backgrounds/*")
-class_dirs = sorted([d for d in glob.glob("../ragnarok-dataset/sprites/*") if os.path.isdir(d)])
-class2idx = {os.path.basename(d): i for i, d in enumerate(class_dirs)}
-print("Classes:", class2idx)
-
-# saída
-for sub in ("../ragnarok-dataset/images/train", "../ragnarok-dataset/images/val", "../ragnarok-dataset/labels/train", "../ragnarok-dataset/labels/val"):
-    Path(sub).mkdir(parents=True, exist_ok=True)
-
-def place_sprite(bg_img, sp_img):
-    bg = bg_img.convert("RGBA").resize((OUT_W, OUT_H))
-    scale = random.uniform(0.8, 1.3)
-    sp = sp_img.resize((int(sp_img.width*scale), int(sp_img.height*scale)), Image.LANCZOS).convert("RGBA")
-    max_x, max_y = OUT_W - sp.width, OUT_H - sp.height
-    x0, y0 = random.randint(0, max_x), random.randint(0, max_y)
-    bg.alpha_composite(sp, (x0, y0))
-    cx, cy = (x0 + sp.width/2)/OUT_W, (y0 + sp.height/2)/OUT_H
-    w, h = sp.width/OUT_W, sp.height/OUT_H
-    return bg.convert("RGB"), (cx, cy, w, h)
-
-for idx in range(N_IMAGES):
-    bg = Image.open(random.choice(bg_list))
-    cls_dir = random.choice(class_dirs)
-    cls_name = os.path.basename(cls_dir)
-    sp = Image.open(random.choice(glob.glob(f"{cls_dir}/*")))
-    img, (cx, cy, w, h) = place_sprite(bg, sp)
-
-    split = "train" if random.random() < TRAIN_SPLIT else "val"
-    img_name = f"pink_reinf_{idx:05}.jpg"
-    lbl_name = img_name.replace(".jpg", ".txt")
-    ind = 4
-    img.save(f"../ragnarok-dataset/images/{split}/{img_name}", quality=90)
-    with open(f"../ragnarok-dataset/labels/{split}/{lbl_name}", "w") as f:
-        f.write(f"{ind} {cx:.6f} {cy:.6f} {w:.6f} {h:.6f}\n")
-
-print("✅ Dataset multi-classe gerado com", len(class_dirs), "classes.")
+CHUNK    = 250
+
+def class_index():
+    names=yaml.safe_load(open(YAML_CFG,encoding="utf-8"))["names"]
+    names=[names[i] for i in range(len(names))] if isinstance(names,dict) else list(names)
+    return {n:i for i,n in enumerate(names)}
+
+def sprite_sources(sprite_dir):
+    """class2idx + [(cls, png path)] for every sprites/<class>/*.png."""
+    idx=class_index(); out=[]
+    for d in sorted(glob.glob(os.path.join(sprite_dir,"*"))):
+        name=os.path.basename(d)
+        if not os.path.isdir(d): continue
+        if name not in idx: print(f"⚠️   {name}: not in ragnarok_multi.yaml, skipped"); continue
+        out+=[(idx[name],p) for p in sorted(glob.glob(os.path.join(d,"*.png")))]
+    return {n:i for n,i in idx.items() if any(c==i for c,_ in out)},out
+
+# ── per-worker caches ────────────────────────────────────────────────────────
+_BG=None; _SP=None
+
+def load_assets(bg_dir,sprite_dir,grf_dir=None):
+    global _BG,_SP
+    cv2.setNumThreads(1)
+    _BG=[cv2.resize(cv2.imread(p),(OUT_W,OUT_H),interpolation=cv2.INTER_AREA)
+         for p in sorted(glob.glob(os.path.join(bg_dir,"*.jpg")))]
+    _SP=[]
+    for c,p in sprite_sources(sprite_dir)[1]:
+        im=cv2.imread(p,cv2.IMREAD_UNCHANGED)
+        if im is None: continue
+        if im.shape[2]==3: im=np.dstack([im,np.full(im.shape[:2],255,np.uint8)])
+        _SP.append((c,im))
+    if grf_dir:                             # every pose straight from .spr/.act
+        from grf_sprites import all_frames
+        _SP+=[(f.cls,cv2.cvtColor(f.rgba,cv2.COLOR_RGBA2BGRA)) for f in all_frames(grf_dir)
+              if f.cls>=0]                  # -1: no confident class colour (item art) → skipped
+    if not _BG or not _SP: raise SystemExit("❌  no backgrounds or sprites found")
+
+def box_iou(b,boxes):
+    if not boxes: return 0.0
+    a=np.asarray(boxes,np.float32)
+    iw=np.clip(np.minimum(b[2],a[:,2])-np.maximum(b[0],a[:,0]),0,None)
+    ih=np.clip(np.minimum(b[3],a[:,3])-np.maximum(b[1],a[:,1]),0,None)
+    inter=iw*ih; ar=lambda x: (x[...,2]-x[...,0])*(x[...,3]-x[...,1])
+    return float((inter/(ar(np.asarray(b,np.float32))+ar(a)-inter)).max())
+
+def blend(dst,sp,x0,y0):
+    """Alpha-composite BGRA sprite onto BGR dst in place."""
+    h,w=sp.shape[:2]; roi=dst[y0:y0+h,x0:x0+w]
+    a=sp[...,3:4].astype(np.float32)*(1/255)
+    roi[:]=(roi*(1-a)+sp[...,:3]*a).astype(np.uint8)
+
+def compose(rng,args):
+    img=_BG[rng.integers(len(_BG))].copy(); boxes=[]; labels=[]
+    for _ in range(rng.integers(args.per_image[0],args.per_image[1]+1)):
+        c,sp=_SP[rng.integers(len(_SP))]
+        s=rng.uniform(*args.scale)
+        sp=cv2.resize(sp,None,fx=s,fy=s,interpolation=cv2.INTER_AREA if s<1 else cv2.INTER_LINEAR)
+        if rng.random()<0.5: sp=sp[:,::-1]
+        h,w=sp.shape[:2]
+        if w>=OUT_W or h>=OUT_H: continue
+        for _ in range(10):                           # overlap control
+            x0,y0=int(rng.integers(0,OUT_W-w)),int(rng.integers(0,OUT_H-h))
+            b=(x0,y0,x0+w,y0+h)
+            if box_iou(b,boxes)<=args.max_overlap: break
+        else: continue
+        blend(img,sp,x0,y0); boxes.append(b)
+        labels.append(f"{c} {(x0+w/2)/OUT_W:.6f} {(y0+h/2)/OUT_H:.6f} {w/OUT_W:.6f} {h/OUT_H:.6f}\n")
+    return img,labels
+
+def run_chunk(k,args):
+    rng=np.random.default_rng([args.seed,k]); out=Path(args.out); n=0
+    for idx in range(k*CHUNK,min((k+1)*CHUNK,args.n)):
+        img,labels=compose(rng,args)
+        split="val" if rng.random()<args.val else "train"
+        name=f"{args.prefix}_{idx:06}"
+        cv2.imwrite(str(out/"images"/split/f"{name}.jpg"),img,[int(cv2.IMWRITE_JPEG_QUALITY),90])
+        with open(out/"labels"/split/f"{name}.txt","w") as f: f.writelines(labels)
+        n+=1
+    return n
+
+def parse():
+    ap=argparse.ArgumentParser(formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+    ap.add_argument("-n",type=int,default=300,help="total images")
+    ap.add_argument("--out",default=str(DS))
+    ap.add_argument("--backgrounds",default=str(DS/"backgrounds"))
+    ap.add_argument("--sprites",default=str(DS/"sprites"))
+    ap.add_argument("--grf",default=None,help="also sample every SPR/ACT frame under this dir"
+                    " (e.g. 'grfs editadas'); class = sprite colour")
+    ap.add_argument("--per-image",type=int,nargs=2,default=[1,4],metavar=("MIN","MAX"))
+    ap.add_argument("--scale",type=float,nargs=2,default=[0.8,1.3],metavar=("MIN","MAX"))
+    ap.add_argument("--max-overlap",type=float,default=0.1,help="max IoU between pasted sprites")
+    ap.add_argument("--val",type=float,default=0.0,help="fraction to val split")
+    ap.add_argument("--prefix",default="synth")
+    ap.add_argument("--seed",type=int,default=42)
+    ap.add_argument("--workers",type=int,default=os.cpu_count() or 1)
+    return ap.parse_args()
+
+def main():
+    args=parse()
+    class2idx,_=sprite_sources(args.sprites)
+    print("Classes:",class2idx)
+    for sub in ("images/train","images/val","labels/train","labels/val"):
+        Path(args.out,sub).mkdir(parents=True,exist_ok=True)
+    chunks=range((args.n+CHUNK-1)//CHUNK); t0=time.time(); done=0
+    with ProcessPoolExecutor(args.workers,initializer=load_assets,
+                             initargs=(args.backgrounds,args.sprites,args.grf)) as ex:
+        for n in ex.map(run_chunk,chunks,[args]*len(chunks)):
+            done+=n; dt=time.time()-t0
+            print(f"\r  {done}/{args.n}  {done/dt*3600:9.0f} img/h",end="",flush=True)
+    print(f"\n✅ Dataset multi-classe gerado com {len(class2idx)} classes em {time.time()-t0:.1f}s.")
+
+if __name__=="__main__":
+    main()
@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+manifest.py  –  SQLite manifest + perceptual-hash dedup for captured_dataset
+────────────────────────────────────────────────────────────────────────────
+One row per saved sample (captured_dataset/manifest.sqlite):
+
+    path     images/… .jpg relative to the dataset root   folder  "" | cards
+    session  bot run that captured it                      ts      ms timestamp
+    phash    64-bit dHash of the frame                     hist    {cls: count}
+    dup_of   path of the sample it nearly duplicates, or NULL
+    why      why the capture policy kept it (JSON scores), or NULL
+
+Near-duplicate = dHashes within `radius` bits AND the same class histogram
+(an 8×8 hash barely sees a small mob, so a new mob mix on the same spot is
+still worth keeping).  Hashes are searched with a BK-tree: the triangle
+inequality prunes whole subtrees, so a lookup touches a small fraction of
+the hashes.  Used in three places:
+
+  • capture time   SampleWriter drops a frame BEFORE it is JPEG-encoded when
+                   its folder already holds one within --radius
+  • offline        python src/manifest.py scan   captured_dataset   # index existing files
+                   python src/manifest.py dedup  captured_dataset --radius 6
+                   python src/manifest.py stats  captured_dataset
+  • splitting      create_dataset.py reads the manifest (non-duplicates only)
+"""
+
+import argparse, json, sqlite3, time
+from pathlib import Path
+import cv2, numpy as np
+
+DB_NAME = "manifest.sqlite"
+RADIUS  = 6                  # bits of 64; ≤ this → near-duplicate
+
+SCHEMA = """CREATE TABLE IF NOT EXISTS samples(
+    path TEXT PRIMARY KEY, folder TEXT, session TEXT, ts INTEGER,
+    w INTEGER, h INTEGER, phash INTEGER, hist TEXT, dup_of TEXT, why TEXT)"""
+
+def dhash(img,size=8):
+    """Difference hash: sign of horizontal gradients on a (size+1)×size
+    grey thumbnail → int with size² bits.  A strided view (~64 px per side)
+    feeds INTER_AREA, so a 1080p frame costs ~0.05 ms instead of ~8."""
+    h,w=img.shape[:2]; img=img[::max(1,h//64),::max(1,w//64)]
+    g=cv2.cvtColor(cv2.resize(img,(size+1,size),interpolation=cv2.INTER_AREA),cv2.COLOR_BGR2GRAY)
+    bits=(g[:,1:]>g[:,:-1]).ravel()
+    return int.from_bytes(np.packbits(bits).tobytes(),"big")
+
+def hamming(a,b): return (a^b).bit_count()
+
+# SQLite INTEGER is signed 64-bit
+def to_sql(h): return h-(1<<64) if h>=1<<63 else h
+def from_sql(h): return h+(1<<64) if h<0 else h
+
+class BKTree:
+    """Metric tree over hashes (Hamming); nodes are [hash, key, {dist: child}]."""
+    def __init__(self): self.root=None; self.n=0
+
+    def __len__(self): return self.n
+
+    def add(self,h,key=None):
+        self.n+=1
+        if self.root is None: self.root=[h,key,{}]; return
+        node=self.root
+        while True:
+            d=hamming(h,node[0]); nxt=node[2].get(d)
+            if nxt is None: node[2][d]=[h,key,{}]; return
+            node=nxt
+
+    def search(self,h,radius):
+        """[(dist, hash, key)] for every stored hash within radius."""
+        out=[]; stack=[self.root] if self.root else []
+        while stack:
+            node=stack.pop(); d=hamming(h,node[0])
+            if d<=radius: out.append((d,node[0],node[1]))
+            stack.extend(c for k,c in node[2].items() if d-radius<=k<=d+radius)
+        return out
+
+    def nearest(self,h,radius,match=None):
+        """Closest hit within radius whose key satisfies match(key), or None."""
+        hits=[x for x in self.search(h,radius) if match is None or match(x[2])]
+        return min(hits,key=lambda x:x[0]) if hits else None
+
+class Manifest:
+    def __init__(self,root):
+        self.root=Path(root); self.db=sqlite3.connect(self.root/DB_NAME)
+        self.db.execute(SCHEMA)
+        if "why" not in {r[1] for r in self.db.execute("PRAGMA table_info(samples)")}:
+            self.db.execute("ALTER TABLE samples ADD COLUMN why TEXT")      # pre-policy manifests
+        self.db.commit()
+
+    def add(self,path,folder,session,ts,w,h,phash,hist,dup_of=None,why=None):
+        self.db.execute("INSERT OR REPLACE INTO samples VALUES(?,?,?,?,?,?,?,?,?,?)",
+                        (str(path),folder,session,int(ts),w,h,to_sql(phash),json.dumps(hist),dup_of,
+                         None if why is None else json.dumps(why)))
+        self.db.commit()
+
+    def rows(self,where="1",args=()):
+        cur=self.db.execute(f"SELECT path,folder,session,ts,w,h,phash,hist,dup_of FROM samples WHERE {where}",args)
+        return [(p,f,s,ts,w,h,from_sql(ph),json.loads(hi),d) for p,f,s,ts,w,h,ph,hi,d in cur]
+
+    def paths(self): return {r[0] for r in self.db.execute("SELECT path FROM samples")}
+
+    def tree(self,folder):
+        """BK-tree of the folder's kept (non-duplicate) samples, keys (path, hist json)."""
+        t=BKTree()
+        q="SELECT path,phash,hist FROM samples WHERE folder=? AND dup_of IS NULL"
+        for p,ph,hi in self.db.execute(q,(folder,)): t.add(from_sql(ph),(p,hi))
+        return t
+
+    def close(self): self.db.close()
+
+def hist_of(detections):
+    """[(cls, box), …] → {cls: count} (JSON keys are strings, sorted)."""
+    h={}
+    for c,_ in sorted(detections,key=lambda d:d[0]): h[str(c)]=h.get(str(c),0)+1
+    return h
+
+def find_dup(tree,phash,hist,radius):
+    """Path of a kept sample within radius with the same histogram, or None."""
+    js=json.dumps(hist); hit=tree.nearest(phash,radius,lambda k: k[1]==js)
+    return hit[2][0] if hit else None
+
+def read_labels(p):
+    if not Path(p).exists(): return []
+    return [(int(ln.split()[0]),None) for ln in open(p) if len(ln.split())==5]
+
+# ── CLI ──────────────────────────────────────────────────────────────────────
+def scan(m):
+    """Index images already on disk that the manifest does not know yet."""
+    known=m.paths(); n=0
+    for img_dir in [m.root/"images",*m.root.glob("*/images")]:
+        folder="" if img_dir.parent==m.root else img_dir.parent.name
+        for ip in sorted(img_dir.glob("*.jpg")):
+            rel=ip.relative_to(m.root).as_posix()
+            if rel in known: continue
+            img=cv2.imread(str(ip))
+            if img is None: continue
+            ts=int(ip.stem) if ip.stem.isdigit() else int(ip.stat().st_mtime*1000)
+            hist=hist_of(read_labels(img_dir.parent/"labels"/f"{ip.stem}.txt"))
+            m.add(rel,folder,"scan",ts,img.shape[1],img.shape[0],dhash(img),hist); n+=1
+    print(f"✅ indexed {n} new samples ({len(known)+n} total)")
+
+def dedup(m,radius):
+    """Re-mark duplicates: per folder, oldest first, a sample within radius
+    of an already kept one gets dup_of = that sample."""
+    m.db.execute("UPDATE samples SET dup_of=NULL"); n=0
+    for (folder,) in m.db.execute("SELECT DISTINCT folder FROM samples").fetchall():
+        t=BKTree(); marks=[]
+        q="SELECT path,phash,hist FROM samples WHERE folder=? ORDER BY ts"
+        for p,ph,hi in m.db.execute(q,(folder,)).fetchall():
+            h=from_sql(ph); dup=find_dup(t,h,json.loads(hi),radius)
+            if dup: marks.append((dup,p))
+            else: t.add(h,(p,hi))
+        m.db.executemany("UPDATE samples SET dup_of=? WHERE path=?",marks); n+=len(marks)
+    m.db.commit()
+    total=m.db.execute("SELECT COUNT(*) FROM samples").fetchone()[0]
+    print(f"🧹 {n}/{total} near-duplicates (radius {radius}) – create_dataset.py skips them")
+
+def stats(m):
+    print(f"{'folder':8} {'session':18} {'samples':>8} {'dups':>6}  classes")
+    q="SELECT folder,session,COUNT(*),SUM(dup_of IS NOT NULL) FROM samples GROUP BY folder,session"
+    for folder,session,n,d in m.db.execute(q).fetchall():
+        hist={}
+        for (hi,) in m.db.execute("SELECT hist FROM samples WHERE folder=? AND session=? AND dup_of IS NULL",(folder,session)):
+            for c,k in json.loads(hi).items(): hist[c]=hist.get(c,0)+k
+        print(f"{folder or '-':8} {session:18} {n:8} {d:6}  "+" ".join(f"{c}:{k}" for c,k in sorted(hist.items())))
+
+def main():
+    ap=argparse.ArgumentParser(formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+    ap.add_argument("cmd",choices=("scan","dedup","stats"))
+    ap.add_argument("root",nargs="?",default="captured_dataset")
+    ap.add_argument("--radius",type=int,default=RADIUS,help="Hamming bits (of 64)")
+    args=ap.parse_args()
+    m=Manifest(args.root); t=time.perf_counter()
+    {"scan":scan,"dedup":lambda m: dedup(m,args.radius),"stats":stats}[args.cmd](m)
+    print(f"({time.perf_counter()-t:.2f}s)"); m.close()
+
+if __name__=="__main__":
+    main()
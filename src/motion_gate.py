@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+motion_gate.py  –  cheap change detector in front of the detector call
+────────────────────────────────────────────────────────────────────────────
+Compares a tiny grayscale thumbnail of each frame with the thumbnail of the
+last frame that was actually sent through the model:
+
+  "skip"   nothing moved            → reuse the previous detections
+  "roi"    only a few tiles changed → run the model on that crop only and
+                                      keep old boxes outside it
+  "full"   large change / too old   → normal full-frame inference
+
+A full pass is forced at least every max_age seconds (and after max_roi
+ROI passes) so reused boxes can never go stale for long.
+
+    gate = ChangeGate()
+    mode, roi = gate.check(frame)                # roi = (x1,y1,x2,y2) or None
+    ... gate.commit(mode)                         # after running the model
+"""
+
+import time
+import cv2, numpy as np
+
+class ChangeGate:
+    def __init__(self, thumb=(160,90), grid=(8,6), pix_thr=12, tile_frac=0.01,
+                 roi_max=0.35, pad=0.5, max_age=1.0, max_roi=5, ignore=()):
+        self.thumb=thumb; self.gx,self.gy=grid; self.pix_thr=pix_thr
+        self.tile_frac=tile_frac; self.roi_max=roi_max; self.pad=pad
+        self.max_age=max_age; self.max_roi=max_roi
+        self.ignore=ignore                     # full-res rects to mask (HUD, HP bar)
+        self.ref=None; self.ref_t=0.0; self.n_roi=0
+        self.count={"skip":0,"roi":0,"full":0}
+        self._mask=None
+
+    def _small(self, frame):
+        g=cv2.cvtColor(cv2.resize(frame,self.thumb,interpolation=cv2.INTER_AREA),cv2.COLOR_BGR2GRAY)
+        if self.ignore:
+            if self._mask is None:
+                self._mask=np.ones_like(g); sx=self.thumb[0]/frame.shape[1]; sy=self.thumb[1]/frame.shape[0]
+                for x1,y1,x2,y2 in self.ignore:
+                    self._mask[int(y1*sy):int(np.ceil(y2*sy)),int(x1*sx):int(np.ceil(x2*sx))]=0
+            g*=self._mask
+        return g
+
+    def check(self, frame):
+        """→ (mode, roi) where mode is 'skip' | 'roi' | 'full'."""
+        small=self._small(frame); self._cur=small
+        if self.ref is None or time.time()-self.ref_t>self.max_age:
+            return self._count("full"),None
+        diff=cv2.absdiff(small,self.ref)>self.pix_thr            # (h,w) bool
+        h,w=diff.shape; th,tw=h//self.gy,w//self.gx
+        tiles=diff[:th*self.gy,:tw*self.gx].reshape(self.gy,th,self.gx,tw).mean((1,3))
+        hot=tiles>self.tile_frac
+        if not hot.any(): return self._count("skip"),None
+        if hot.mean()>self.roi_max or self.n_roi>=self.max_roi: return self._count("full"),None
+        ys,xs=np.where(hot)
+        H,W=frame.shape[:2]; ty,tx=H/self.gy,W/self.gx
+        x1,x2=(xs.min()-self.pad)*tx,(xs.max()+1+self.pad)*tx
+        y1,y2=(ys.min()-self.pad)*ty,(ys.max()+1+self.pad)*ty
+        roi=(int(max(0,x1)),int(max(0,y1)),int(min(W,x2)),int(min(H,y2)))
+        return self._count("roi"),roi
+
+    def commit(self, mode):
+        """Call after the model ran ('roi'/'full'); 'skip' keeps the old ref."""
+        if mode=="skip": return
+        self.ref=self._cur
+        if mode=="full": self.ref_t=time.time(); self.n_roi=0
+        else: self.n_roi+=1
+
+    def _count(self, mode):
+        self.count[mode]+=1; return mode
+
+    def fmt(self):
+        n=sum(self.count.values()) or 1; c=self.count
+        s=f"gate skip={c['skip']/n:4.0%} roi={c['roi']/n:4.0%} full={c['full']/n:4.0%}"
+        for k in c: c[k]=0
+        return s
+
+def merge_roi(prev, new, roi):
+    """Old boxes whose centre is outside roi + new boxes (already full-frame)."""
+    (pb,pc,pf),(nb,nc,nf)=prev,new
+    x1,y1,x2,y2=roi
+    cx,cy=(pb[:,0]+pb[:,2])/2,(pb[:,1]+pb[:,3])/2
+    out=~((cx>=x1)&(cx<x2)&(cy>=y1)&(cy<y2))
+    return (np.concatenate([pb[out],nb]),np.concatenate([pc[out],nc]),
+            np.concatenate([pf[out],nf]))
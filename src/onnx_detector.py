@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+onnx_detector.py  –  YOLO on ONNX Runtime (CPU / OpenVINO), no torch at run time
+────────────────────────────────────────────────────────────────────────────
+    python src/onnx_detector.py export   models/best_v12n2.pt --imgsz 416
+    python src/onnx_detector.py quantize models/best_v12n2.onnx --calib ss/images
+    python src/bench_onnx.py models/best_v12n2.pt models/best_v12n2.onnx \\
+                             models/best_v12n2.int8.onnx
+
+  export     Ultralytics → ONNX, fixed 1×3×S×S input, raw head (no NMS)
+  quantize   static INT8 (QDQ, per-channel) calibrated on real frames
+  runtime    one session, input / output tensors allocated once and bound
+             with IOBinding; preprocess.Letterbox writes every frame into
+             the bound input, the decode + NMS below are plain NumPy
+
+load_detector("x.onnx") / ("x.onnx@openvino") in detectors.py returns an
+OnnxDetector, called exactly like the Ultralytics model.
+"""
+
+import argparse, ast, glob, os
+import cv2, numpy as np
+from detectors import make_result
+from preprocess import Letterbox
+
+# ── NMS ──────────────────────────────────────────────────────────────────────
+def nms(boxes,scores,iou_thr,max_det=300):
+    """Greedy NMS on (N,4) xyxy; returns kept indices, best first."""
+    x1,y1,x2,y2=boxes.T; area=(x2-x1)*(y2-y1)
+    order=np.argsort(-scores); keep=[]
+    while order.size and len(keep)<max_det:
+        i=order[0]; keep.append(i); rest=order[1:]
+        iw=np.clip(np.minimum(x2[i],x2[rest])-np.maximum(x1[i],x1[rest]),0,None)
+        ih=np.clip(np.minimum(y2[i],y2[rest])-np.maximum(y1[i],y1[rest]),0,None)
+        inter=iw*ih
+        order=rest[inter<=iou_thr*(area[i]+area[rest]-inter)]
+    return np.asarray(keep,np.int64)
+
+# ── detector ─────────────────────────────────────────────────────────────────
+class OnnxDetector:
+    def __init__(self,path,provider="cpu",threads=None,imgsz=416):
+        import onnxruntime as ort
+        so=ort.SessionOptions()
+        so.graph_optimization_level=ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if threads: so.intra_op_num_threads=threads
+        prov=["CPUExecutionProvider"]
+        if provider=="openvino" and "OpenVINOExecutionProvider" in ort.get_available_providers():
+            prov=[("OpenVINOExecutionProvider",{"device_type":"CPU"})]+prov
+        self.sess=ort.InferenceSession(str(path),so,providers=prov)
+        meta=self.sess.get_modelmeta().custom_metadata_map
+        self.names=ast.literal_eval(meta["names"]) if "names" in meta else {}
+
+        i,o=self.sess.get_inputs()[0],self.sess.get_outputs()[0]
+        _,_,H,W=[d if isinstance(d,int) else imgsz for d in i.shape]
+        self.lb=Letterbox(H)                                     # fixed S×S (export is square)
+        self.inp=self.lb._tensor.reshape(1,3,H,W)                # network input, bound once
+        self.io=self.sess.io_binding()
+        self.io.bind_ortvalue_input(i.name,ort.OrtValue.ortvalue_from_numpy(self.inp))
+        shape=o.shape if all(isinstance(d,int) for d in o.shape) else None
+        if shape is None:                                        # dynamic export: probe once
+            shape=self.sess.run([o.name],{i.name:self.inp})[0].shape
+        self.out=np.zeros(shape,np.float32)
+        self.io.bind_ortvalue_output(o.name,ort.OrtValue.ortvalue_from_numpy(self.out))
+
+    def preprocess(self,frame):
+        """BGR frame → self.inp (RGB, CHW, 0‥1), in place."""
+        self.lb(frame)
+
+    def postprocess(self,conf,iou,shape):
+        p=self.out[0]                                    # (4+nc, anchors)
+        sc=p[4:]; cls=sc.argmax(0); cf=sc.max(0)
+        k=np.flatnonzero(cf>=conf)
+        if not len(k): return make_result(np.zeros((0,4)),[],[],shape)
+        cx,cy,bw,bh=p[:4,k]; cls,cf=cls[k],cf[k]
+        xyxy=self.lb.unmap(np.stack([cx-bw/2,cy-bh/2,cx+bw/2,cy+bh/2],1))
+        keep=nms(xyxy+cls[:,None]*4096.0,cf,iou)         # class offset → per-class NMS
+        return make_result(xyxy[keep],cls[keep],cf[keep],shape)
+
+    def __call__(self,frame,imgsz=None,conf=0.25,iou=0.45,verbose=False,**_):
+        self.lb(frame)
+        self.sess.run_with_iobinding(self.io)
+        return [self.postprocess(conf,iou,frame.shape)]
+
+# ── export / quantize ────────────────────────────────────────────────────────
+def export(pt,imgsz=416,opset=None):
+    from ultralytics import YOLO
+    kw=dict(format="onnx",imgsz=imgsz,dynamic=False,simplify=True,nms=False)
+    if opset: kw["opset"]=opset
+    return YOLO(pt).export(**kw)
+
+def quantize(onnx_path,calib_dir,n=100,out=None):
+    from onnxruntime.quantization import (CalibrationDataReader, QuantFormat, QuantType,
+                                          quant_pre_process, quantize_static)
+    out=out or onnx_path.replace(".onnx",".int8.onnx")
+    det=OnnxDetector(onnx_path); name=det.sess.get_inputs()[0].name
+    paths=sorted(p for p in glob.glob(os.path.join(calib_dir,"*")) if p.lower().endswith((".jpg",".png")))
+    paths=paths[::max(1,len(paths)//n)][:n]               # spread over the set
+
+    class Calib(CalibrationDataReader):
+        def __init__(self): self.it=iter(paths)
+        def get_next(self):
+            p=next(self.it,None)
+            if p is None: return None
+            det.preprocess(cv2.imread(p)); return {name:det.inp.copy()}
+
+    prep=out.replace(".onnx",".prep.onnx")
+    quant_pre_process(onnx_path,prep)
+    quantize_static(prep,out,Calib(),quant_format=QuantFormat.QDQ,per_channel=True,
+                    activation_type=QuantType.QUInt8,weight_type=QuantType.QInt8)
+    os.remove(prep)
+    return out,len(paths)
+
+def main():
+    ap=argparse.ArgumentParser(formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+    sub=ap.add_subparsers(dest="cmd",required=True)
+    e=sub.add_parser("export"); e.add_argument("weights"); e.add_argument("--imgsz",type=int,default=416)
+    e.add_argument("--opset",type=int,default=None)
+    q=sub.add_parser("quantize"); q.add_argument("onnx"); q.add_argument("--calib",default="ss/images")
+    q.add_argument("-n",type=int,default=100,help="calibration images"); q.add_argument("--out")
+    args=ap.parse_args()
+    if args.cmd=="export":
+        print(f"✅ {export(args.weights,args.imgsz,args.opset)}")
+    else:
+        out,n=quantize(args.onnx,args.calib,args.n,args.out)
+        print(f"✅ INT8 model calibrated on {n} images → {out}")
+
+if __name__=="__main__":
+    main()
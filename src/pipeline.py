@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+pipeline.py  –  threading primitives for the staged bot loop
+────────────────────────────────────────────────────────────────────────────
+  LatestSlot      single-slot buffer, newest item wins (capture → workers)
+  DropQueue       bounded FIFO that drops the OLDEST item when full
+                  (items put with keep=True are never dropped)
+  StageStats      rolling latency / queue-depth / drop counters per stage
+  Worker          daemon thread running one stage function until stopped
+  ActionExecutor  drains a DropQueue of input commands on a timestamped timeline
+
+Every queue between stages is bounded and drop-oldest, so a slow consumer
+never makes the bot act on a stale frame: end-to-end latency stays ~1 frame.
+"""
+
+import heapq, threading, time
+from collections import deque
+
+# ═════════ buffers ═══════════════════════════════════════════════════════
+class LatestSlot:
+    """Holds only the newest item.  Each put() bumps a sequence number so
+    consumers can wait for 'something newer than what I already saw'."""
+    def __init__(self):
+        self._cv=threading.Condition(); self._item=None
+        self.seq=0; self.dropped=0; self._taken=0
+
+    def put(self,item):
+        with self._cv:
+            if self._taken<self.seq: self.dropped+=1     # overwritten unseen
+            self._item=item; self.seq+=1; self._cv.notify_all()
+
+    def get(self,after=0,timeout=None):
+        """Block until seq > after; return (seq,item) or (after,None) on timeout."""
+        with self._cv:
+            if not self._cv.wait_for(lambda: self.seq>after,timeout): return after,None
+            self._taken=max(self._taken,self.seq)
+            return self.seq,self._item
+
+    def depth(self): return int(self._taken<self.seq)
+
+
+class DropQueue:
+    """Bounded FIFO; put() on a full queue evicts the oldest droppable entry.
+    keep=True entries (state-changing commands) are never evicted – if only
+    those are queued the queue grows past maxlen rather than lose one."""
+    def __init__(self,maxlen=8):
+        self._cv=threading.Condition(); self._q=deque(); self.maxlen=maxlen; self.dropped=0
+
+    def put(self,item,keep=False):
+        with self._cv:
+            if len(self._q)>=self.maxlen:
+                i=next((i for i,(k,_) in enumerate(self._q) if not k),None)
+                if i is not None: del self._q[i]; self.dropped+=1
+            self._q.append((keep,item)); self._cv.notify()
+
+    def get(self,timeout=None):
+        with self._cv:
+            if not self._cv.wait_for(lambda: self._q,timeout): return None
+            return self._q.popleft()[1]
+
+    def clear(self):
+        with self._cv: self._q.clear()
+
+    def __len__(self): return len(self._q)
+
+# ═════════ stats ═════════════════════════════════════════════════════════
+class StageStats:
+    """Rolling window of per-stage latency (ms) and queue depth samples."""
+    def __init__(self,name,window=120):
+        self.name=name; self.lat=deque(maxlen=window); self.depth=deque(maxlen=window)
+        self.count=0
+
+    def add(self,ms,depth=0):
+        self.lat.append(ms); self.depth.append(depth); self.count+=1
+
+    def avg(self):  return sum(self.lat)/len(self.lat) if self.lat else 0.0
+    def qavg(self): return sum(self.depth)/len(self.depth) if self.depth else 0.0
+
+    def rate(self,dt):
+        """items/s since the previous call (dt = seconds elapsed)."""
+        n,self.count=self.count,0
+        return n/dt if dt>0 else 0.0
+
+    def fmt(self): return f"{self.name}={self.avg():5.1f}ms/q{self.qavg():.1f}"
+
+# ═════════ workers ═══════════════════════════════════════════════════════
+class Worker(threading.Thread):
+    """Calls step() forever until stop is set.  step() does its own waiting."""
+    def __init__(self,name,step,stop):
+        super().__init__(name=name,daemon=True); self.step=step; self.stop_ev=stop
+
+    def run(self):
+        while not self.stop_ev.is_set():
+            try: self.step()
+            except Exception as e:
+                print(f"[{self.name}] {type(e).__name__}: {e}"); time.sleep(0.1)
+
+
+class ActionExecutor(threading.Thread):
+    """Runs input commands off the decision thread.
+
+    A command is a sequence of steps; a step is either a float (seconds
+    between the surrounding steps) or a tuple (fn, *args).  Nothing sleeps:
+    when a command is taken from the queue every step gets an absolute due
+    time, and the thread waits (interruptibly) for the next one.  Commands
+    still run back to back, so F3 → click / insert → F2 keep their order
+    and spacing, and key hold times are just a delay between down and up."""
+    def __init__(self,stop,maxlen=8,stats=None,tracer=None):
+        super().__init__(name="act",daemon=True)
+        self.q=DropQueue(maxlen); self.stop_ev=stop; self.stats=stats or StageStats("act")
+        self.tracer=tracer                             # tracing.Tracer → act / e2e spans
+        self.timeline=[]; self.tail=0.0; self._n=0      # heap of (due, n, step, cmd, last)
+
+    def submit(self,*steps,keep=False):
+        """keep=True: the command changes bot state (Insert) → never dropped."""
+        ctx=self.tracer.cur if self.tracer else None   # frame that triggered this command
+        self.q.put(((time.perf_counter(),ctx),steps),keep)
+
+    def done(self,cmd):
+        (t_in,ctx),t1=cmd,time.perf_counter()
+        self.stats.add((t1-t_in)*1000,len(self.q))
+        if self.tracer:
+            fid,t_grab=ctx; self.tracer.span("act",t_in,t1,fid)
+            if fid>=0: self.tracer.span("e2e",t_grab,t1,fid)
+
+    def schedule(self,cmd,steps,now):
+        t=max(now,self.tail); calls=[]
+        for st in steps:
+            if isinstance(st,(int,float)): t+=st
+            else: calls.append((t,st))
+        for i,(due,st) in enumerate(calls):
+            self._n+=1; heapq.heappush(self.timeline,(due,self._n,st,cmd,i==len(calls)-1))
+        self.tail=t
+
+    def run(self):
+        while not self.stop_ev.is_set():
+            now=time.perf_counter()
+            while self.timeline and self.timeline[0][0]<=now:
+                _,_,st,cmd,last=heapq.heappop(self.timeline); st[0](*st[1:])
+                if last: self.done(cmd)
+            if self.tail>now:                          # mid-command: wait for next due
+                self.stop_ev.wait(min(self.tail,self.timeline[0][0] if self.timeline else self.tail)-now)
+                continue
+            cmd=self.q.get(timeout=0.1)                # idle: block for the next command
+            if cmd is not None: self.schedule(*cmd,time.perf_counter())
+        self.release()
+
+    def release(self):
+        """On stop: run the pending release steps (key / button …, False) now,
+        so nothing pressed mid-command stays held; the rest is dropped."""
+        while self.timeline:
+            _,_,st,_,_=heapq.heappop(self.timeline)
+            if len(st)>2 and st[-1] is False:
+                try: st[0](*st[1:])
+                except Exception as e: print(f"[act] release {type(e).__name__}: {e}")
+        self.tail=0.0
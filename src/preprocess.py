@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+preprocess.py  –  frame → network input with no per-frame allocations
+────────────────────────────────────────────────────────────────────────────
+Letterbox owns two flat buffers sized for the largest input (S×S); every
+frame is resized straight into a view of the canvas and converted
+BGR→RGB / HWC→CHW / ÷255 by ONE ufunc writing into a view of the tensor.
+Views for the current geometry are kept, so a steady capture size costs
+zero new arrays; a new size (motion-gate ROI) only re-slices the buffers.
+
+    lb=Letterbox(416,stride=32)        # stride → Ultralytics-style minimal
+    t=lb(frame)                        #   rectangle (16:9 → 416×256), None → S×S
+    boxes=lb.unmap(net_xyxy)           # in place → frame pixels
+    boxes=lb.unmap(net_xyxy,SX,SY)     #          → game-window pixels
+
+Resize uses INTER_LINEAR: same as Ultralytics' own LetterBox (so accuracy
+is unchanged) and ~25× cheaper than INTER_AREA at 1080p → 416.
+
+    python src/preprocess.py            # microbenchmark: before / after
+"""
+
+import sys, time, tracemalloc
+import cv2, numpy as np
+
+PAD = 114
+
+class Letterbox:
+    def __init__(self,size=416,stride=None,dtype=np.float32,pad=PAD):
+        self.S=size; self.stride=stride; self.pad=pad
+        self._canvas=np.empty(size*size*3,np.uint8)
+        self._tensor=np.empty(size*size*3,dtype)
+        self.scale=np.asarray(1/255,dtype) if dtype!=np.uint8 else None
+        self.geom=None
+
+    def plan(self,h,w):
+        """Geometry + buffer views for an h×w frame (only on size change)."""
+        S,st=self.S,self.stride; r=min(S/h,S/w); nw,nh=round(w*r),round(h*r)
+        W,H=(-(-nw//st)*st,-(-nh//st)*st) if st else (S,S)
+        px,py=(W-nw)//2,(H-nh)//2
+        canvas=self._canvas[:H*W*3].reshape(H,W,3); canvas[:]=self.pad
+        tensor=self._tensor[:H*W*3].reshape(1,3,H,W)
+        self.geom=(h,w),r,px,py,canvas[py:py+nh,px:px+nw],canvas,tensor
+        self.r,self.px,self.py=r,px,py
+        self.inv=np.array([1/r,1/r,1/r,1/r],np.float32)             # net → frame
+        self.off=np.array([px,py,px,py],np.float32)
+
+    def __call__(self,frame):
+        h,w=frame.shape[:2]
+        if self.geom is None or self.geom[0]!=(h,w): self.plan(h,w)
+        _,_,_,_,roi,canvas,tensor=self.geom
+        cv2.resize(frame,roi.shape[1::-1],dst=roi,interpolation=cv2.INTER_LINEAR)
+        src=canvas.transpose(2,0,1)[::-1]                            # RGB, CHW (view)
+        if self.scale is None: np.copyto(tensor[0],src)
+        else: np.multiply(src,self.scale,out=tensor[0])
+        return tensor
+
+    def unmap(self,xyxy,sx=1.0,sy=1.0):
+        """(N,4) float32 net-space boxes → frame (× sx/sy) pixels, in place."""
+        xyxy-=self.off; xyxy*=self.inv
+        h,w=self.geom[0]
+        np.clip(xyxy[:,0::2],0,w,out=xyxy[:,0::2]); np.clip(xyxy[:,1::2],0,h,out=xyxy[:,1::2])
+        if sx!=1.0 or sy!=1.0: xyxy[:,0::2]*=sx; xyxy[:,1::2]*=sy
+        return xyxy
+
+# ── microbenchmark ───────────────────────────────────────────────────────────
+def naive(frame,S=416,stride=32):
+    """What Ultralytics' predictor does per frame (LetterBox + to-tensor)."""
+    h,w=frame.shape[:2]; r=min(S/h,S/w); nw,nh=round(w*r),round(h*r)
+    W,H=-(-nw//stride)*stride,-(-nh//stride)*stride
+    im=cv2.resize(frame,(nw,nh),interpolation=cv2.INTER_LINEAR)
+    px,py=(W-nw)//2,(H-nh)//2
+    im=cv2.copyMakeBorder(im,py,H-nh-py,px,W-nw-px,cv2.BORDER_CONSTANT,value=(PAD,)*3)
+    im=np.stack([im])[...,::-1].transpose(0,3,1,2)
+    im=np.ascontiguousarray(im)
+    return im.astype(np.float32)/255
+
+def measure(fn,frames,reps):
+    """mean ms / frame, transient KB / frame (tracemalloc peak), and whether
+    every call returned the same buffer (outputs are held, so a fresh array
+    can never land on a freed one)."""
+    fn(frames[0]); kb=[]; outs=[]
+    tracemalloc.start()
+    for i in range(min(reps,20)):
+        tracemalloc.reset_peak(); base=tracemalloc.get_traced_memory()[0]
+        outs.append(fn(frames[i%len(frames)]))
+        kb.append((tracemalloc.get_traced_memory()[1]-base)/1024)
+    tracemalloc.stop()
+    same=len({o.ctypes.data for o in outs})==1; del outs
+    t=time.perf_counter()
+    for i in range(reps): fn(frames[i%len(frames)])
+    return (time.perf_counter()-t)/reps*1000,float(np.mean(kb)),same
+
+if __name__=="__main__":
+    import glob
+    paths=sorted(glob.glob((sys.argv[1] if len(sys.argv)>1 else "ss/images")+"/*.jpg"))[:8]
+    frames=[cv2.resize(cv2.imread(p),(1920,1080)) for p in paths] or \
+           [np.random.randint(0,255,(1080,1920,3),np.uint8)]
+    lb=Letterbox(416,stride=32)
+    a,b=np.ascontiguousarray(naive(frames[0])),lb(frames[0])
+    print(f"max |Δ| vs naive: {np.abs(a-b).max():.2e}   shape {b.shape}")
+    print(f"{'path':8} {'ms/frame':>9} {'alloc KB/frame':>15} {'reused output':>14}")
+    for name,fn in (("before",naive),("after",lb)):
+        ms,kb,same=measure(fn,frames,300)
+        print(f"{name:8} {ms:9.3f} {kb:15.1f} {str(same):>14}")
+    print("(after: the few KB left are NumPy's casting scratch for the uint8→f32 ufunc)")
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+sample_writer.py  –  background dataset writer for the bot's save_sample()
+────────────────────────────────────────────────────────────────────────────
+The bot thread only calls submit(); JPEG encoding, label writing and the
+optional preview render happen on a daemon thread.
+
+  • bounded queue (drop-oldest)   – disk I/O can never stall a bot tick
+  • per-folder rate limit         – e.g. "cards" at most every 0.5 s
+  • drop counters                 – rate-limited / queue-full, for [DBG]
+  • manifest + near-dup filter    – every sample is recorded in the dataset's
+                                    manifest.sqlite (manifest.py); with dedup on,
+                                    a frame within `dedup` dHash bits of one
+                                    already kept in its folder (same class mix)
+                                    is dropped before it is JPEG-encoded
+  • previews optional             – or rendered later from the label files:
+
+        python src/sample_writer.py captured_dataset          # all folders
+        python src/sample_writer.py captured_dataset/cards
+"""
+
+import json, sys, threading, time
+from pathlib import Path
+import cv2
+from pipeline import DropQueue
+from manifest import Manifest, dhash, hist_of, find_dup
+
+JPEG_Q = [int(cv2.IMWRITE_JPEG_QUALITY),90]
+COLORS = {0:(255,0,0),1:(255,128,0),2:(0,255,0),3:(0,128,255),
+          4:(255,0,255),5:(128,0,255),6:(0,0,255),7:(255,255,0)}
+
+def yolo_lines(detections,w,h):
+    return "".join(f"{cls} {(x1+x2)/2/w:.6f} {(y1+y2)/2/h:.6f} {(x2-x1)/w:.6f} {(y2-y1)/h:.6f}\n"
+                   for cls,(x1,y1,x2,y2) in detections)
+
+def draw_boxes(img,detections):
+    for cls,(x1,y1,x2,y2) in detections:
+        cv2.rectangle(img,(x1,y1),(x2,y2),COLORS.get(cls,(255,255,255)),2)
+    return img
+
+def render_preview(img_p,lbl_p,prev_p):
+    """Preview straight from an image + YOLO label file (lazy path)."""
+    img=cv2.imread(str(img_p))
+    if img is None: return False
+    h,w=img.shape[:2]; dets=[]
+    if Path(lbl_p).exists():
+        for ln in open(lbl_p):
+            p=ln.split()
+            if len(p)!=5: continue
+            cls=int(p[0]); cx,cy,bw,bh=map(float,p[1:])
+            dets.append((cls,(int((cx-bw/2)*w),int((cy-bh/2)*h),int((cx+bw/2)*w),int((cy+bh/2)*h))))
+    Path(prev_p).parent.mkdir(parents=True,exist_ok=True)
+    return cv2.imwrite(str(prev_p),draw_boxes(img,dets),JPEG_Q)
+
+
+class SampleWriter(threading.Thread):
+    def __init__(self,root,min_interval=None,maxlen=16,preview=False,tracer=None,
+                 dedup=0,session=None):
+        super().__init__(name="writer",daemon=True)
+        self.root=Path(root); self.preview=preview; self.tracer=tracer
+        self.min_interval=min_interval or {}          # folder → seconds
+        self.q=DropQueue(maxlen); self.last={}
+        self.written=0; self.bytes=0; self.rate_dropped=0; self.dup_dropped=0
+        self.dedup=dedup; self.session=session or time.strftime("%Y%m%d-%H%M%S")
+        self.manifest=None; self.trees={}             # opened on the writer thread (sqlite)
+        self.stop_ev=threading.Event()
+
+    # ── bot side (cheap) ─────────────────────────────────────────────────
+    def submit(self,frame_bgr,detections,folder="",why=None,fid=None,ts=None):
+        """Queue one sample; returns False if rate-limited.  The frame is not
+        copied – callers must not modify it afterwards.  `why` (dict) goes to
+        the manifest; fid defaults to the tracer's current frame.  An explicit
+        capture time `ts` (s) names the file and bypasses the rate limit
+        (the capture policy does its own selection)."""
+        now=time.time()
+        if ts is None:
+            if now-self.last.get(folder,0.0) < self.min_interval.get(folder,0.0):
+                self.rate_dropped+=1; return False
+            self.last[folder]=ts=now
+        if fid is None: fid=self.tracer.cur[0] if self.tracer else -1
+        self.q.put((fid,str(int(ts*1000)),frame_bgr,list(detections),folder,why))
+        return True
+
+    @property
+    def dropped(self): return self.rate_dropped+self.q.dropped
+
+    def fmt(self):
+        return f"ds={self.written} drop={self.rate_dropped}r/{self.q.dropped}q/{self.dup_dropped}d"
+
+    # ── writer thread ────────────────────────────────────────────────────
+    def write(self,ts,frame,detections,folder,why=None):
+        base=self.root/folder if folder else self.root
+        h,w=frame.shape[:2]; ph=dhash(frame); hist=hist_of(detections)
+        if self.dedup:
+            if folder not in self.trees: self.trees[folder]=self.manifest.tree(folder)
+            if find_dup(self.trees[folder],ph,hist,self.dedup): self.dup_dropped+=1; return
+        img_p=base/"images"/f"{ts}.jpg"
+        cv2.imwrite(str(img_p),frame,JPEG_Q); self.bytes+=img_p.stat().st_size
+        (base/"labels"/f"{ts}.txt").write_text(yolo_lines(detections,w,h))
+        if self.preview:
+            cv2.imwrite(str(base/"preview"/f"{ts}.jpg"),draw_boxes(frame.copy(),detections),JPEG_Q)
+        rel=img_p.relative_to(self.root).as_posix()
+        self.manifest.add(rel,folder,self.session,ts,w,h,ph,hist,why=why)
+        if self.dedup: self.trees[folder].add(ph,(rel,json.dumps(hist)))
+        self.written+=1
+
+    def run(self):
+        self.manifest=Manifest(self.root)
+        while not (self.stop_ev.is_set() and not len(self.q)):
+            item=self.q.get(timeout=0.2)
+            if item is None: continue
+            fid,*item=item; t0=time.perf_counter()
+            try: self.write(*item)
+            except Exception as e: print(f"[writer] {type(e).__name__}: {e}")
+            if self.tracer: self.tracer.span("save",t0,fid=fid)
+        self.manifest.close()
+
+    def close(self,timeout=2.0):
+        """Flush what is queued, then stop."""
+        self.stop_ev.set(); self.join(timeout)
+
+# ── CLI: lazy preview rendering ──────────────────────────────────────────────
+if __name__=="__main__":
+    root=Path(sys.argv[1] if len(sys.argv)>1 else "captured_dataset")
+    n=0
+    for img_dir in [root/"images",*root.glob("*/images")]:
+        for img_p in sorted(img_dir.glob("*.jpg")):
+            prev_p=img_dir.parent/"preview"/img_p.name
+            if prev_p.exists(): continue
+            n+=render_preview(img_p,img_dir.parent/"labels"/f"{img_p.stem}.txt",prev_p)
+    print(f"✅ {n} previews rendered under {root}")
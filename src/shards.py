@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+shards.py  –  pre-decoded, letterboxed, memory-mapped training shards
+────────────────────────────────────────────────────────────────────────────
+Usage
+    python src/shards.py build ragnarok-dataset-new --size 416            # images/{train,val}
+    python src/shards.py build ss --out shards/ss --size 416               # flat images/ labels/
+    python src/shards.py bench shards/ss/all                               # JPEG vs shard read
+---------------------------------------------------------------------------
+Every JPEG is decoded ONCE, letterboxed to size×size (same geometry / pad as
+preprocess.Letterbox with stride=None) and written as BGR HWC uint8 into
+fixed-size shard files – raw arrays, no container, mmap-able:
+
+    <out>/<split>/shard_000.u8 …   (per_shard, S, S, 3) uint8 each
+    <out>/<split>/labels.npy       (M, 5) float32  cls cx cy w h, letterboxed + normalised
+    <out>/<split>/offsets.npy      (N+1,) int64    sample i → labels[off[i]:off[i+1]]
+    <out>/<split>/meta.json        size, per_shard, n, src_dir, per-sample source / ratio / pad
+
+ShardDataset(dir)[i] → (image view, label view): slices of np.memmap /
+np.load(mmap_mode="r"), so no decode, no resize and no copy; the OS page
+cache does the I/O.  It pickles by path, so DataLoader workers re-map the
+files instead of shipping pixels.  batches() fills one reused buffer.
+"""
+import argparse, json, time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+import cv2, numpy as np
+from preprocess import PAD
+
+def letterbox_into(img,dst,pad=PAD):
+    """Resize img straight into the (S,S,3) dst view, pad the rest → (r, px, py)."""
+    S=dst.shape[0]; h,w=img.shape[:2]; r=min(S/h,S/w); nw,nh=round(w*r),round(h*r)
+    px,py=(S-nw)//2,(S-nh)//2
+    dst[:py]=pad; dst[py+nh:]=pad; dst[py:py+nh,:px]=pad; dst[py:py+nh,px+nw:]=pad
+    cv2.resize(img,(nw,nh),dst=dst[py:py+nh,px:px+nw],interpolation=cv2.INTER_LINEAR)
+    return r,px,py
+
+def read_yolo(p):
+    p=Path(p)
+    if not p.exists() or not p.stat().st_size: return np.zeros((0,5),np.float32)
+    return np.loadtxt(p,ndmin=2,dtype=np.float32).reshape(-1,5)
+
+# ── build ────────────────────────────────────────────────────────────────────
+def build_split(imgs,lbl_dir,out,size,shard_mb,workers):
+    out.mkdir(parents=True,exist_ok=True)
+    per=max(1,shard_mb*2**20//(size*size*3)); n=len(imgs)
+    shards=[np.memmap(out/f"shard_{k:03d}.u8",np.uint8,"w+",shape=(min(per,n-k*per),size,size,3))
+            for k in range(-(-n//per))]
+    geo=[None]*n
+
+    def one(i):
+        img=cv2.imread(str(imgs[i]))
+        if img is None: shards[i//per][i%per]=PAD; return
+        geo[i]=(img.shape[0],img.shape[1],*letterbox_into(img,shards[i//per][i%per]))
+
+    with ThreadPoolExecutor(workers) as ex: list(ex.map(one,range(n)))      # cv2 drops the GIL
+    for s in shards: s.flush()
+    labels=[]; off=[0]; samples=[]
+    for p,g in zip(imgs,geo):
+        lab=read_yolo(Path(lbl_dir)/f"{p.stem}.txt") if g else np.zeros((0,5),np.float32)
+        if len(lab):
+            h,w,r,px,py=g
+            lab[:,1]=(lab[:,1]*w*r+px)/size; lab[:,2]=(lab[:,2]*h*r+py)/size
+            lab[:,3]*=w*r/size; lab[:,4]*=h*r/size
+        labels.append(lab); off.append(off[-1]+len(lab))
+        samples.append({"src":p.name,"hw":g[:2] if g else None,"r":g[2] if g else None,
+                        "pad":g[3:] if g else None})
+    np.save(out/"labels.npy",np.concatenate(labels) if labels else np.zeros((0,5),np.float32))
+    np.save(out/"offsets.npy",np.asarray(off,np.int64))
+    (out/"meta.json").write_text(json.dumps({"size":size,"per_shard":per,"n":n,"src_dir":str(imgs[0].parent.resolve()),
+        "shards":[len(s) for s in shards],"samples":samples}))
+    bad=sum(g is None for g in geo)
+    print(f"  {out.name:6} {n:6} images → {len(shards)} shard(s) × ≤{per}  {off[-1]} boxes"
+          + (f"  ({bad} unreadable → blank)" if bad else ""))
+
+def build(src,out,size,shard_mb,workers):
+    src=Path(src); splits=[d.name for d in sorted((src/"images").iterdir()) if d.is_dir()]
+    todo=[(s,src/"images"/s,src/"labels"/s) for s in splits] or [("all",src/"images",src/"labels")]
+    t=time.perf_counter()
+    for name,idir,ldir in todo:
+        imgs=sorted(idir.glob("*.jpg"))+sorted(idir.glob("*.png"))
+        if imgs: build_split(imgs,ldir,Path(out)/name,size,shard_mb,workers)
+    print(f"✅ shards in {out}  ({time.perf_counter()-t:.1f}s)")
+
+# ── load ─────────────────────────────────────────────────────────────────────
+class ShardDataset:
+    def __init__(self,path):
+        self.path=Path(path); self.meta=json.loads((self.path/"meta.json").read_text())
+        self.S=self.meta["size"]; self.per=self.meta["per_shard"]; self.n=self.meta["n"]
+        self.shards=[np.memmap(self.path/f"shard_{k:03d}.u8",np.uint8,"r",shape=(m,self.S,self.S,3))
+                     for k,m in enumerate(self.meta["shards"])]
+        self.labels=np.load(self.path/"labels.npy",mmap_mode="r")
+        self.off=np.load(self.path/"offsets.npy")
+
+    def __len__(self): return self.n
+
+    def __getitem__(self,i):
+        """→ (S,S,3) uint8 BGR view, (k,5) float32 label view."""
+        return self.shards[i//self.per][i%self.per],self.labels[self.off[i]:self.off[i+1]]
+
+    def __getstate__(self): return {"path":self.path}          # re-map in the worker
+    def __setstate__(self,st): self.__init__(st["path"])
+
+    def batches(self,bs=16,shuffle=True,seed=0):
+        """(imgs (b,S,S,3) – ONE reused buffer, [labels…]) per batch."""
+        order=np.random.default_rng(seed).permutation(self.n) if shuffle else np.arange(self.n)
+        buf=np.empty((bs,self.S,self.S,3),np.uint8)
+        for k in range(0,self.n,bs):
+            idx=order[k:k+bs]; labs=[]
+            for j,i in enumerate(idx):
+                img,lab=self[i]; buf[j]=img; labs.append(lab)
+            yield buf[:len(idx)],labs
+
+# ── bench: JPEG decode + letterbox vs shard read ─────────────────────────────
+def bench(path,n=200):
+    ds=ShardDataset(path); n=min(n,len(ds)); S=ds.S
+    idir=Path(ds.meta["src_dir"]) if Path(ds.meta["src_dir"]).is_dir() else None
+    buf=np.empty((S,S,3),np.uint8)
+    rows=[]
+    if idir is not None:
+        paths=[idir/s["src"] for s in ds.meta["samples"][:n]]
+        t=time.perf_counter()
+        for p in paths: letterbox_into(cv2.imread(str(p)),buf)
+        rows.append(("jpeg decode + letterbox",(time.perf_counter()-t)/n*1000))
+    t=time.perf_counter()
+    for i in range(n): img,lab=ds[i]; buf[:]=img
+    rows.append(("shard read (page cache)",(time.perf_counter()-t)/n*1000))
+    t=time.perf_counter()
+    for i in range(n): img,lab=ds[i]
+    rows.append(("shard view only",(time.perf_counter()-t)/n*1000))
+    print(f"{'path':26} {'ms/img':>8} {'img/s':>9}   ({n} samples, {S}×{S})")
+    for name,ms in rows: print(f"{name:26} {ms:8.3f} {1000/max(ms,1e-9):9.0f}")
+    if idir is None: print(f"(source images {ds.meta['src_dir']} are gone – shard rows only)")
+
+def main():
+    ap=argparse.ArgumentParser(formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+    sub=ap.add_subparsers(dest="cmd",required=True)
+    b=sub.add_parser("build"); b.add_argument("src",help="YOLO folder: images/[split/] labels/[split/]")
+    b.add_argument("--out",default=None,help="default: <src>/shards")
+    b.add_argument("--size",type=int,default=416); b.add_argument("--shard-mb",type=int,default=256)
+    b.add_argument("--workers",type=int,default=4)
+    r=sub.add_parser("bench"); r.add_argument("path",help="<out>/<split>"); r.add_argument("-n",type=int,default=200)
+    args=ap.parse_args()
+    if args.cmd=="build": build(args.src,args.out or Path(args.src)/"shards",args.size,args.shard_mb,args.workers)
+    else: bench(args.path,args.n)
+
+if __name__=="__main__":
+    main()
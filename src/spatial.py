@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+spatial.py  –  per-frame detections as one structured array + a grid index
+────────────────────────────────────────────────────────────────────────────
+records(res) turns any backend's result into a single NumPy structured
+array (one row per box), so class masks, counts and target scoring are
+whole-array operations instead of a Python loop over tensor elements:
+
+    d=records(res)                         # fields x1 y1 x2 y2 cx cy cls conf id
+    reds=d[d["cls"]==6]; atks=d[np.isin(d["cls"],(0,1,3,7))]
+    s=score(atks,cx_mid,cy_mid,λ,d_max)    # conf − λ·distance-to-centre
+
+Grid buckets points into square cells (sorted cell keys + searchsorted,
+no dicts), so "how many reds within r of X" touches only the cells that
+overlap the circle, for many query points in one vectorised call (tiny
+sets just use the full distance matrix – cheaper than the bookkeeping):
+
+    g=Grid(reds["cx"],reds["cy"],cell=r)
+    g.count(cx_mid,cy_mid,r)               # → (1,)   reds around the player
+    g.count(atks["cx"],atks["cy"],r)       # → (N,)   reds around each target
+"""
+
+import numpy as np
+from detectors import to_numpy
+
+DET = np.dtype([("x1","f4"),("y1","f4"),("x2","f4"),("y2","f4"),
+                ("cx","f4"),("cy","f4"),("cls","i2"),("conf","f4"),("id","i8")])
+
+def records(res):
+    """Result → (N,) DET array; id = tracker id or -1."""
+    xyxy,cls,cf=to_numpy(res); d=np.empty(len(cls),DET)
+    d["x1"],d["y1"],d["x2"],d["y2"]=xyxy.T
+    d["cx"]=(xyxy[:,0]+xyxy[:,2])/2; d["cy"]=(xyxy[:,1]+xyxy[:,3])/2
+    d["cls"]=cls; d["conf"]=cf
+    ids=getattr(res.boxes,"id",None)
+    d["id"]=-1 if ids is None else np.asarray(ids.cpu() if hasattr(ids,"cpu") else ids).reshape(-1)
+    return d
+
+def boxes(d):
+    """DET rows → [(cls, (x1,y1,x2,y2)), …] ints, the sample writer's format."""
+    b=np.stack([d["x1"],d["y1"],d["x2"],d["y2"]],1).astype(int).tolist()
+    return [(c,tuple(x)) for c,x in zip(d["cls"].tolist(),b)]
+
+def score(d,cx,cy,lam,d_max):
+    """Nearest-strongest target score per row: conf − λ·|centre − (cx,cy)|/d_max."""
+    return d["conf"]-lam*np.hypot(d["cx"]-cx,d["cy"]-cy)/d_max
+
+class Grid:
+    K     = 1<<20                               # key = kx·K + ky
+    BRUTE = 32768                               # ≤ this many pairs → skip the cells (measured crossover)
+
+    def __init__(self,x,y,cell=64.0):
+        self.cell=float(cell)
+        self.x=np.asarray(x,np.float32).reshape(-1); self.y=np.asarray(y,np.float32).reshape(-1)
+        keys=self._key(np.floor(self.x/self.cell),np.floor(self.y/self.cell))
+        self.order=np.argsort(keys,kind="stable"); self.keys=keys[self.order]
+
+    def __len__(self): return len(self.x)
+
+    def _key(self,kx,ky): return kx.astype(np.int64)*self.K+ky.astype(np.int64)
+
+    def query(self,qx,qy,r):
+        """All (query index, point index) pairs with distance ≤ r."""
+        qx=np.atleast_1d(np.asarray(qx,np.float32)); qy=np.atleast_1d(np.asarray(qy,np.float32))
+        if not len(self) or not len(qx): return np.zeros(0,int),np.zeros(0,int)
+        if len(self)*len(qx)<=self.BRUTE:                        # few pairs: one (Q,N) matrix
+            return np.nonzero((self.x-qx[:,None])**2+(self.y-qy[:,None])**2<=r*r)
+        k=int(np.ceil(r/self.cell)); off=np.arange(-k,k+1)
+        kx=np.floor(qx/self.cell)[:,None,None]+off[None,:,None]
+        ky=np.floor(qy/self.cell)[:,None,None]+off[None,None,:]
+        cells=self._key(*np.broadcast_arrays(kx,ky)).reshape(len(qx),-1)
+        lo=np.searchsorted(self.keys,cells,"left").ravel()
+        n=np.searchsorted(self.keys,cells,"right").ravel()-lo
+        qi=np.repeat(np.arange(len(qx)),cells.shape[1])
+        qi=np.repeat(qi,n)                                       # one row per candidate
+        pi=self.order[np.repeat(lo,n)+np.arange(n.sum())-np.repeat(np.cumsum(n)-n,n)]
+        ok=(self.x[pi]-qx[qi])**2+(self.y[pi]-qy[qi])**2<=r*r
+        return qi[ok],pi[ok]
+
+    def count(self,qx,qy,r):
+        """Number of points within r of each query point → (Q,) int."""
+        qi,_=self.query(qx,qy,r)
+        return np.bincount(qi,minlength=np.size(qx))
@@ -7,14 +7,13 @@ Uso:
 ESC fecha.
 """
 
-import sys, time, re, cv2, pytesseract
+import sys, time, cv2, pytesseract
+from hpsp_reader import HpSpReader, binarize
 pytesseract.pytesseract.tesseract_cmd = r"C:\Program Files\Tesseract-OCR\tesseract.exe"
 
 CAM_IDX   = int(sys.argv[1]) if len(sys.argv) > 1 else 0
 W, H      = 1920, 1080
 X1, Y1, X2, Y2 = 6, 37, 160, 50          # retângulo HP/SP
-UPSCALE   = 3                            # amplia 3× antes do OCR
-CFG_OCR   = r"--oem 3 --psm 7 -c tessedit_char_whitelist=0123456789HPSPhpsp/|:."
 
 cap = cv2.VideoCapture(CAM_IDX, cv2.CAP_DSHOW)
 if not cap.isOpened():
@@ -29,8 +28,8 @@ print("✅ VirtualCam:", int(cap.get(3)), "×", int(cap.get(4)))
 cv2.namedWindow("Cam",  cv2.WINDOW_NORMAL)
 cv2.namedWindow("Crop", cv2.WINDOW_NORMAL)
 
-pat = re.compile(r"HP[:\.]?\s*(\d+)\s*/\s*(\d+).*?SP[:\.]?\s*(\d+)\s*/\s*(\d+)",
-                 flags=re.I)
+# cache + glyphs do jogo; Tesseract só quando aparece um glifo novo
+reader = HpSpReader(crop=(X1, Y1, X2, Y2))
 
 while True:
     ok, frame = cap.read()
@@ -38,21 +37,13 @@ while True:
         break
     cv2.imshow("Cam", frame)
 
-    crop = frame[Y1:Y2, X1:X2]
-    # ---------- pré-processamento ----------
-    crop_up = cv2.resize(crop, None, fx=UPSCALE, fy=UPSCALE,
-                         interpolation=cv2.INTER_LINEAR)
-    gray = cv2.cvtColor(crop_up, cv2.COLOR_BGR2GRAY)
-    _, bw = cv2.threshold(gray, 0, 255,
-                          cv2.THRESH_BINARY + cv2.THRESH_OTSU)
-    cv2.imshow("Crop", bw)
-
-    text = pytesseract.image_to_string(bw, config=CFG_OCR).strip()
-    m = pat.search(text)
-    if m:
-        hp_cur, hp_max, sp_cur, sp_max = map(int, m.groups())
-        print(f"HP {hp_cur}/{hp_max}  |  SP {sp_cur}/{sp_max}")
-    else:
+    cv2.imshow("Crop", binarize(frame[Y1:Y2, X1:X2]).astype("uint8") * 255)
+
+    v = reader.read(frame)
+    if v and reader.changed:
+        print(f"HP {v.hp_cur}/{v.hp_max} ({v.hp_pct:.0f}%)  |  "
+              f"SP {v.sp_cur}/{v.sp_max} ({v.sp_pct:.0f}%)   [{reader.fmt()}]")
+    elif v is None:
         print("HP/SP: --")
 
     if cv2.waitKey(1) & 0xFF == 27:   # ESC fecha
@@ -1,6 +1,6 @@
 #!/usr/bin/env python3
 """
-ragna_bot_v12.py  –  8-class model with per-class actions
+test_rag.py  –  Ragnarok farming bot (8-class model, staged pipeline)
 ────────────────────────────────────────────────────────────────────────────
 Model class indices
   0 blue     – optional attack (F3+click)   → ATTACK_BLUE switch
@@ -10,22 +10,50 @@ Model class indices
   4 pink     – card  (left-click only)      → always
   5 purple   – count, ignore
   6 red      – avoid; if red_count ≥ RED_F2_THRESHOLD → press F2
+               (opt-in: RED_NEAR_THRESHOLD reds within RED_NEAR_R of the player)
   7 yellow   – optional attack (F3+click)   → ATTACK_YELLOW
 
-All previous mechanics preserved:
-  • HP-critical vs SP-critical states
-  • Insert after safe room, F2 teleport, debounced by last F2
-  • Dynamic timeout after walking
-  • Dataset capture (samples + separate “cards” folder)
-  • Live key prints, debug FPS print
+Pipeline (threads; PROCESS_MODE = processes on a shared-memory FrameRing)
+  capture    FRAME_SOURCE → every FRAME_SKIP-th frame into a newest-wins slot
+  OCR        HP/SP line every OCR_SKIP-th frame (hpsp_reader: hash cache +
+             glyph templates, Tesseract fallback)
+  inference  motion gate (skip / ROI / full pass), detector or cascade,
+             tracker ids + predicted boxes between model frames
+  decision   main thread: HP/SP state, red avoidance, card / target choice,
+             timeout teleport; capture policy picks dataset samples
+  actions    input commands on a drop-oldest queue (state toggles are never
+             dropped), drained by the executor on a timestamped timeline
+             through the input backend (interception / null / record)
+The latency controller (ADAPTIVE) retunes FRAME_SKIP / OCR_SKIP / IMG_SZ,
+and every frame is traced from grab to emitted input (TRACE_OUT).
+
+Game mechanics kept from v11: HP- vs SP-critical states, Insert after the
+safe room, F2 teleport debounced by the last F2, dynamic timeout after
+walking, live key prints and the periodic debug line.
 """
 
-import cv2, time, random, threading, re, sys
-import win32api, win32gui
-import interception, pytesseract
-from ultralytics import YOLO
+import time, random, threading, sys, queue
+import numpy as np
+import multiprocessing as mp
+try: import win32api, win32gui                 # Windows rig only
+except ImportError: win32api=win32gui=None
+try: import pytesseract
+except ImportError: pytesseract=None
+from detectors import load_detector, make_result, to_numpy
+from motion_gate import ChangeGate, merge_roi
+from sample_writer import SampleWriter
+from capture_policy import CapturePolicy
+from cascade import Cascade
+from controller import LatencyController
+from hpsp_reader import HpSpReader
 from pathlib import Path
-from collections import deque
+from pipeline import LatestSlot, StageStats, Worker, ActionExecutor
+from tracing import Tracer
+from frame_source import open_source, LiveSource
+from frame_ring import FrameRing
+from tracker import Tracker
+from spatial import records, boxes, score, Grid
+from input_backend import make_backend, NullBackend
 
 # ─────────────── user switches ────────────────────────────────────────────
 ATTACK_BLUE   = True   # class-0
@@ -33,14 +61,21 @@ ATTACK_CYAN   = True   # class-1
 ATTACK_ORANGE = True   # class-3
 ATTACK_YELLOW = True   # class-7
 RED_F2_THRESHOLD = 4   # press F2 if ≥ this many red (class-6) blobs
+RED_NEAR_R = 160         # px (capture frame) radius for the proximity checks below
+RED_NEAR_THRESHOLD = 0   # opt-in: F2 if ≥ this many reds within RED_NEAR_R of the player (0=off)
+RED_TARGET_PENALTY = 0.0 # opt-in: target score − this per red within RED_NEAR_R of the target (e.g. 0.1)
 # ──────────────────────────────────────────────────────────────────────────
 
 # quick paths
 TESS_PATH  = r"C:\Program Files\Tesseract-OCR\tesseract.exe"
 MODEL_PATH = "models/best_v12n2.pt"
-pytesseract.pytesseract.tesseract_cmd = TESS_PATH
+DETECTOR   = MODEL_PATH    # or "color" → CPU HSV detector (color_detector.py)
+                           # or "server" → shared inference_server.py (several bots, one model)
+if pytesseract: pytesseract.pytesseract.tesseract_cmd = TESS_PATH
+FRAME_SOURCE = 0   # 0 = OBS virtual cam | video file | image dir | .raw recording
+INPUT_BACKEND = "interception"   # | "null" | "record:trace.jsonl[+interception]"
 
-# ── BOT CONFIG (unchanged from v11) ───────────────────────────────────────
+# ── BOT CONFIG (v11 game mechanics) ───────────────────────────────────────
 IMG_SZ = 416 
 FRAME_SKIP = 1
 CONF_THRES = 0.70 
@@ -57,47 +92,92 @@ BASE_TO = 1.2
 MAX_TO = 5.0
 INSERT_DELAY_AFTER_F2 = 0.6
 # OCR
-CROP=(6,37,160,50); UPSCALE=3; OCR_SKIP=6
-OCR_CFG=r"--oem 3 --psm 7 -c tessedit_char_whitelist=0123456789HPSPhpsp/|:."
+CROP=(6,37,160,50); OCR_SKIP=6       # reader: hpsp_reader.py (cache + glyph templates)
 HP_CRIT,  SP_CRIT  = 40, 20
 HP_HYST,  SP_HYST  = HP_CRIT+10, SP_CRIT+10
-# dataset capture
+# ── DATASET CAPTURE ───────────────────────────────────────────────────────
 CAPTURE_DIR = Path("captured_dataset")
-for sub in ("images","labels","preview",
-            "cards/images","cards/preview","cards/labels"):
-    (CAPTURE_DIR/sub).mkdir(parents=True, exist_ok=True)
+CAPTURE_POLICY = "uncertainty"  # capture_policy.py | "every" → a frame per CAPTURE_EVERY with targets
 CAPTURE_EVERY = 3.0        # seconds
+CAPTURE_WINDOW = 10.0      # policy: keep the top-k most informative frames per window (s)
+CAPTURE_TOPK   = 2
+CAPTURE_BUDGET = 40_000    # policy: JPEG bytes/s on average (~1 frame / 5 s at 1080p)
+CAPTURE_SECONDARY = "color"  # second opinion for the disagreement signal (None = off)
+CAPTURE_MIN_INTERVAL = {"":1.0, "cards":0.5}   # per-folder rate limit (s)
+CAPTURE_QUEUE   = 16       # pending samples before the oldest is dropped
+CAPTURE_PREVIEW = False    # render previews later: python src/sample_writer.py
+CAPTURE_DEDUP   = 6        # skip frames within this many dHash bits of a kept one (0=off)
+# ── PIPELINE / PERFORMANCE ────────────────────────────────────────────────
+ACT_QUEUE = 8              # max pending input commands (drop-oldest)
+MOTION_GATE = True         # skip / ROI-only inference when the screen is still
+GATE_MAX_AGE = 1.0         # force a full-frame pass at least this often (s)
+ADAPTIVE = True            # controller.py: FRAME_SKIP / OCR_SKIP / IMG_SZ follow load + bot state
+ADAPT_TARGET_MS = 50       #   decision period to aim for (ms); sitting → ADAPT_REST_MS
+ADAPT_REST_MS = 250
+ADAPT_SKIP = (1,8)         #   FRAME_SKIP floor / ceiling
+ADAPT_OCR = (1,12)         #   OCR_SKIP floor / ceiling
+ADAPT_SIZES = (256,320,416)  # IMG_SZ ladder (ceiling = the trained size)
+ADAPT_EVERY = 0.5          #   controller tick (s)
+CASCADE = False            # cascade.py: coarse pass + native-res crops around small / unsure boxes
+CASCADE_SZ = 256           #   coarse input size (replaces IMG_SZ)
+CASCADE_CROP = 320         #   crop side in capture pixels (= second-pass imgsz)
+CASCADE_FINE = None        #   second-stage model spec (None = same model; ONNX needs its own)
+TRACE_OUT = None           # e.g. "trace.json" → Chrome / Perfetto trace on exit
+# tracking (tracker.py)
+TRACKING = True            # persistent ids; commit to a target until its track dies
+TRACK_INFER_EVERY = 2      # model on every Nth frame, tracker predictions in between
+RETARGET_AFTER = 2.0       # re-click a committed, still-tracked target after this (s)
+CARD_RECLICK = 1.0         # a tracked card is not clicked again within this (s)
+PROCESS_MODE = False       # capture / OCR / inference as processes on a shared-memory ring
+RING_SLOTS = 8             # frames in the ring (PROCESS_MODE)
 # ──────────────────────────────────────────────────────────────────────────
 
-# ═════════ interception helpers ══════════════════════════════════════════
-interception.auto_capture_devices()
-def click_abs(x,y):
+# ═════════ input helpers ═════════════════════════════════════════════════
+# These only build executor steps; the backend (input_backend.py) is picked
+# in init() and the hold times are scheduled by the ActionExecutor.
+inp = NullBackend()
+def log_key(k):
+    ts=time.strftime("%H:%M:%S",time.localtime())
+    print(f"[KEY {ts}] {k.lower()}")
+
+def click_abs(x,y,hold=0.02):
     x+=random.randint(-JITTER_PX,JITTER_PX); y+=random.randint(-JITTER_PX,JITTER_PX)
-    interception.move_to(int(x),int(y))
-    interception.click(int(x),int(y),"left",delay=0.02)
+    return ((inp.move,x,y),(inp.button,"left",True),hold,(inp.button,"left",False))
 
 def key_tap(k,ms=20):
-    ts=time.strftime("%H:%M:%S",time.localtime())
-    print(f"[KEY {ts}] {k.lower()}")
-    if hasattr(interception,"press"): interception.press(k)
-    elif hasattr(interception,"hold_key"): interception.hold_key(k,ms/1000)
-    else: interception.key_down(k); time.sleep(ms/1000); interception.key_up(k)
+    return ((log_key,k),(inp.key,k,True),ms/1000,(inp.key,k,False))
+
+# ═════════ pipeline plumbing ═════════════════════════════════════════════
+# capture → frames (newest only) → inference / OCR workers
+# inference → dets (newest only) → decision (main thread)
+# decision → actions (bounded, drop-oldest) → executor thread
+# every item carries (frame id, grab time) so tracer spans line up per frame
+stop    = threading.Event()
+stats   = {k:StageStats(k) for k in ("cap","ocr","inf","dec","act")}
+tracer  = Tracer()
+frames  = LatestSlot()
+dets    = LatestSlot()
+actions = ActionExecutor(stop,maxlen=ACT_QUEUE,stats=stats["act"],tracer=tracer)
 
 # ═════════ Insert / F2 helpers ═══════════════════════════════════════════
+# State changes happen immediately on the decision thread; only the actual
+# key presses / clicks (and the delays between them) go to the executor.
+# Insert flips `sitting`, so it is submitted keep=True: the drop-oldest
+# action queue may shed stale clicks, never a toggle the bot has counted.
 sitting = False
 last_f2 = 0.0
 def do_insert():
     global sitting
     if time.time()-last_f2 < INSERT_DELAY_AFTER_F2: return False
-    key_tap("insert"); sitting = not sitting; return True
+    actions.submit(*key_tap("insert"),keep=True); sitting = not sitting; return True
 
 current_timeout = TIME_LONG
 last_event      = time.time()
 def do_f2():
     global last_f2,current_timeout,last_event
     if time.time()-last_f2 < F2_COOLDOWN: return False
-    if sitting: do_insert(); time.sleep(0.05)
-    key_tap("f2")
+    if sitting and do_insert(): actions.submit(0.05,*key_tap("f2"))
+    else: actions.submit(*key_tap("f2"))
     last_f2 = time.time(); current_timeout = TIME_SHORT; last_event = last_f2
     return True
 
@@ -105,184 +185,373 @@ def do_f2():
 last_card = last_att = 0.0
 def attack_target(scr_x,scr_y):
     global last_att,current_timeout,last_event
-    if time.time()-last_att < COOL_ATT: return
-    key_tap("f3"); time.sleep(0.05); click_abs(scr_x,scr_y)
+    if time.time()-last_att < COOL_ATT: return False
+    actions.submit(*key_tap("f3"),0.05,*click_abs(scr_x,scr_y))
     last_att=time.time()
     dx=abs(scr_x-(win_x0+GAME_W/2)); dy=abs(scr_y-(win_y0+GAME_H/2))
     walk=((dx*dx+dy*dy)**0.5)/WALK_SPEED_PX
     current_timeout = min(MAX_TO, BASE_TO+walk); last_event=time.time()
+    return True
 
 def click_card(scr_x,scr_y):
     global last_card,current_timeout,last_event
     if time.time()-last_card < COOL_CARD: return
-    click_abs(scr_x,scr_y); last_card=time.time()
+    actions.submit(*click_abs(scr_x,scr_y)); last_card=time.time()
     current_timeout=TIME_LONG; last_event=last_card
 
 # ═════════ window / model init ═══════════════════════════════════════════
 def get_game_rect():
+    if win32gui is None: return None
     hwnd=win32gui.FindWindow(None,GAME_TITLE)
     if not hwnd: raise RuntimeError("Game window not found")
     l,t,r,b=win32gui.GetClientRect(hwnd); ls,ts=win32gui.ClientToScreen(hwnd,(l,t))
     return ls,ts,r-l,b-t
-win_x0,win_y0,GAME_W,GAME_H = get_game_rect()
 
-model=YOLO(MODEL_PATH)
-cap=cv2.VideoCapture(0,cv2.CAP_DSHOW)
-cap.set(cv2.CAP_PROP_FRAME_WIDTH,1920); cap.set(cv2.CAP_PROP_FRAME_HEIGHT,1080)
-cap.set(cv2.CAP_PROP_BUFFERSIZE,1); time.sleep(0.2); assert cap.isOpened()
-VCW,VCH=int(cap.get(3)),int(cap.get(4)); SX,SY=GAME_W/VCW, GAME_H/VCH
-cx_mid,cy_mid=VCW/2,VCH/2; d_max=(VCW**2+VCH**2)**0.5; λ=0.4
-def in_corner(): x,y=win32api.GetCursorPos(); return x<FAILSAFE_PX and y<FAILSAFE_PX
+λ=0.4
+gate=ChangeGate(max_age=GATE_MAX_AGE,ignore=(CROP,))   # HP/SP text is not motion
+def in_corner():
+    if win32api is None: return False
+    x,y=win32api.GetCursorPos(); return x<FAILSAFE_PX and y<FAILSAFE_PX
+
+def init(source=FRAME_SOURCE, realtime=True, capture_dir=CAPTURE_DIR, input_backend=None):
+    """Open the frame source, find the game window, load the detector and
+    the input backend.  Replays (file / dir / .raw) map boxes 1:1 onto the
+    frame when the game window is not there."""
+    global win_x0,win_y0,GAME_W,GAME_H,model,cap,VCW,VCH,SX,SY,cx_mid,cy_mid,d_max,writer,policy,ctl,inp,src_args
+    inp=make_backend(input_backend or INPUT_BACKEND)
+    cap=open_source(source,realtime=realtime); src_args=(source,realtime)
+    VCW,VCH=int(cap.get(3)),int(cap.get(4))
+    rect=get_game_rect() if isinstance(cap,LiveSource) else None
+    win_x0,win_y0,GAME_W,GAME_H = rect or (0,0,VCW,VCH)
+    SX,SY=GAME_W/VCW, GAME_H/VCH
+    cx_mid,cy_mid=VCW/2,VCH/2; d_max=(VCW**2+VCH**2)**0.5
+    if PROCESS_MODE: cap.release()              # the capture process reopens it
+    else: model=load_model()                     # PROCESS_MODE: loaded in the inference process
+    capture_dir=Path(capture_dir)
+    for sub in ("images","labels","preview",
+                "cards/images","cards/preview","cards/labels"):
+        (capture_dir/sub).mkdir(parents=True, exist_ok=True)
+    writer=SampleWriter(capture_dir,min_interval=CAPTURE_MIN_INTERVAL,
+                        maxlen=CAPTURE_QUEUE,preview=CAPTURE_PREVIEW,tracer=tracer,
+                        dedup=CAPTURE_DEDUP)
+    second=CAPTURE_SECONDARY if CAPTURE_SECONDARY!=DETECTOR else None   # no self-disagreement
+    # pooled frames outlive the tick and capture buffers / ring slots are reused → copy (default)
+    policy=CapturePolicy(writer,CONF_THRES,window=CAPTURE_WINDOW,top_k=CAPTURE_TOPK,
+                         budget=CAPTURE_BUDGET,secondary=second and load_detector(second))
+
+    ctl=LatencyController(ADAPT_TARGET_MS,ADAPT_REST_MS,ADAPT_SKIP,ADAPT_OCR,ADAPT_SIZES,
+                          knobs=(FRAME_SKIP,OCR_SKIP,IMG_SZ))
+
+def load_model():
+    m=load_detector(DETECTOR)
+    if not CASCADE: return m
+    return Cascade(m,coarse=CASCADE_SZ,crop=CASCADE_CROP,
+                   fine=CASCADE_FINE and load_detector(CASCADE_FINE))
 
 # ═════════ dataset-capture helpers ═══════════════════════════════════════
 def save_sample(frame_bgr, detections, folder=""):
-    ts=str(int(time.time()*1000))
-    if folder: folder=f"{folder}/"
-    img_p = CAPTURE_DIR/f"{folder}images"/f"{ts}.jpg"
-    prev_p= CAPTURE_DIR/f"{folder}preview"/f"{ts}.jpg"
-    lbl_p = CAPTURE_DIR/f"{folder}labels"/f"{ts}.txt"
-    cv2.imwrite(str(img_p), frame_bgr, [int(cv2.IMWRITE_JPEG_QUALITY),90])
-    prev=frame_bgr.copy(); h,w=prev.shape[:2]
-    colors={0:(255,0,0),1:(255,128,0),2:(0,255,0),3:(0,128,255),
-            4:(255,0,255),5:(128,0,255),6:(0,0,255),7:(255,255,0)}
-    with lbl_p.open("w") as f:
-        for cls,(x1,y1,x2,y2) in detections:
-            cv2.rectangle(prev,(x1,y1),(x2,y2),colors.get(cls,(255,255,255)),2)
-            f.write(f"{cls} {(x1+x2)/2/w:.6f} {(y1+y2)/2/h:.6f} {(x2-x1)/w:.6f} {(y2-y1)/h:.6f}\n")
-    cv2.imwrite(str(prev_p),prev,[int(cv2.IMWRITE_JPEG_QUALITY),90])
-
-# ═════════ OCR regex ═════════════════════════════════════════════════════
-hp_crit=sp_crit=False; hp_cur=hp_max=sp_cur=sp_max=0
-re_hp=re.compile(r"HP[:\.]?\s*(\d+)\s*/\s*(\d+)",re.I)
-re_sp=re.compile(r"SP[:\.]?\s*(\d+)\s*/\s*(\d+)",re.I)
+    if PROCESS_MODE: frame_bgr=frame_bgr.copy()      # ring slot gets recycled
+    return writer.submit(frame_bgr, detections, folder)
 
-# ═════════ debug deques ══════════════════════════════════════════════════
-cap_t,inf_t,log_t=deque(maxlen=120),deque(maxlen=120),deque(maxlen=120)
-last_capture=0.0; card_count=0
+# ═════════ HP / SP reader ════════════════════════════════════════════════
+hp_crit=sp_crit=False; hp_cur=hp_max=sp_cur=sp_max=0
+hpsp=HpSpReader(crop=CROP)
+
+def read_hp_sp(frame):
+    v=hpsp.read(frame)
+    if v and hpsp.changed: apply_hp_sp(v)
+
+def apply_hp_sp(v):
+    global hp_crit,sp_crit,hp_cur,hp_max,sp_cur,sp_max
+    hp_cur,hp_max,sp_cur,sp_max=v
+    hp_pct,sp_pct=v.hp_pct,v.sp_pct
+    prev_hp,prev_sp=hp_crit,sp_crit
+    hp_crit = hp_pct<HP_CRIT if not hp_crit else not (hp_pct>=HP_HYST)
+    sp_crit = sp_pct<SP_CRIT if not sp_crit else not (sp_pct>=SP_HYST)
+    if hp_crit!=prev_hp: print("⚠️ HP CRIT" if hp_crit else "✅ HP ok",f"({hp_pct:.0f}%)")
+    if sp_crit!=prev_sp: print("⚠️ SP CRIT" if sp_crit else "✅ SP ok",f"({sp_pct:.0f}%)")
+
+# ═════════ stage workers ═════════════════════════════════════════════════
+last_capture=0.0; card_count=0; red_ct=purple_ct=0
+seen={"inf":0,"ocr":0}; grabbed=0
+
+def capture_step():
+    global grabbed
+    t0=time.perf_counter(); ok,frame=cap.read(); t1=time.perf_counter()
+    stats["cap"].add((t1-t0)*1000,frames.depth())
+    if ok:
+        grabbed+=1; tracer.span("cap",t0,t1,grabbed)
+        frames.put((grabbed,t0,frame))
+    elif cap.ended: stop.set()                      # replay finished
+    else: time.sleep(0.01)
+
+def ocr_step():
+    # every OCR_SKIP detection frames → wait for a frame that many captures newer
+    seq,item=frames.get(after=seen["ocr"]+FRAME_SKIP*OCR_SKIP-1,timeout=0.5)
+    if item is None: return
+    fid,_,frame=item
+    seen["ocr"]=seq; t0=time.perf_counter()
+    read_hp_sp(frame)
+    stats["ocr"].add((time.perf_counter()-t0)*1000,frames.depth()); tracer.span("ocr",t0,fid=fid)
+
+last_np=None     # previous detections as NumPy (xyxy,cls,conf) for the gate
+last_mode="full"
+
+def detect(frame):
+    """Motion-gated detection: skip / changed-ROI / full pass → Result."""
+    global last_np,last_mode
+    mode,roi=gate.check(frame) if MOTION_GATE else ("full",None)
+    if last_np is None: mode="full"
+    if mode=="skip":                                   # nothing moved → reuse
+        res=make_result(*last_np,frame.shape)
+    elif mode=="roi":                                  # only the changed tiles
+        x1,y1,x2,y2=roi
+        r=model(frame[y1:y2,x1:x2],imgsz=IMG_SZ,conf=CONF_THRES,iou=IOU_THRES,verbose=False)[0]
+        nb,nc,nf=to_numpy(r); nb+=(x1,y1,x1,y1)
+        last_np=merge_roi(last_np,(nb,nc,nf),roi); res=make_result(*last_np,frame.shape)
+    else:
+        res=model(frame,imgsz=IMG_SZ,conf=CONF_THRES,iou=IOU_THRES,verbose=False)[0]
+        last_np=to_numpy(res)
+    if MOTION_GATE: gate.commit(mode)
+    last_mode=mode
+    return res
+
+tracker=Tracker(); n_infer=0
+
+def infer(frame,t):
+    """detect() + tracker: the model runs on every TRACK_INFER_EVERY-th
+    frame, frames in between get the tracks' predicted boxes for time t."""
+    global n_infer,last_mode
+    n_infer+=1
+    if not TRACKING: return detect(frame)
+    if n_infer%TRACK_INFER_EVERY and len(tracker):
+        last_mode="track"; return tracker.result(t,frame.shape)
+    return tracker.update(*to_numpy(detect(frame)),t,frame.shape)
+
+def inference_step():
+    seq,item=frames.get(after=seen["inf"]+FRAME_SKIP-1,timeout=0.5)
+    if item is None: return
+    fid,t_grab,frame=item
+    seen["inf"]=seq; t0=time.perf_counter()
+    res=infer(frame,t_grab)
+    stats["inf"].add((time.perf_counter()-t0)*1000,dets.depth()); tracer.span("inf",t0,fid=fid)
+    dets.put((fid,t_grab,frame,res))
+
+# ═════════ process mode (PROCESS_MODE) ═══════════════════════════════════
+# capture / OCR / inference run as separate processes around a FrameRing in
+# shared memory; they read slots as zero-copy views and send back only small
+# result messages.  ring_step() turns those into the same dets items (and
+# mirrors the gate / OCR counters), so the decision loop and [DBG] line are
+# identical in both modes.
+CHILD_CFG=("DETECTOR","IMG_SZ","CONF_THRES","IOU_THRES","MOTION_GATE","GATE_MAX_AGE",
+           "FRAME_SKIP","OCR_SKIP","CROP","RING_SLOTS","TRACKING","TRACK_INFER_EVERY",
+           "CASCADE","CASCADE_SZ","CASCADE_CROP","CASCADE_FINE")
+
+KNOBS=None      # PROCESS_MODE: shared (FRAME_SKIP, OCR_SKIP, IMG_SZ) the controller writes
+
+def _sync():
+    """Children: pick up the controller's current knobs."""
+    global FRAME_SKIP,OCR_SKIP,IMG_SZ
+    if KNOBS is not None: FRAME_SKIP,OCR_SKIP,IMG_SZ=KNOBS[:]
+
+def _child(ring_name,shape,cfg):
+    global gate
+    globals().update(cfg)
+    gate=ChangeGate(max_age=GATE_MAX_AGE,ignore=(CROP,))
+    return FrameRing.attach(ring_name,RING_SLOTS,shape)
+
+def _send(out,msg):
+    try: out.put_nowait(msg)
+    except queue.Full: pass                         # main is behind: newest wins later
+
+def capture_proc(ring_name,shape,cfg,source,realtime,pstop,out):
+    ring=_child(ring_name,shape,cfg); src=open_source(source,realtime=realtime)
+    while not pstop.is_set():
+        t0=time.perf_counter(); ok,frame=src.read(); t1=time.perf_counter()
+        if ok: ring.write(frame,t0,t1)
+        elif src.ended: out.put(("end",)); break
+        else: time.sleep(0.01)
+    src.release()
+
+def ocr_proc(ring_name,shape,cfg,pstop,out):
+    ring=_child(ring_name,shape,cfg); last=0
+    while not pstop.is_set():
+        _sync(); seq,frame,_=ring.get(after=last+FRAME_SKIP*OCR_SKIP-1,timeout=0.5)
+        if frame is None: continue
+        last=seq; t0=time.perf_counter(); v=hpsp.read(frame); t1=time.perf_counter()
+        if ring.valid(seq):
+            _send(out,("ocr",seq,t0,t1,v if v and hpsp.changed else None,dict(hpsp.n)))
+
+def inference_proc(ring_name,shape,cfg,pstop,out):
+    global model
+    ring=_child(ring_name,shape,cfg); model=load_model(); last=0
+    while not pstop.is_set():
+        _sync(); seq,frame,t_grab=ring.get(after=last+FRAME_SKIP-1,timeout=0.5)
+        if frame is None: continue
+        last=seq; t0=time.perf_counter(); res=infer(frame,t_grab); t1=time.perf_counter()
+        if ring.valid(seq): _send(out,("inf",seq,t0,t1,*to_numpy(res),res.boxes.id,last_mode))
+
+def start_procs():
+    global ring,results,pstop,KNOBS
+    ctx=mp.get_context("spawn"); shape=(VCH,VCW,3); cfg={k:globals()[k] for k in CHILD_CFG}
+    KNOBS=cfg["KNOBS"]=ctx.Array("i",[FRAME_SKIP,OCR_SKIP,IMG_SZ])
+    ring=FrameRing(RING_SLOTS,shape); results=ctx.Queue(64); pstop=ctx.Event()
+    a=(ring.name,shape,cfg)
+    procs=[ctx.Process(target=capture_proc,args=(*a,*src_args,pstop,results),name="cap",daemon=True),
+           ctx.Process(target=ocr_proc,args=(*a,pstop,results),name="ocr",daemon=True),
+           ctx.Process(target=inference_proc,args=(*a,pstop,results),name="inf",daemon=True)]
+    for p in procs: p.start()
+    return procs
+
+def ring_step():
+    try: msg=results.get(timeout=0.5)
+    except queue.Empty: return
+    if msg[0]=="end": stop.set(); return
+    if msg[0]=="ocr":
+        _,seq,t0,t1,v,n=msg
+        stats["ocr"].add((t1-t0)*1000); tracer.span("ocr",t0,t1,seq)
+        hpsp.n.update(n); hpsp.last_ms=(t1-t0)*1000
+        if v: apply_hp_sp(v)
+        return
+    _,seq,t0,t1,xyxy,cls,cf,ids,mode=msg
+    if mode in gate.count: gate.count[mode]+=1
+    g0,g1=ring.grab_times(seq); frame=ring.view(seq)
+    if not ring.valid(seq): return                   # slot recycled while queued
+    stats["cap"].add((g1-g0)*1000); tracer.span("cap",g0,g1,seq)
+    stats["inf"].add((t1-t0)*1000); tracer.span("inf",t0,t1,seq)
+    dets.put((seq,g0,frame,make_result(xyxy,cls,cf,frame.shape,ids)))
+
+# ═════════ decision (runs on the main bot thread) ════════════════════════
+target_id=None; card_clicked={}      # tracker ids: committed target, card id → click time
+ATK_LUT=np.zeros(256,bool)           # class → attack switch (one gather per frame)
+
+def decide(frame,res):
+    global sitting,last_event,current_timeout,last_capture,card_count,red_ct,purple_ct,target_id
+    d=records(res); cls=d["cls"]
+    ATK_LUT[[0,1,3,7]]=ATTACK_BLUE,ATTACK_CYAN,ATTACK_ORANGE,ATTACK_YELLOW
+    is_atk=ATK_LUT[cls]
+    cards=d[cls==4]; atks=d[is_atk]; reds=d[cls==6]
+    red_ct=len(reds); purple_ct=int(np.count_nonzero(cls==5))
+    now=time.time()
+    for k in [k for k,t in card_clicked.items() if now-t>CARD_RECLICK]: del card_clicked[k]
+    if card_clicked and len(cards): cards=cards[[i not in card_clicked for i in cards["id"].tolist()]]
+    red_grid=Grid(reds["cx"],reds["cy"],cell=RED_NEAR_R)
+
+    # dataset capture: most informative frames per window, or every CAPTURE_EVERY
+    ds=d[is_atk|((cls>=4)&(cls<=6))]
+    if CAPTURE_POLICY=="uncertainty": policy.observe(frame,d,ds,now)
+    elif len(atks) and now-last_capture > CAPTURE_EVERY:
+        save_sample(frame, boxes(ds))
+        last_capture=time.time()
+
+    # ── red swarm avoidance (whole screen, or crowding the player) ─────
+    if red_ct >= RED_F2_THRESHOLD or \
+       (RED_NEAR_THRESHOLD and red_grid.count(cx_mid,cy_mid,RED_NEAR_R)[0] >= RED_NEAR_THRESHOLD): do_f2()
+
+    # ── CRITICAL HP logic ──────────────────────────────────────────────
+    if hp_crit:
+        if red_ct or len(atks): do_f2()
+        elif not sitting:  do_insert()
+    else:
+        if sitting: do_insert()
+
+        # nearest-strongest target, minus a penalty per red near it
+        if len(atks):
+            s=score(atks,cx_mid,cy_mid,λ,d_max)
+            if RED_TARGET_PENALTY and red_ct: s-=RED_TARGET_PENALTY*red_grid.count(atks["cx"],atks["cy"],RED_NEAR_R)
+            best=atks[int(np.argmax(s))]
+
+        # ---- card (pink) first priority ------------------------------
+        if len(cards):
+            c=cards[int(np.argmax(cards["conf"]))]
+            click_card(win_x0+int(c["cx"]*SX),win_y0+int(c["cy"]*SY))
+            if c["id"]>=0: card_clicked[int(c["id"])]=now
+            card_count+=1
+            save_sample(frame, boxes(c[None]), folder="cards")
+
+        # ---- attacks ------------------------------------------------
+        # ---- SP critical: ONLY simple click (no F3) ------------------
+        elif sp_crit and len(atks) and not sitting:
+            actions.submit(*click_abs(win_x0+int(best["cx"]*SX),win_y0+int(best["cy"]*SY)))
+            current_timeout = TIME_LONG
+            last_event      = time.time()
+
+        # ---- normal attacks (F3 + click) -----------------------------
+        # (a target whose track is still alive is not re-clicked until
+        #  RETARGET_AFTER – no flip-flopping between equally good mobs)
+        elif len(atks) and not sitting:
+            if (target_id is not None and now-last_att < RETARGET_AFTER
+                    and (atks["id"]==target_id).any()):
+                last_event=time.time()                              # still fighting it – no timeout F2
+            elif attack_target(win_x0+int(best["cx"]*SX),win_y0+int(best["cy"]*SY)):
+                target_id=int(best["id"]) if best["id"]>=0 else None
+
+        # timeout teleport
+        if time.time()-last_event > current_timeout: do_f2()
+
+# ═════════ adaptive knobs (ADAPTIVE) ════════════════════════════════════
+def recent(st,n=10):
+    xs=list(st.lat)[-n:]
+    return sum(xs)/len(xs) if xs else 0.0
+
+def adapt():
+    global FRAME_SKIP,OCR_SKIP,IMG_SZ
+    new=ctl.update(recent(stats["cap"]),recent(stats["inf"]),recent(stats["ocr"]),
+                   sitting,hp_crit,sp_crit,red_ct)
+    if new:
+        FRAME_SKIP,OCR_SKIP,IMG_SZ=new
+        if KNOBS is not None: KNOBS[:]=new
 
 # ═════════════════════════ MAIN LOOP ═════════════════════════════════════
 def main():
-    global hp_crit,sp_crit,sitting,last_event,current_timeout,last_capture,card_count
-    fid,last_dbg=0,time.time()
-
-    while True:
-        if in_corner(): break
-        t0=time.perf_counter(); ok,frame=cap.read()
-        cap_t.append((time.perf_counter()-t0)*1000);  # capture time
-        if not ok: continue
-
-        # ─── OCR HP/SP every n frames ───────────────────────────────────
-        if fid%(FRAME_SKIP*OCR_SKIP)==0:
-            x1,y1,x2,y2=CROP
-            crop=cv2.resize(frame[y1:y2,x1:x2],None,fx=UPSCALE,fy=UPSCALE,interpolation=cv2.INTER_LINEAR)
-            gray=cv2.cvtColor(crop,cv2.COLOR_BGR2GRAY)
-            _,bw=cv2.threshold(gray,0,255,cv2.THRESH_BINARY+cv2.THRESH_OTSU)
-            txt=pytesseract.image_to_string(bw,config=OCR_CFG)
-            m_hp,m_sp=re_hp.search(txt),re_sp.search(txt)
-            if m_hp and m_sp:
-                hp_cur,hp_max=map(int,m_hp.groups()); sp_cur,sp_max=map(int,m_sp.groups())
-                hp_pct,sp_pct=hp_cur/hp_max*100, sp_cur/sp_max*100
-                prev_hp,prev_sp=hp_crit,sp_crit
-                hp_crit = hp_pct<HP_CRIT if not hp_crit else not (hp_pct>=HP_HYST)
-                sp_crit = sp_pct<SP_CRIT if not sp_crit else not (sp_pct>=SP_HYST)
-                if hp_crit!=prev_hp: print("⚠️ HP CRIT" if hp_crit else "✅ HP ok",f"({hp_pct:.0f}%)")
-                if sp_crit!=prev_sp: print("⚠️ SP CRIT" if sp_crit else "✅ SP ok",f"({sp_pct:.0f}%)")
-
-        # ─── Detection every FRAME_SKIP ─────────────────────────────────
-        if fid%FRAME_SKIP==0:
-            t1=time.perf_counter()
-            res=model(frame,imgsz=IMG_SZ,conf=CONF_THRES,iou=IOU_THRES,verbose=False)[0]
-            inf_t.append((time.perf_counter()-t1)*1000)   # inference time
-
-            red_ct=0; purple_ct=0
-            cards=[]; atks=[]; det_for_ds=[]
-            for box,cls,conf in zip(res.boxes.xyxy,res.boxes.cls,res.boxes.conf):
-                cls=int(cls); box=tuple(map(int,box))
-                if   cls==4: cards.append((conf,box)); det_for_ds.append((cls,box))
-                elif cls==6: red_ct+=1;                det_for_ds.append((cls,box))
-                elif cls==5: purple_ct+=1;             det_for_ds.append((cls,box))
-                elif cls==0 and ATTACK_BLUE  : atks.append((conf,box)); det_for_ds.append((cls,box))
-                elif cls==1 and ATTACK_CYAN  : atks.append((conf,box)); det_for_ds.append((cls,box))
-                elif cls==3 and ATTACK_ORANGE: atks.append((conf,box)); det_for_ds.append((cls,box))
-                elif cls==7 and ATTACK_YELLOW: atks.append((conf,box)); det_for_ds.append((cls,box))
-
-            # dataset capture (generic) every CAPTURE_EVERY
-            if atks and time.time()-last_capture > CAPTURE_EVERY:
-                save_sample(frame.copy(), det_for_ds)
-                last_capture=time.time()
-
-            # ── red swarm avoidance ────────────────────────────────────
-            if red_ct >= RED_F2_THRESHOLD: do_f2()
-
-            # ── CRITICAL HP logic ──────────────────────────────────────
-            if hp_crit:
-                if red_ct or atks: do_f2()
-                elif not sitting:  do_insert()
-            else:
-                if sitting: do_insert()
-
-                # ---- card (pink) first priority ----------------------
-                if cards:
-                    _,box=max(cards,key=lambda d:d[0]); x1,y1,x2,y2=box
-                    click_card(win_x0+int(((x1+x2)//2)*SX),
-                               win_y0+int(((y1+y2)//2)*SY))
-                    card_count+=1
-                    save_sample(frame.copy(), [(4,box)], folder="cards")
-
-                # ---- attacks ----------------------------------------
-                # ---- SP critical: ONLY simple click (no F3) ----------
-                elif sp_crit and atks and not sitting:
-                    # choose best target (nearest-strongest same as below)
-                    if len(atks) > 1:
-                        def score_sp(d):
-                            conf, box = d
-                            x1, y1, x2, y2 = box
-                            cx, cy = (x1 + x2) / 2, (y1 + y2) / 2
-                            return conf - λ * ((cx - cx_mid) ** 2 + (cy - cy_mid) ** 2) ** 0.5 / d_max
-                        _, box = max(atks, key=score_sp)
-                    else:
-                        _, box = atks[0]
-
-                    x1, y1, x2, y2 = box
-                    click_abs(
-                        win_x0 + int(((x1 + x2) // 2) * SX),
-                        win_y0 + int(((y1 + y2) // 2) * SY)
-                    )
-                    current_timeout = TIME_LONG
-                    last_event      = time.time()
-
-                # ---- normal attacks (F3 + click) ---------------------
-                elif atks and not sitting:
-                    if len(atks)>1:
-                        def score(d):
-                            conf,box=d; x1,y1,x2,y2=box
-                            cx,cy=(x1+x2)/2,(y1+y2)/2
-                            return conf-λ*((cx-cx_mid)**2+(cy-cy_mid)**2)**0.5/d_max
-                        _,box=max(atks,key=score)
-                    else: _,box=atks[0]
-                    x1,y1,x2,y2=box
-                    attack_target(win_x0+int(((x1+x2)//2)*SX),
-                                  win_y0+int(((y1+y2)//2)*SY))
-
-                # timeout teleport
-                if time.time()-last_event > current_timeout: do_f2()
+    last_dbg=last_ctl=time.time(); seq=0; procs=[]
+    if PROCESS_MODE:
+        procs=start_procs(); workers=[Worker("ring",ring_step,stop)]
+    else:
+        workers=[Worker("cap",capture_step,stop),
+                 Worker("ocr",ocr_step,stop),
+                 Worker("inf",inference_step,stop)]
+    for w in workers: w.start()
+    actions.start(); writer.start()
+
+    while not stop.is_set():
+        if in_corner(): stop.set(); break
+        seq,item=dets.get(after=seq,timeout=0.2)
+        if item is not None:
+            fid,t_grab,frame,res=item
+            tracer.cur=(fid,t_grab); t0=time.perf_counter()
+            decide(frame,res)
+            stats["dec"].add((time.perf_counter()-t0)*1000,len(actions.q)); tracer.span("dec",t0,fid=fid)
+
+        if ADAPTIVE and time.time()-last_ctl > ADAPT_EVERY:
+            adapt(); last_ctl=time.time()
 
         # ─── periodic debug print ───────────────────────────────────────
         if time.time()-last_dbg > PROFILE_EVERY:
-            ac=sum(cap_t)/len(cap_t) if cap_t else 0
-            ai=sum(inf_t)/len(inf_t) if inf_t else 0
-            al=sum(log_t)/len(log_t) if log_t else 0
-            fps=1000/(ac+ai+al) if ac+ai+al else 0
-            print(f"[DBG] fps={fps:4.1f} | cap={ac:4.1f} | inf={ai:6.1f} | "
+            dt=time.time()-last_dbg
+            fps=stats["dec"].rate(dt)                  # frames that reached a decision
+            print(f"[DBG] fps={fps:4.1f} | "+" ".join(s.fmt() for s in stats.values())+
+                  f" | {tracer.fmt()} | drop cap={frames.dropped} act={actions.q.dropped} | {writer.fmt()} {policy.fmt()} | {hpsp.fmt()} | {gate.fmt()} | {ctl.fmt()} | "
                   f"HP={hp_cur}/{hp_max}({hp_crit}) SP={sp_cur}/{sp_max}({sp_crit}) | "
-                  f"red={red_ct} purple={purple_ct} sit={sitting} cards={card_count}")
+                  f"red={red_ct} purple={purple_ct} sit={sitting} cards={card_count} tgt={target_id}")
             last_dbg=time.time()
 
-        fid+=1
-
-    cap.release(); cv2.destroyAllWindows()
+    for w in workers: w.join(timeout=1.0)
+    if procs:
+        pstop.set()
+        for p in procs:
+            p.join(timeout=2.0)
+            if p.is_alive(): p.terminate()
+        ring.close()
+    actions.join(timeout=1.0)
+    policy.close(); writer.close(); inp.close()
+    if not PROCESS_MODE: cap.release()          # PROCESS_MODE: init() released the probe, the capture process owns its own
+    if TRACE_OUT: print(f"🧭 {tracer.export_chrome(TRACE_OUT)} trace events → {TRACE_OUT}")
 
 # ═════ entry ══════════════════════════════════════════════════════════════
 if __name__=="__main__":
     print("🚀 BOT v12 – ESC or move mouse to corner to exit")
+    # python src/test_rag.py [source] [window title]  – one process per game client
+    if len(sys.argv)>2: GAME_TITLE=sys.argv[2]
+    init(sys.argv[1] if len(sys.argv)>1 else FRAME_SOURCE)
     threading.Thread(target=main, daemon=False).start()
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+tracing.py  –  per-frame trace spans for the bot loop
+────────────────────────────────────────────────────────────────────────────
+Every stage records (stage, frame id, t0, t1) into a fixed-size ring of
+NumPy columns.  Writers never take a lock: a slot is claimed with next() on
+an itertools.count (atomic under the GIL) and each thread only fills its
+own slot, so tracing costs ~1 µs per span whatever the load.
+
+  cap   frame grab                     dec   decision on a detection result
+  ocr   HP/SP read                     act   command submit → last input sent
+  inf   detection (incl. motion gate)  save  sample JPEG + label write
+  e2e   frame grab → last input of the command that frame triggered
+
+    tr=Tracer(); tr.span("inf",t0,fid=17)          # t1 defaults to now
+    print(tr.summary())                            # n / p50 / p95 / p99 per stage
+    tr.export_chrome("trace.json")                 # chrome://tracing or ui.perfetto.dev
+"""
+
+import itertools, json, time
+import numpy as np
+
+STAGES = ("cap","ocr","inf","dec","act","save","e2e")
+SID    = {s:i for i,s in enumerate(STAGES)}
+
+class Tracer:
+    def __init__(self,size=1<<16):
+        assert size&(size-1)==0, "ring size must be a power of two"
+        self.size=size; self._ctr=itertools.count(); self.hi=0
+        self.stage=np.full(size,-1,np.int8); self.fid=np.zeros(size,np.int64)
+        self.t0=np.zeros(size); self.t1=np.zeros(size)
+        self.origin=time.perf_counter()
+        self.cur=(-1,0.0)        # (frame id, grab time) the decision thread is acting on
+
+    def span(self,stage,t0,t1=None,fid=-1):
+        k=next(self._ctr); i=k&(self.size-1)
+        self.fid[i]=fid; self.t0[i]=t0; self.t1[i]=time.perf_counter() if t1 is None else t1
+        self.stage[i]=SID[stage]; self.hi=k+1
+
+    def __len__(self): return min(self.hi,self.size)
+
+    def durations(self,stage):
+        """ms of every retained span of one stage."""
+        m=self.stage==SID[stage]
+        return (self.t1[m]-self.t0[m])*1000
+
+    def pct(self,stage,ps=(50,95,99)):
+        d=self.durations(stage)
+        return np.percentile(d,ps) if len(d) else np.zeros(len(ps))
+
+    def fmt(self,stage="e2e"):
+        p50,_,p99=self.pct(stage)
+        return f"{stage} p50={p50:.0f}ms p99={p99:.0f}ms"
+
+    def summary(self):
+        rows=[f"  {'stage':5} {'n':>6} {'mean':>8} {'p50':>8} {'p95':>8} {'p99':>8}   ms"]
+        for s in STAGES:
+            d=self.durations(s)
+            if not len(d): continue
+            p50,p95,p99=np.percentile(d,(50,95,99))
+            rows.append(f"  {s:5} {len(d):6} {d.mean():8.2f} {p50:8.2f} {p95:8.2f} {p99:8.2f}")
+        return "\n".join(rows)
+
+    def export_chrome(self,path):
+        """Chrome trace-event JSON: one track per stage, frame id in args."""
+        m=self.stage>=0; o=np.argsort(self.t0[m]); us=lambda t: (t-self.origin)*1e6
+        st,fid,t0,t1=self.stage[m][o],self.fid[m][o],self.t0[m][o],self.t1[m][o]
+        ev=[{"name":"thread_name","ph":"M","pid":0,"tid":i,"args":{"name":s}}
+            for i,s in enumerate(STAGES)]
+        ev+=[{"name":STAGES[s],"ph":"X","pid":0,"tid":int(s),"ts":round(us(a),1),
+              "dur":round((b-a)*1e6,1),"args":{"frame":int(f)}}
+             for s,f,a,b in zip(st.tolist(),fid.tolist(),t0.tolist(),t1.tolist())]
+        with open(path,"w") as f: json.dump({"traceEvents":ev,"displayTimeUnit":"ms"},f)
+        return len(ev)
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+tracker.py  –  SORT-style multi-object tracker for the bot's detections
+────────────────────────────────────────────────────────────────────────────
+Tracks live in parallel NumPy arrays (id, cls, conf, box cx/cy/w/h,
+velocity px/s, hits, last-seen time).  Per update:
+
+  1. predict every track to the frame time (constant velocity)
+  2. cost = 1 − IoU (same class only) between predictions and detections,
+     plus a centroid fallback so small fast blobs that no longer overlap
+     their prediction still match; one vectorised (T × D) matrix
+  3. assignment: Hungarian (scipy) when available, else greedy by cost
+  4. matched → box replaced, velocity blended; new detections → tracks;
+     tracks unseen for max_age seconds → dropped
+
+    tr=Tracker()
+    res=tr.update(xyxy,cls,conf,t,frame.shape)   # Result with boxes.id
+    res=tr.result(t,frame.shape)                 # predicted only (no inference)
+"""
+
+import numpy as np
+from detectors import make_result
+try: from scipy.optimize import linear_sum_assignment
+except ImportError: linear_sum_assignment=None
+
+def xyxy2cxcywh(b):
+    return np.stack([(b[:,0]+b[:,2])/2,(b[:,1]+b[:,3])/2,b[:,2]-b[:,0],b[:,3]-b[:,1]],1)
+
+def cxcywh2xyxy(b):
+    return np.stack([b[:,0]-b[:,2]/2,b[:,1]-b[:,3]/2,b[:,0]+b[:,2]/2,b[:,1]+b[:,3]/2],1)
+
+def iou_matrix(a,b):
+    tl=np.maximum(a[:,None,:2],b[None,:,:2]); br=np.minimum(a[:,None,2:],b[None,:,2:])
+    inter=np.prod(np.clip(br-tl,0,None),2)
+    area=lambda x: (x[:,2]-x[:,0])*(x[:,3]-x[:,1])
+    return inter/(area(a)[:,None]+area(b)[None,:]-inter+1e-9)
+
+class Tracker:
+    def __init__(self,iou_thr=0.2,dist_gate=1.5,max_age=0.6,min_hits=2,vel_alpha=0.5):
+        self.iou_thr=iou_thr; self.dist_gate=dist_gate     # centroid gate, in box sizes
+        self.max_age=max_age; self.min_hits=min_hits; self.alpha=vel_alpha
+        self.next_id=1; self._clear()
+
+    def _clear(self):
+        self.id=np.zeros(0,np.int64); self.cls=np.zeros(0,np.float32); self.conf=np.zeros(0,np.float32)
+        self.box=np.zeros((0,4),np.float32); self.vel=np.zeros((0,2),np.float32)
+        self.hits=np.zeros(0,np.int32); self.seen=np.zeros(0,np.float64)
+
+    def __len__(self): return len(self.id)
+
+    def predict(self,t):
+        """cx/cy/w/h of every track extrapolated to time t."""
+        b=self.box.copy(); b[:,:2]+=self.vel*(t-self.seen)[:,None]
+        return b
+
+    def cost(self,pred,det):
+        c=1-iou_matrix(cxcywh2xyxy(pred),cxcywh2xyxy(det))
+        d=np.linalg.norm(pred[:,None,:2]-det[None,:,:2],axis=2)
+        size=np.maximum(pred[:,None,2:].max(2),det[None,:,2:].max(2))
+        far=c>1-self.iou_thr                              # no usable overlap → centroid
+        c[far]=np.where(d[far]<self.dist_gate*size[far],1+d[far]/size[far],np.inf)
+        return c
+
+    def assign(self,c):
+        if linear_sum_assignment is not None:
+            r,k=linear_sum_assignment(np.where(np.isfinite(c),c,1e9))
+            ok=np.isfinite(c[r,k]); return r[ok],k[ok]
+        rows=[]; cols=[]; used_r=set(); used_c=set()
+        for f in np.argsort(c,axis=None):
+            i,j=divmod(int(f),c.shape[1])
+            if not np.isfinite(c[i,j]): break
+            if i in used_r or j in used_c: continue
+            used_r.add(i); used_c.add(j); rows.append(i); cols.append(j)
+        return np.asarray(rows,int),np.asarray(cols,int)
+
+    def update(self,xyxy,cls,conf,t,shape):
+        det=xyxy2cxcywh(np.asarray(xyxy,np.float32).reshape(-1,4))
+        cls=np.asarray(cls,np.float32); conf=np.asarray(conf,np.float32)
+        live=(t-self.seen)<=self.max_age
+        for a in ("id","cls","conf","box","vel","hits","seen"): setattr(self,a,getattr(self,a)[live])
+        pred=self.predict(t)
+        r=k=np.zeros(0,int)
+        if len(self) and len(det):
+            c=self.cost(pred,det); c[self.cls[:,None]!=cls[None,:]]=np.inf
+            r,k=self.assign(c)
+        if len(r):                                         # matched: α-blend velocity
+            dt=np.maximum(t-self.seen[r],1e-3)[:,None]
+            v=(det[k,:2]-self.box[r,:2])/dt
+            self.vel[r]=self.alpha*v+(1-self.alpha)*self.vel[r]
+            self.box[r]=det[k]; self.conf[r]=conf[k]; self.hits[r]+=1; self.seen[r]=t
+        new=np.setdiff1d(np.arange(len(det)),k)
+        if len(new):
+            n=len(new); ids=np.arange(self.next_id,self.next_id+n); self.next_id+=n
+            self.id=np.concatenate([self.id,ids]); self.cls=np.concatenate([self.cls,cls[new]])
+            self.conf=np.concatenate([self.conf,conf[new]]); self.box=np.concatenate([self.box,det[new]])
+            self.vel=np.concatenate([self.vel,np.zeros((n,2),np.float32)])
+            self.hits=np.concatenate([self.hits,np.ones(n,np.int32)])
+            self.seen=np.concatenate([self.seen,np.full(n,t)])
+        return self.result(t,shape,fresh=True)
+
+    def result(self,t,shape,fresh=False):
+        """Confirmed tracks (plus new ones on a fresh update) as a Result with ids."""
+        ok=((self.hits>=self.min_hits)|fresh)&((t-self.seen)<=self.max_age)
+        b=cxcywh2xyxy(self.predict(t)[ok])
+        h,w=shape[:2]; b[:,0::2]=b[:,0::2].clip(0,w); b[:,1::2]=b[:,1::2].clip(0,h)
+        return make_result(b,self.cls[ok],self.conf[ok],shape,ids=self.id[ok])
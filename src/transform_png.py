@@ -1,32 +1,96 @@
 # remove_bg.py
 #
-# Varre a pasta sprites/ , cria sprites_clean/ com fundo transparente.
+# Varre a pasta sprites/ , cria sprites_clean/ com fundo transparente e já
+# recortado (faz o que o trim.py / "magick -trim" fazia, sem subprocess).
+#
+#   python src/transform_png.py                       # sprites → sprites_clean
+#   python src/transform_png.py SRC DST --workers 8
+#   python src/transform_png.py SRC DST --key 255 0 255 --tol 12   # magenta GRF
+#   python src/transform_png.py SRC DST --no-trim --hash
+#
+# Tudo em máscaras NumPy (sem loop por pixel), arquivos em paralelo, e só
+# reprocessa o que mudou: DST/.transform.json guarda mtime/tamanho (ou hash
+# com --hash) e os parâmetros de cada entrada.
 # Ajuste WHITE_THR se o fundo não for totalmente #FFFFFF.
 
-import glob, os
+import argparse, glob, hashlib, json, os, time
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
+import numpy as np
 from PIL import Image
 
 SRC_DIR  = "sprites"
 DST_DIR  = "sprites_clean"
 WHITE_THR = 240        # pixel é considerado branco se R,G,B ≥ 240 (0–255)
+MANIFEST = ".transform.json"
 
-Path(DST_DIR).mkdir(exist_ok=True)
+def clean(rgba, white_thr=WHITE_THR, key=None, tol=0, trim=True):
+    """(H,W,4) uint8 → fundo transparente (+ recorte pelo bbox do alpha)."""
+    rgb=rgba[...,:3]
+    bg=np.zeros(rgba.shape[:2],bool)
+    if white_thr is not None:
+        bg|=(rgb>=white_thr).all(-1)
+    if key is not None:
+        bg|=(np.abs(rgb.astype(np.int16)-np.array(key,np.int16))<=tol).all(-1)
+    rgba[bg,3]=0
+    if trim:
+        ys,xs=np.nonzero(rgba[...,3])
+        if len(ys): rgba=rgba[ys.min():ys.max()+1,xs.min():xs.max()+1]
+    return rgba
 
-for p in glob.glob(os.path.join(SRC_DIR, "*.png")):
-    img = Image.open(p).convert("RGBA")
-    data = img.getdata()
+def signature(path, use_hash):
+    st=os.stat(path)
+    if use_hash:
+        return hashlib.blake2b(Path(path).read_bytes(),digest_size=8).hexdigest()
+    return f"{st.st_mtime_ns}:{st.st_size}"
 
-    new_data = []
-    for r, g, b, a in data:
-        if r >= WHITE_THR and g >= WHITE_THR and b >= WHITE_THR:
-            # torna 100 % transparente
-            new_data.append((r, g, b, 0))
-        else:
-            new_data.append((r, g, b, a))
+def process(job):
+    src,dst,opts=job
+    img=np.array(Image.open(src).convert("RGBA"))
+    Image.fromarray(np.ascontiguousarray(clean(img,**opts))).save(dst)
+    return src
+
+def parse():
+    ap=argparse.ArgumentParser(formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+    ap.add_argument("src",nargs="?",default=SRC_DIR)
+    ap.add_argument("dst",nargs="?",default=DST_DIR)
+    ap.add_argument("--white",type=int,default=WHITE_THR,help="R,G,B ≥ this → transparent (-1 = off)")
+    ap.add_argument("--key",type=int,nargs=3,metavar=("R","G","B"),help="extra colour key")
+    ap.add_argument("--tol",type=int,default=0,help="per-channel tolerance for --key")
+    ap.add_argument("--no-trim",action="store_true",help="keep the original canvas size")
+    ap.add_argument("--hash",action="store_true",help="detect changes by content hash, not mtime")
+    ap.add_argument("--force",action="store_true")
+    ap.add_argument("--workers",type=int,default=os.cpu_count() or 1)
+    return ap.parse_args()
 
-    img.putdata(new_data)
-    out_path = os.path.join(DST_DIR, os.path.basename(p))
-    img.save(out_path)
+def main():
+    args=parse()
+    Path(args.dst).mkdir(parents=True,exist_ok=True)
+    opts=dict(white_thr=None if args.white<0 else args.white,
+              key=tuple(args.key) if args.key else None,tol=args.tol,trim=not args.no_trim)
+    man_p=Path(args.dst)/MANIFEST
+    man=json.loads(man_p.read_text()) if man_p.exists() and not args.force else {}
+    params=json.dumps(opts,sort_keys=True)
+
+    jobs=[]; sigs={}; t0=time.time()
+    files=sorted(glob.glob(os.path.join(args.src,"*.png")))
+    for p in files:
+        name=os.path.basename(p); dst=os.path.join(args.dst,name)
+        sigs[name]=signature(p,args.hash)
+        old=man.get(name)
+        if old and old["sig"]==sigs[name] and old["params"]==params and os.path.exists(dst): continue
+        jobs.append((p,dst,opts))
+
+    if jobs:
+        if args.workers>1 and len(jobs)>8:
+            with ProcessPoolExecutor(args.workers) as ex: list(ex.map(process,jobs,chunksize=8))
+        else:
+            for j in jobs: process(j)
+    for p,_,_ in jobs:
+        name=os.path.basename(p); man[name]={"sig":sigs[name],"params":params}
+    man_p.write_text(json.dumps(man,indent=0))
+    print(f"✅ {len(jobs)} sprites limpos ({len(files)-len(jobs)} sem mudança) em "
+          f"{time.time()-t0:.2f}s → {args.dst}")
 
-print("✅ Sprites limpos salvos em", DST_DIR)
+if __name__=="__main__":
+    main()
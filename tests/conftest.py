@@ -0,0 +1,5 @@
+# src/ is a flat folder of scripts (no package): make its modules importable
+import sys
+from pathlib import Path
+
+sys.path.insert(0,str(Path(__file__).resolve().parent.parent/"src"))
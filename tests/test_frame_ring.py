@@ -0,0 +1,32 @@
+import numpy as np
+import pytest
+from frame_ring import FrameRing
+
+@pytest.fixture
+def ring():
+    r=FrameRing(slots=4,shape=(8,12,3)); yield r; r.close()
+
+def test_write_then_get_newest(ring):
+    a=np.full((8,12,3),1,np.uint8); b=np.full((8,12,3),2,np.uint8)
+    ring.write(a,0.5,0.6); s=ring.write(b,1.5,1.6)
+    seq,v,t0=ring.get(after=0,timeout=0.1)
+    assert seq==s==2 and (v==2).all() and t0==1.5 and ring.grab_times(seq)==(1.5,1.6)
+    assert ring.get(after=2,timeout=0.01)==(2,None,0.0)
+
+def test_smaller_frame_gets_its_own_shape(ring):
+    seq=ring.write(np.ones((5,7,3),np.uint8))
+    assert ring.view(seq).shape==(5,7,3)
+
+def test_recycled_slot_is_invalid(ring):
+    s1=ring.write(np.zeros((8,12,3),np.uint8))
+    v=ring.view(s1); assert ring.valid(s1)
+    for k in range(4): ring.write(np.full((8,12,3),k+1,np.uint8))   # wraps onto s1's slot
+    assert not ring.valid(s1) and (v==4).all()                     # the reader's view changed under it
+
+def test_attach_shares_memory(ring):
+    other=FrameRing.attach(ring.name,slots=4,shape=(8,12,3))
+    try:
+        seq=ring.write(np.full((8,12,3),7,np.uint8))
+        s,v,_=other.get(after=0,timeout=0.1)
+        assert s==seq and (v==7).all() and not other.owner
+    finally: other.close()
@@ -0,0 +1,79 @@
+import struct
+import cv2
+import numpy as np
+import pytest
+import grf_sprites as G
+from color_detector import HUES
+
+def spr_bytes(frames,pal):
+    """SPR 2.1: indexed frames, RLE-compressed (0 → 0,run)."""
+    out=bytearray(b"SP\x01\x02")+struct.pack("<HH",len(frames),0)
+    for f in frames:
+        raw=bytearray(); flat=f.ravel().tolist(); i=0
+        while i<len(flat):
+            if flat[i]==0:
+                n=1
+                while i+n<len(flat) and flat[i+n]==0 and n<255: n+=1
+                raw+=bytes([0,n]); i+=n
+            else: raw.append(flat[i]); i+=1
+        out+=struct.pack("<HHH",f.shape[1],f.shape[0],len(raw))+raw
+    return bytes(out)+pal.tobytes()
+
+def act_bytes(actions):
+    """ACT 2.0: actions → frames → layers (x, y, spr, mirror)."""
+    out=bytearray(b"AC\x00\x02")+struct.pack("<H",len(actions))+bytes(10)
+    for frames in actions:
+        out+=struct.pack("<I",len(frames))
+        for layers in frames:
+            out+=bytes(32)+struct.pack("<I",len(layers))
+            for x,y,spr,mir in layers:
+                out+=struct.pack("<iiiI",x,y,spr,mir)+bytes([255]*4)+struct.pack("<fii",1.0,0,0)
+            out+=bytes(4)
+    return bytes(out)
+
+PAL=np.zeros((256,4),np.uint8); PAL[1]=(255,0,0,0); PAL[2]=(0,0,255,0); PAL[3]=(250,250,250,0)
+IMG=np.array([[0,0,1,1],[0,2,2,0],[1,3,0,0]],np.uint8)
+
+def test_rle_decode():
+    raw=np.array([5,0,3,7,0,1],np.uint8)
+    assert G.rle_decode(raw,6).tolist()==[5,0,0,0,7,0]
+
+def test_read_spr_palette_and_transparency(tmp_path):
+    p=tmp_path/"m.spr"; p.write_bytes(spr_bytes([IMG],PAL))
+    idx,rgba=G.read_spr(p)
+    assert len(idx)==1 and not rgba and idx[0].shape==(3,4,4)
+    assert idx[0][0,2].tolist()==[255,0,0,255] and idx[0][1,1].tolist()==[0,0,255,255]
+    assert idx[0][0,0,3]==0 and idx[0][2,1,3]==0                  # index 0 and near-white keyed out
+    (tmp_path/"junk.spr").write_bytes(b"XX"+bytes(1100))
+    with pytest.raises(ValueError): G.read_spr(tmp_path/"junk.spr")
+
+def test_act_render_and_cache(tmp_path):
+    (tmp_path/"m.spr").write_bytes(spr_bytes([IMG],PAL))
+    (tmp_path/"m.act").write_bytes(act_bytes([[[(0,0,0,0)],[(0,0,0,1)]],[[(0,0,0,0)]]]))
+    acts=G.read_act(tmp_path/"m.act")
+    assert [len(a) for a in acts]==[2,1] and acts[0][1][0].mirror==1
+    idx,rgba=G.read_spr(tmp_path/"m.spr")
+    im=G.render(acts[0][0],idx,rgba)
+    assert im.shape==(3,4,4) and im[0,2].tolist()==[255,0,0,255]   # trimmed to the opaque pixels
+    assert np.array_equal(G.render(acts[0][1],idx,rgba),im[:,::-1])
+    fr=G.load_frames(tmp_path/"m.act",cache_dir=tmp_path/"cache")
+    assert [(f.action,f.frame) for f in fr]==[(0,0),(0,1)]         # action 1 repeats a pose → deduped
+    again=G.load_frames(tmp_path/"m.act",cache_dir=tmp_path/"cache")
+    assert len(list((tmp_path/"cache").iterdir()))==2                # one .bin + one .idx.npy
+    assert all(np.array_equal(a.rgba,b.rgba) and a.cls==b.cls for a,b in zip(again,fr))
+
+def test_dominant_class_needs_a_confident_colour():
+    hsv=np.uint8([[[HUES[0][0],255,255]]])
+    blue=np.zeros((20,20,4),np.uint8); blue[...,:3]=cv2.cvtColor(hsv,cv2.COLOR_HSV2RGB); blue[...,3]=255
+    assert G.dominant_class(blue)==0
+    grey=np.zeros((20,20,4),np.uint8); grey[...,:3]=128; grey[...,3]=255
+    grey[:2,:2,:3]=(255,68,0)                                     # a little orange trim
+    assert G.dominant_class(grey)==-1
+
+@pytest.mark.skipif(not G.GRF_DIR.is_dir(),reason="no GRF assets")
+def test_real_assets_decode(tmp_path):
+    fr=G.load_frames(G.GRF_DIR/"monsterattack"/"azul.act",cache_dir=tmp_path)
+    assert fr and all(f.rgba.shape[2]==4 and f.rgba[...,3].any() for f in fr)
+    assert {f.cls for f in fr}=={0}
+    card=G.load_frames(G.GRF_DIR/"itens"/"carta_grande.act",cache_dir=tmp_path)
+    assert card and {f.cls for f in card}=={-1}                   # grey item: left unlabelled
@@ -0,0 +1,44 @@
+import random
+import numpy as np
+from manifest import dhash, hamming, BKTree, Manifest, hist_of, find_dup, to_sql, from_sql
+
+def test_dhash_stable_under_noise_and_size():
+    rng=np.random.default_rng(0)
+    img=np.repeat(np.linspace(0,255,64,dtype=np.uint8)[None,:,None],36,0).repeat(3,2)
+    img=np.ascontiguousarray(np.tile(img,(30,30,1))[:1080,:1920])
+    noisy=np.clip(img.astype(int)+rng.integers(-3,4,img.shape),0,255).astype(np.uint8)
+    assert hamming(dhash(img),dhash(noisy))<=4
+    assert dhash(img)!=dhash(np.ascontiguousarray(img[:,::-1]))
+    assert 0<=dhash(img)<1<<64
+
+def test_sql_roundtrip_high_bit():
+    for h in (0,1,(1<<63)-1,1<<63,(1<<64)-1):
+        assert from_sql(to_sql(h))==h and -(1<<63)<=to_sql(h)<1<<63
+
+def test_bktree_equals_linear_scan():
+    rnd=random.Random(1); base=[rnd.getrandbits(64) for _ in range(20)]
+    hs=[b^(1<<rnd.randrange(64))^(1<<rnd.randrange(64)) for b in base for _ in range(10)]+base
+    t=BKTree()
+    for i,h in enumerate(hs): t.add(h,i)
+    assert len(t)==len(hs)
+    for q in base[:5]+[rnd.getrandbits(64)]:
+        for radius in (0,2,6):
+            want=sorted(i for i,h in enumerate(hs) if hamming(q,h)<=radius)
+            assert sorted(k for _,_,k in t.search(q,radius))==want
+    d,h,k=t.nearest(base[0],0); assert d==0 and hs[k]==base[0]
+    assert t.nearest(base[0],6,match=lambda k: k>=len(hs)) is None
+
+def test_find_dup_needs_same_histogram(tmp_path):
+    m=Manifest(tmp_path)
+    h=0xF0F0F0F0F0F0F0F0; hist=hist_of([(0,None),(6,None),(0,None)])
+    assert hist=={"0":2,"6":1}
+    m.add("images/1.jpg","","s",1,1920,1080,h,hist)
+    m.add("images/2.jpg","","s",2,1920,1080,h,hist,dup_of="images/1.jpg")   # dups never enter the tree
+    m.add("cards/images/3.jpg","cards","s",3,1920,1080,h,hist)
+    t=m.tree("")
+    assert len(t)==1
+    assert find_dup(t,h^0b11,hist,6)=="images/1.jpg"
+    assert find_dup(t,h^0b11,hist_of([(0,None)]),6) is None      # new mob mix → keep
+    assert find_dup(t,h^0x7F,hist,6) is None                      # 7 bits away
+    assert m.rows("path=?",("images/1.jpg",))[0][6]==h
+    m.close()
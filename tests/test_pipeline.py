@@ -0,0 +1,48 @@
+import threading, time
+from pipeline import LatestSlot, DropQueue, StageStats, ActionExecutor
+
+def test_latest_slot_newest_wins_and_counts_unseen():
+    s=LatestSlot()
+    s.put("a"); s.put("b")                       # "a" overwritten before anyone read it
+    assert s.get(after=0,timeout=0)==(2,"b") and s.dropped==1
+    assert s.get(after=2,timeout=0.01)==(2,None)  # nothing newer → timeout
+    s.put("c"); assert s.dropped==1 and s.depth()==1
+
+def test_latest_slot_wakes_waiter():
+    s=LatestSlot(); out=[]
+    t=threading.Thread(target=lambda: out.append(s.get(after=0,timeout=2))); t.start()
+    time.sleep(0.05); s.put("x"); t.join(2)
+    assert out==[(1,"x")]
+
+def test_drop_queue_evicts_oldest():
+    q=DropQueue(2)
+    for x in "abc": q.put(x)
+    assert [q.get(0),q.get(0),q.get(0)]==["b","c",None] and q.dropped==1
+
+def test_drop_queue_never_evicts_keep():
+    q=DropQueue(2)
+    q.put("ins",keep=True); q.put("a"); q.put("b"); q.put("c")
+    assert [q.get(0) for _ in range(3)]==["ins","c",None] and q.dropped==2
+    q.put("k1",keep=True); q.put("k2",keep=True); q.put("k3",keep=True)   # only keeps → grows
+    assert [q.get(0) for _ in range(3)]==["k1","k2","k3"] and q.dropped==2
+
+def test_stage_stats():
+    st=StageStats("x",window=3)
+    for ms in (1,2,3,4): st.add(ms,depth=ms)
+    assert st.avg()==3 and st.qavg()==3 and st.rate(2.0)==2 and st.count==0
+
+def test_executor_runs_in_order_with_holds():
+    stop=threading.Event(); ex=ActionExecutor(stop); log=[]
+    step=lambda x: (lambda: log.append((x,time.perf_counter())),)
+    ex.submit(step("down"),0.05,step("up"))
+    ex.submit(step("next"))
+    ex.start(); time.sleep(0.3); stop.set(); ex.join(1)
+    assert [x for x,_ in log]==["down","up","next"]
+    assert log[1][1]-log[0][1]>=0.045 and ex.stats.count==2
+
+def test_executor_releases_held_input_on_stop():
+    stop=threading.Event(); ex=ActionExecutor(stop); log=[]
+    key=lambda k,down: log.append((k,down))
+    ex.submit((key,"f3",True),5.0,(key,"f3",False),(key,"f4",True))
+    ex.start(); time.sleep(0.1); stop.set(); ex.join(1)
+    assert log==[("f3",True),("f3",False)]        # release ran, the later press did not
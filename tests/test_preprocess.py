@@ -0,0 +1,35 @@
+import numpy as np
+import pytest
+from preprocess import Letterbox, naive
+
+@pytest.fixture
+def frame():
+    return np.random.default_rng(0).integers(0,255,(1080,1920,3),np.uint8)
+
+def test_matches_ultralytics_letterbox(frame):
+    t=Letterbox(416,stride=32)(frame)
+    ref=np.ascontiguousarray(naive(frame))
+    assert t.shape==ref.shape==(1,3,256,416) and t.dtype==np.float32
+    np.testing.assert_allclose(t,ref,atol=1e-6)
+
+def test_square_when_no_stride(frame):
+    t=Letterbox(416)(frame)
+    assert t.shape==(1,3,416,416) and np.allclose(t[0,:,0,0],114/255)   # padded rows
+
+def test_output_buffer_is_reused(frame):
+    lb=Letterbox(416,stride=32)
+    a=lb(frame); b=lb(frame[::-1].copy())
+    assert a.ctypes.data==b.ctypes.data
+    small=lb(frame[:300,:500])                                   # ROI: new geometry, same memory
+    assert np.shares_memory(small,lb._tensor) and small.shape==(1,3,256,416)
+
+def test_unmap_inverts_the_mapping(frame):
+    lb=Letterbox(416,stride=32); lb(frame)
+    src=np.float32([[100,200,500,700],[0,0,1920,1080]])
+    net=src*lb.r+np.float32([lb.px,lb.py,lb.px,lb.py])
+    np.testing.assert_allclose(lb.unmap(net.copy()),src,atol=1e-2)
+    np.testing.assert_allclose(lb.unmap(net.copy(),0.5,2.0)[0],[50,400,250,1400],atol=1e-2)
+
+def test_uint8_tensor(frame):
+    t=Letterbox(416,stride=32,dtype=np.uint8)(frame)
+    assert t.dtype==np.uint8 and np.array_equal(t,(naive(frame)*255).round().astype(np.uint8))
@@ -0,0 +1,34 @@
+import numpy as np
+import pytest
+from detectors import make_result
+from spatial import records, boxes, score, Grid
+
+def test_records_and_boxes():
+    res=make_result([[0,0,10,20],[5,5,15,15]],[6,0],[0.9,0.8],(720,1280),ids=np.int64([3,4]))
+    d=records(res)
+    assert d["cx"].tolist()==[5,10] and d["cy"].tolist()==[10,10]
+    assert d["cls"].tolist()==[6,0] and d["id"].tolist()==[3,4]
+    assert boxes(d)==[(6,(0,0,10,20)),(0,(5,5,15,15))]
+    assert records(make_result([[0,0,1,1]],[1],[0.5],(9,9)))["id"].tolist()==[-1]
+
+def test_score_prefers_near_strong():
+    d=records(make_result([[0,0,10,10],[90,90,110,110]],[0,0],[0.9,0.9],(200,200)))
+    s=score(d,100,100,0.5,141.0)
+    assert s[1]>s[0] and s[1]==pytest.approx(0.9)
+
+@pytest.mark.parametrize("brute",[Grid.BRUTE,0])               # full-matrix and cell paths
+def test_grid_matches_brute_force(monkeypatch,brute):
+    monkeypatch.setattr(Grid,"BRUTE",brute)
+    rng=np.random.default_rng(0)
+    px,py=rng.uniform(-50,1300,400),rng.uniform(-50,750,400)
+    qx,qy=rng.uniform(0,1280,60),rng.uniform(0,720,60)
+    for r,cell in ((40,64),(160,160),(300,64)):
+        g=Grid(px,py,cell)
+        want=((px[None]-qx[:,None])**2+(py[None]-qy[:,None])**2<=r*r)
+        assert g.count(qx,qy,r).tolist()==want.sum(1).tolist()
+        qi,pi=g.query(qx,qy,r)
+        assert sorted(zip(qi.tolist(),pi.tolist()))==sorted(zip(*map(np.ndarray.tolist,np.nonzero(want))))
+
+def test_grid_empty():
+    assert Grid([],[]).count(1.0,1.0,10).tolist()==[0]
+    assert Grid([1.0],[1.0]).count([],[],10).tolist()==[]
@@ -0,0 +1,45 @@
+import numpy as np
+from tracker import Tracker, iou_matrix
+
+SHAPE=(720,1280,3)
+
+def ids(res): return np.asarray(res.boxes.id).tolist()
+
+def test_iou_matrix():
+    a=np.float32([[0,0,10,10]]); b=np.float32([[0,0,10,10],[5,0,15,10],[20,20,30,30]])
+    np.testing.assert_allclose(iou_matrix(a,b),[[1,1/3,0]],atol=1e-6)
+
+def test_moving_object_keeps_its_id():
+    tr=Tracker(); out=[]
+    for k in range(5):
+        x=100+20*k; out.append(ids(tr.update([[x,100,x+40,140]],[0],[0.9],k*0.05,SHAPE)))
+    assert out==[[1]]*5 and tr.next_id==2
+
+def test_small_fast_blob_matches_by_centroid():
+    tr=Tracker()
+    tr.update([[100,100,110,110]],[6],[0.9],0.0,SHAPE)
+    res=tr.update([[112,100,122,110]],[6],[0.9],0.05,SHAPE)      # no overlap, one box away
+    assert ids(res)==[1]
+
+def test_classes_never_swap_ids():
+    tr=Tracker()
+    tr.update([[0,0,40,40],[50,0,90,40]],[0,6],[0.9,0.9],0.0,SHAPE)
+    res=tr.update([[50,0,90,40],[0,0,40,40]],[0,6],[0.9,0.9],0.05,SHAPE)   # positions swapped
+    got=dict(zip(np.asarray(res.boxes.cls).astype(int).tolist(),ids(res)))
+    assert got=={0:1,6:2}                                       # each id follows its own class
+
+def test_prediction_and_expiry():
+    tr=Tracker(max_age=0.3)
+    tr.update([[100,100,140,140]],[0],[0.9],0.0,SHAPE)
+    tr.update([[110,100,150,140]],[0],[0.9],0.1,SHAPE)         # 100 px/s → α-blended 50 px/s
+    b=np.asarray(tr.result(0.2,SHAPE).boxes.xyxy)
+    np.testing.assert_allclose(b[0],[115,100,155,140],atol=1e-3)
+    assert len(tr.result(0.5,SHAPE).boxes.xyxy)==0             # unseen > max_age
+    tr.update([[500,500,540,540]],[0],[0.9],0.5,SHAPE)
+    assert len(tr)==1 and ids(tr.result(0.5,SHAPE))==[]        # stale track dropped, new one unconfirmed
+
+def test_greedy_fallback(monkeypatch):
+    import tracker
+    monkeypatch.setattr(tracker,"linear_sum_assignment",None)
+    r,k=Tracker().assign(np.array([[0.1,0.9,np.inf],[0.8,0.2,np.inf]]))
+    assert r.tolist()==[0,1] and k.tolist()==[0,1]               # unmatchable column left alone